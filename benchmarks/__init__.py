@@ -0,0 +1,12 @@
+"""Render engine benchmarks, plus audio/MusiCue micro-benchmarks in ``benchmarks.micro``.
+
+Each scenario in ``benchmarks.scenarios`` runs in its own process with a
+fresh home directory, so caches start cold and the peak RSS is the
+scenario's alone. Rendering is forced onto Mesa's llvmpipe unless
+``--gpu`` is given, so results are comparable between headless machines.
+
+    python -m benchmarks.run                      # all scenarios -> benchmarks/results.json
+    python -m benchmarks.run -s multipass_feedback --repeat 5
+    python -m benchmarks.compare benchmarks/baseline.json benchmarks/results.json
+    python -m benchmarks.micro                    # scaling report: time vs song length
+"""
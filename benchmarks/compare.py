@@ -0,0 +1,74 @@
+"""Compare benchmark results against a baseline and flag regressions.
+
+    python -m benchmarks.compare benchmarks/baseline.json benchmarks/results.json --threshold 0.2
+
+A metric regresses when it is worse than the baseline by more than
+``threshold`` (a fraction: 0.2 is 20%). Wall time and peak RSS are
+worse when higher, fps when lower. Exits 1 if anything regressed or a
+baseline scenario failed in the new run.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_THRESHOLD = 0.2
+
+# metric -> True when a larger value is worse
+METRICS = {"wall_sec": True, "peak_rss_mb": True, "fps": False}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """One row per scenario and metric present in both runs."""
+    rows: List[Dict[str, Any]] = []
+    base_scenarios = baseline.get("scenarios", {})
+    for name, now in current.get("scenarios", {}).items():
+        before = base_scenarios.get(name)
+        if before is None or "skipped" in before or "skipped" in now:
+            continue
+        if "error" in now and "error" not in before:
+            rows.append({"scenario": name, "metric": "status", "baseline": "ok",
+                         "current": now["error"], "change": None, "regression": True})
+            continue
+        for metric, higher_is_worse in METRICS.items():
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change if higher_is_worse else -change
+            rows.append({"scenario": name, "metric": metric, "baseline": old, "current": new,
+                         "change": round(change, 4), "regression": worse > threshold})
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]], threshold: float, out=None) -> None:
+    out = out or sys.stdout
+    for row in rows:
+        change = f"{row['change']:+.1%}" if row["change"] is not None else ""
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['scenario']:24s} {row['metric']:12s} {row['baseline']!s:>10} -> "
+              f"{row['current']!s:>10} {change:>8}{flag}", file=out)
+    regressions = sum(1 for row in rows if row["regression"])
+    print(f"{regressions} regression(s) over {threshold:.0%}", file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare CedarToy benchmark results against a baseline")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction (default: %(default)s)")
+    args = parser.parse_args(argv)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    rows = compare(baseline, current, args.threshold)
+    print_report(rows, args.threshold)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
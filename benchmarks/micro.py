@@ -0,0 +1,219 @@
+"""Audio and MusiCue micro-benchmarks with a scaling report.
+
+Each case is timed on synthetic inputs at several song lengths. Most
+cover every frame of the song, so a linear-time implementation scales
+with an exponent near 1. Probe cases time a fixed number of frames at the
+end of the song and should not grow at all (exponent 0). The report fits
+``time ~ length ** k`` across the lengths and flags any case whose ``k``
+exceeds ``expected + tolerance``. That is how per-frame O(n) scans
+(O(n²) per song) show up without anyone having to read the numbers.
+
+    python -m benchmarks.micro                         # all cases, 30/60/120/240 s songs
+    python -m benchmarks.micro -c evaluate --lengths 60 120 240 480
+    python -m benchmarks.micro --profile evaluate      # cProfile at the longest length
+"""
+from __future__ import annotations
+
+import argparse
+import cProfile
+import gc
+import json
+import math
+import pstats
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .synthetic import synthetic_bundle, write_synthetic_wav
+
+DEFAULT_LENGTHS = (30.0, 60.0, 120.0, 240.0)
+FPS = 60.0
+SAMPLE_RATE = 22050
+TOLERANCE = 0.5
+PROBE_FRAMES = 1000
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    description: str
+    # (song length in seconds, scratch dir) -> zero-argument callable to time
+    setup: Callable[[float, Path], Callable[[], object]]
+    expected_exponent: float = 1.0
+
+
+def _audio_processor(length: float, work_dir: Path):
+    from cedartoy.audio import AudioProcessor
+
+    wav = work_dir / f"song_{int(length)}.wav"
+    if not wav.exists():
+        write_synthetic_wav(wav, length, SAMPLE_RATE)
+    return AudioProcessor(wav, FPS)
+
+
+def _setup_precompute(length: float, work_dir: Path):
+    return _audio_processor(length, work_dir)._precompute
+
+
+def _setup_history(length: float, work_dir: Path):
+    processor = _audio_processor(length, work_dir)
+
+    def run():
+        processor.history_texture = None
+        return processor.get_history_texture()
+    return run
+
+
+def _evaluator(length: float):
+    from cedartoy.musicue import BundleEvaluator
+    return BundleEvaluator(synthetic_bundle(length), FPS)
+
+
+def _setup_compile(length: float, work_dir: Path):
+    from cedartoy.musicue import CompiledBundle
+    bundle = synthetic_bundle(length)
+    return lambda: CompiledBundle.from_bundle(bundle)
+
+
+def _setup_evaluate(length: float, work_dir: Path):
+    evaluator = _evaluator(length)
+    frames = int(length * FPS)
+    return lambda: [evaluator.evaluate(i) for i in range(frames)]
+
+
+def _setup_evaluate_late(length: float, work_dir: Path):
+    # A fixed number of calls at the end of the song: per-call cost should
+    # not depend on how far in the frame is, so the expected exponent is 0.
+    evaluator = _evaluator(length)
+    end = int(length * FPS)
+    return lambda: [evaluator.evaluate(i) for i in range(end - PROBE_FRAMES, end)]
+
+
+def _setup_evaluate_range(length: float, work_dir: Path):
+    evaluator = _evaluator(length)
+    frames = int(length * FPS)
+    return lambda: evaluator.evaluate_range(0, frames)
+
+
+def _setup_synthesize(length: float, work_dir: Path):
+    from cedartoy.musicue import MusicalSpectrumSynth
+    frames = _evaluator(length).evaluate_range(0, int(length * FPS))
+    evals = [frames.frame(i) for i in range(len(frames))]
+    synth = MusicalSpectrumSynth()
+    return lambda: [synth.synthesize(frame) for frame in evals]
+
+
+def _setup_synthesize_batch(length: float, work_dir: Path):
+    from cedartoy.musicue import MusicalSpectrumSynth
+    timeline = _evaluator(length).evaluate_range(0, int(length * FPS))
+    synth = MusicalSpectrumSynth()
+    return lambda: synth.synthesize_batch(timeline)
+
+
+CASES: Dict[str, Case] = {c.name: c for c in [
+    Case("audio_precompute", "AudioProcessor._precompute: Shadertoy texture table", _setup_precompute),
+    Case("history_texture", "AudioProcessor.get_history_texture: spectrogram history", _setup_history),
+    Case("bundle_compile", "CompiledBundle.from_bundle: models to column arrays", _setup_compile),
+    Case("evaluate", "BundleEvaluator.evaluate for every frame", _setup_evaluate),
+    Case("evaluate_late", f"BundleEvaluator.evaluate for the last {PROBE_FRAMES} frames",
+         _setup_evaluate_late, expected_exponent=0.0),
+    Case("evaluate_range", "BundleEvaluator.evaluate_range over the song", _setup_evaluate_range),
+    Case("synthesize", "MusicalSpectrumSynth.synthesize for every frame", _setup_synthesize),
+    Case("synthesize_batch", "MusicalSpectrumSynth.synthesize_batch over the song", _setup_synthesize_batch),
+]}
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    """Fastest of ``repeat`` runs with the garbage collector off, as ``timeit`` does.
+
+    Longer songs keep more objects alive, so collections would otherwise
+    add a length-dependent cost that is not the code under test.
+    """
+    best = math.inf
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def fit_exponent(lengths: Sequence[float], seconds: Sequence[float]) -> float:
+    """Least-squares slope of log(time) against log(length)."""
+    x = np.log(np.asarray(lengths, dtype=np.float64))
+    y = np.log(np.maximum(np.asarray(seconds, dtype=np.float64), 1e-9))
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def run_case(case: Case, lengths: Sequence[float], work_dir: Path, repeat: int = 3,
+             tolerance: float = TOLERANCE) -> Dict[str, object]:
+    seconds = [best_time(case.setup(length, work_dir), repeat) for length in lengths]
+    exponent = fit_exponent(lengths, seconds)
+    return {
+        "description": case.description,
+        "lengths_sec": list(lengths),
+        "seconds": [round(s, 6) for s in seconds],
+        "exponent": round(exponent, 3),
+        "expected_exponent": case.expected_exponent,
+        "superlinear": exponent > case.expected_exponent + tolerance,
+    }
+
+
+def print_report(results: Dict[str, Dict[str, object]], out=None) -> None:
+    out = out or sys.stdout
+    lengths = next(iter(results.values()))["lengths_sec"] if results else []
+    header = "".join(f"{int(l):>9d}s" for l in lengths)
+    print(f"{'case':18s}{header}   exponent", file=out)
+    for name, result in results.items():
+        cells = "".join(f"{s * 1000:9.1f}ms"[-10:] for s in result["seconds"])
+        flag = "  SUPERLINEAR" if result["superlinear"] else ""
+        print(f"{name:18s}{cells}   {result['exponent']:6.2f}{flag}", file=out)
+
+
+def profile_case(case: Case, length: float, work_dir: Path, limit: int = 20) -> None:
+    fn = case.setup(length, work_dir)
+    profiler = cProfile.Profile()
+    profiler.runcall(fn)
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(limit)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Audio and MusiCue micro-benchmarks")
+    parser.add_argument("-c", "--case", action="append", choices=sorted(CASES),
+                        help="Case to run (repeatable; default: all)")
+    parser.add_argument("--lengths", type=float, nargs="+", default=list(DEFAULT_LENGTHS),
+                        help="Song lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per point; the fastest is kept")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Allowed scaling exponent above the expected one")
+    parser.add_argument("-o", "--output", type=Path, help="Also write the report as JSON")
+    parser.add_argument("--profile", choices=sorted(CASES),
+                        help="Profile one case at the longest length instead of timing")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="cedartoy-micro-") as tmp:
+        work_dir = Path(tmp)
+        if args.profile:
+            profile_case(CASES[args.profile], max(args.lengths), work_dir)
+            return 0
+        results = {}
+        for name in args.case or list(CASES):
+            results[name] = run_case(CASES[name], args.lengths, work_dir, max(1, args.repeat), args.tolerance)
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps({"fps": FPS, "cases": results}, indent=2) + "\n", encoding="utf-8")
+    return 1 if any(r["superlinear"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""Run benchmark scenarios and write the results as JSON.
+
+Each scenario runs ``--repeat`` times, each time in a child process
+(``--child``) with its own temporary home and output directories. The
+child prints one ``[BENCH]`` JSON line. The run with the median wall time
+is the one recorded.
+
+Per-stage times for render scenarios:
+
+- ``setup``: building the ``Renderer`` (GL context, shader compiles, buffers).
+- ``gpu_passes``: the shader passes, each followed by ``ctx.finish()`` so
+  the time is the GPU's and not the first readback's.
+- ``readback_resolve``: reading tiles back, accumulating temporal samples
+  and downsampling (view time minus passes).
+- ``encode_write``: encoding and writing the image file.
+- ``other``: everything else in ``render()``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .scenarios import SCENARIOS, Scenario
+from .synthetic import write_synthetic_wav
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results.json"
+BENCH_PREFIX = "[BENCH]"
+
+
+class StageTimer:
+    """Cumulative wall time per named stage."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def wrap(self, obj: Any, method: str, name: str, sync: Optional[Callable[[], None]] = None) -> None:
+        """Time every call of ``obj.method`` (an instance attribute shadows the class method).
+
+        ``sync`` runs inside the timed region after the call; pass
+        ``ctx.finish`` so asynchronous GL work is charged to this stage.
+        """
+        original: Callable = getattr(obj, method)
+
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                result = original(*args, **kwargs)
+                if sync is not None:
+                    sync()
+                return result
+
+        setattr(obj, method, timed)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # KiB on Linux
+
+
+def exr_supported() -> bool:
+    from cedartoy.options_schema import exr_available
+    return exr_available()
+
+
+def run_render(scenario: Scenario, out_dir: Path) -> Dict[str, Any]:
+    from cedartoy.cli import config_to_job
+    from cedartoy.config import build_config
+    from cedartoy.render import Renderer
+
+    job = config_to_job(build_config(None, {**scenario.config, "output_dir": str(out_dir)}))
+    timer = StageTimer()
+    start = time.perf_counter()
+    with timer.stage("setup"):
+        renderer = Renderer(job)
+    timer.wrap(renderer, "_render_pass", "passes", sync=renderer.ctx.finish)
+    timer.wrap(renderer, "_render_view", "view")
+    timer.wrap(renderer, "render_frame", "frame")
+    with timer.stage("render"):
+        renderer.render()
+    wall = time.perf_counter() - start
+    gl_renderer = renderer.ctx.info.get("GL_RENDERER", "")
+    renderer.cleanup()
+
+    frames = job.frame_end - job.frame_start
+    s = timer.seconds
+    render_sec = s.get("render", 0.0)
+    return {
+        "wall_sec": round(wall, 4),
+        "frames": frames,
+        "fps": round(frames / render_sec, 3) if render_sec > 0 else None,
+        "stages": {
+            "setup": round(s.get("setup", 0.0), 4),
+            "gpu_passes": round(s.get("passes", 0.0), 4),
+            "readback_resolve": round(s.get("view", 0.0) - s.get("passes", 0.0), 4),
+            "encode_write": round(s.get("frame", 0.0) - s.get("view", 0.0), 4),
+            "other": round(render_sec - s.get("frame", 0.0), 4),
+        },
+        "gl_renderer": gl_renderer,
+    }
+
+
+def run_audio(scenario: Scenario, work_dir: Path) -> Dict[str, Any]:
+    from cedartoy.audio import AudioProcessor
+
+    cfg = scenario.config
+    wav = work_dir / "synthetic.wav"
+    write_synthetic_wav(wav, cfg["duration_sec"], cfg["sample_rate"])
+    timer = StageTimer()
+    # Time the two halves of the constructor by wrapping them on the class.
+    originals = {name: getattr(AudioProcessor, name) for name in ("_load", "_precompute")}
+    for name, original in originals.items():
+        def timed(self, _original=original, _name=name.strip("_")):
+            with timer.stage(_name):
+                return _original(self)
+        setattr(AudioProcessor, name, timed)
+    try:
+        start = time.perf_counter()
+        processor = AudioProcessor(wav, cfg["fps"])
+        wall = time.perf_counter() - start
+    finally:
+        for name, original in originals.items():
+            setattr(AudioProcessor, name, original)
+    frames = processor.meta.frame_count
+    return {
+        "wall_sec": round(wall, 4),
+        "frames": frames,
+        "fps": round(frames / wall, 3) if wall > 0 else None,
+        "stages": {name: round(sec, 4) for name, sec in timer.seconds.items()},
+    }
+
+
+def run_child(name: str, work_dir: Path) -> Dict[str, Any]:
+    scenario = SCENARIOS[name]
+    if scenario.requires == "exr" and not exr_supported():
+        return {"skipped": "EXR output is not available in this environment"}
+    if scenario.kind == "audio":
+        result = run_audio(scenario, work_dir)
+    else:
+        result = run_render(scenario, work_dir / "out")
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return result
+
+
+def run_scenario(name: str, gpu: bool = False, timeout: float = 900.0) -> Dict[str, Any]:
+    """One run of a scenario in a fresh child process."""
+    with tempfile.TemporaryDirectory(prefix=f"cedartoy-bench-{name}-") as tmp:
+        work_dir = Path(tmp)
+        (work_dir / "home").mkdir()
+        env = dict(os.environ, HOME=str(work_dir / "home"), PYTHONPATH=str(REPO_ROOT))
+        if not gpu:
+            env.update(LIBGL_ALWAYS_SOFTWARE="1", GALLIUM_DRIVER="llvmpipe")
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--child", name, "--work-dir", str(work_dir)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=timeout)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(BENCH_PREFIX):
+            return json.loads(line[len(BENCH_PREFIX):])
+    tail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+    return {"error": f"exit code {proc.returncode}", "output": tail}
+
+
+def median_run(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    timed = [r for r in runs if "wall_sec" in r]
+    if not timed:
+        return runs[0]
+    result = dict(sorted(timed, key=lambda r: r["wall_sec"])[len(timed) // 2])
+    result["runs"] = len(timed)
+    if len(timed) > 1:
+        result["wall_sec_spread"] = round(statistics.pstdev(r["wall_sec"] for r in timed), 4)
+    return result
+
+
+def run_suite(names: List[str], repeat: int = 3, gpu: bool = False,
+              log: Callable[[str], None] = print) -> Dict[str, Any]:
+    scenarios: Dict[str, Any] = {}
+    for name in names:
+        runs = []
+        for _ in range(repeat):
+            runs.append(run_scenario(name, gpu=gpu))
+            if "wall_sec" not in runs[-1]:
+                break  # skipped or failed; repeating will not change that
+        scenarios[name] = median_run(runs)
+        log(f"{name:24s} {summary(scenarios[name])}")
+    gl = next((s.get("gl_renderer") for s in scenarios.values() if s.get("gl_renderer")), "")
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "gl_renderer": gl,
+        },
+        "repeat": repeat,
+        "scenarios": scenarios,
+    }
+
+
+def summary(result: Dict[str, Any]) -> str:
+    if "skipped" in result:
+        return f"skipped: {result['skipped']}"
+    if "error" in result:
+        return f"FAILED: {result['error']}"
+    fps = f"{result['fps']:.1f} fps" if result.get("fps") is not None else ""
+    return f"{result['wall_sec']:8.3f} s  {fps:>12s}  {result['peak_rss_mb']:7.1f} MB"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run CedarToy render benchmarks")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median is kept")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT, help="Results JSON path")
+    parser.add_argument("--gpu", action="store_true", help="Use the default GL driver instead of llvmpipe")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare the results against")
+    parser.add_argument("--threshold", type=float, default=None, help="Regression threshold for --compare")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = run_child(args.child, args.work_dir)
+        print(BENCH_PREFIX + json.dumps(result), flush=True)
+        return 0
+
+    results = run_suite(args.scenario or list(SCENARIOS), repeat=max(1, args.repeat), gpu=args.gpu)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {args.output}")
+    failed = any("error" in s for s in results["scenarios"].values())
+    if args.compare:
+        from .compare import DEFAULT_THRESHOLD, compare, print_report
+        threshold = args.threshold if args.threshold is not None else DEFAULT_THRESHOLD
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        rows = compare(baseline, results, threshold)
+        print_report(rows, threshold)
+        failed = failed or any(row["regression"] for row in rows)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
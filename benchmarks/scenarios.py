@@ -0,0 +1,54 @@
+"""Benchmark scenarios, sized to finish in seconds on llvmpipe.
+
+Render scenarios are config overrides on top of the option defaults,
+using bundled shaders. Paths are relative to the repository root, which
+is the runner's working directory.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    kind: str = "render"  # "render" or "audio"
+    config: Dict[str, Any] = field(default_factory=dict)
+    # Output the scenario needs that the machine may lack ("exr").
+    requires: Optional[str] = None
+
+
+_BASE = {"fps": 30, "frame_start": 0}
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in [
+    Scenario("single_pass_2d", "One fragment pass, 2D camera",
+             config={**_BASE, "shader": "shaders/protean_clouds.glsl", "width": 320, "height": 180,
+                     "frame_end": 10}),
+    Scenario("tiled_equirect", "Equirectangular camera rendered as 2x2 tiles",
+             config={**_BASE, "shader": "shaders/sun.glsl", "width": 1024, "height": 512,
+                     "camera_mode": "equirect", "tiles_x": 2, "tiles_y": 2, "frame_end": 6}),
+    Scenario("multipass_feedback", "Buffer A feeding back into itself and the image (tothebeat)",
+             config={**_BASE, "shader": "shaders/tothebeat/image.glsl", "width": 256, "height": 144,
+                     "frame_end": 6,
+                     "multipass": {"buffers": {
+                         "A": {"shader": "shaders/tothebeat/buffer_a.glsl", "channels": {0: "A"}},
+                         "Image": {"shader": "shaders/tothebeat/image.glsl", "channels": {0: "A"}},
+                     }}}),
+    Scenario("temporal_supersampling", "4 temporal samples per frame with a half shutter",
+             config={**_BASE, "shader": "shaders/luminescence.glsl", "width": 320, "height": 180,
+                     "temporal_samples": 4, "shutter": 0.5, "frame_end": 6}),
+    Scenario("ss_downsample", "Rendered at 2x and downsampled (ss_scale 2)",
+             config={**_BASE, "shader": "shaders/luminescence.glsl", "width": 320, "height": 180,
+                     "ss_scale": 2.0, "frame_end": 6}),
+    Scenario("output_png", "Cheap shader, 8-bit PNG output: encode-bound",
+             config={**_BASE, "shader": "shaders/test.glsl", "width": 1280, "height": 720,
+                     "default_output_format": "png", "default_bit_depth": "8", "frame_end": 6}),
+    Scenario("output_exr", "Cheap shader, 32-bit float EXR output: encode-bound",
+             config={**_BASE, "shader": "shaders/test.glsl", "width": 1280, "height": 720,
+                     "default_output_format": "exr", "default_bit_depth": "32f", "frame_end": 6},
+             requires="exr"),
+    Scenario("audio_precompute_5min", "Load and analyse a synthetic 5-minute stereo WAV at 60 fps",
+             kind="audio", config={"duration_sec": 300.0, "sample_rate": 44100, "fps": 60}),
+]}
@@ -1,12 +1,20 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 import soundfile as sf
 from scipy.signal import spectrogram
 
+from .filehash import file_key
 from .types import AudioMeta
 
+_logger = logging.getLogger(__name__)
+
 @dataclass
 class AudioData:
     samples: np.ndarray      # shape (N, channels)
@@ -15,13 +23,126 @@ class AudioData:
     fft_data: np.ndarray     # Precomputed FFT or STFT data
     # We might store STFT as (freqs, times, magnitudes)
 
+# Rows of the precomputed texture table are batched through one rfft call.
+_TABLE_BLOCK_ROWS = 256
+_FFT_WINDOW = 1024
+_HANN = np.hanning(_FFT_WINDOW)
+_WINDOW_OFFSETS = np.arange(_FFT_WINDOW)
+
+STEM_CACHE_DIR = Path.home() / ".cedartoy" / "cache" / "stems"
+_STEM_CACHE_FORMAT = 1
+
+
+def _fft_blocks(mono: np.ndarray, sample_rate: int, times: np.ndarray) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Yield ``(first_row, windows, normalized_log_bins)`` per block of rows.
+
+    Each block is one gather plus one batched rfft; samples outside the
+    song read as silence.
+    """
+    half = _FFT_WINDOW // 2
+    padded = np.concatenate([np.zeros(_FFT_WINDOW), mono, np.zeros(_FFT_WINDOW)])
+    centers = (times * sample_rate).astype(np.int64)
+
+    for b0 in range(0, len(times), _TABLE_BLOCK_ROWS):
+        starts = centers[b0:b0 + _TABLE_BLOCK_ROWS] - half + _FFT_WINDOW
+        idx = np.clip(starts[:, None] + _WINDOW_OFFSETS, 0, len(padded) - 1)
+        chunks = padded[idx]
+
+        bins = np.log1p(np.abs(np.fft.rfft(chunks * _HANN, axis=1))[:, :512])
+        peak = bins.max(axis=1, keepdims=True)
+        bins = np.divide(bins, peak, out=bins, where=peak > 0)
+        yield b0, chunks, bins
+
+
+def _shadertoy_texture_rows(mono: np.ndarray, sample_rate: int, times: np.ndarray) -> np.ndarray:
+    """Batched 2x512 FFT+waveform textures for windows centred at ``times``.
+
+    Matches ``AudioProcessor._compute_shadertoy_texture`` for in-range
+    windows; samples outside the song read as silence.
+    """
+    out = np.zeros((len(times), 2, 512), dtype=np.float32)
+    for b0, chunks, bins in _fft_blocks(mono, sample_rate, times):
+        block = out[b0:b0 + len(chunks)]
+        block[:, 0, :] = np.clip(bins, 0.0, 1.0)
+        block[:, 1, :] = (np.clip(chunks[:, ::2], -1.0, 1.0) * 0.5 + 0.5)[:, :512]
+    return out
+
+
+def _analyze_stem(path: Path, times: np.ndarray, out: np.ndarray) -> None:
+    """Fill ``out`` (rows, 512) with the FFT row of one stem."""
+    samples, sample_rate = sf.read(str(path), always_2d=True, dtype="float64")
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    for b0, chunks, bins in _fft_blocks(mono, sample_rate, times):
+        out[b0:b0 + len(chunks)] = np.clip(bins, 0.0, 1.0)
+
+
+def _stem_cache_path(stems: Dict[str, Path], fps: float, rows: int, oversample: int) -> Path:
+    key = json.dumps({
+        "format": _STEM_CACHE_FORMAT,
+        "stems": [[name, list(file_key(path))] for name, path in stems.items()],
+        "fps": fps, "rows": rows, "oversample": oversample,
+    })
+    return STEM_CACHE_DIR / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".npy")
+
+
+def analyze_stems(stems: Dict[str, Path], fps: float, rows: int, oversample: int = 1) -> np.ndarray:
+    """FFT rows for each stem, packed as a (rows, len(stems), 512) table.
+
+    Stems are decoded and transformed on one thread each (soundfile and
+    the batched rfft release the GIL), and the table is cached on disk
+    keyed by the stems' stat identity, so an unchanged project pays for
+    the analysis once and later renders memory-map the result.
+    """
+    cache_path = _stem_cache_path(stems, fps, rows, oversample)
+    try:
+        table = np.load(cache_path, mmap_mode="r")
+        if table.shape == (rows, len(stems), 512):
+            return table
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        _logger.debug("Ignoring unreadable stem cache %s: %s", cache_path, e)
+
+    times = (np.arange(rows, dtype=np.float64) / oversample) / fps
+    table = np.zeros((rows, len(stems), 512), dtype=np.float32)
+    with ThreadPoolExecutor(max_workers=max(1, len(stems))) as pool:
+        futures = [
+            pool.submit(_analyze_stem, path, times, table[:, k, :])
+            for k, path in enumerate(stems.values())
+        ]
+        for future in futures:
+            future.result()
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(cache_path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        _logger.warning("Could not write stem cache %s: %s", cache_path, e)
+    return table
+
+
 class AudioProcessor:
-    def __init__(self, audio_path: Path, fps: float):
+    def __init__(
+        self,
+        audio_path: Path,
+        fps: float,
+        oversample: int = 1,
+        stems: Optional[Dict[str, Path]] = None,
+    ):
         self.audio_path = audio_path
         self.fps = fps
+        # Texture table rows per video frame; >1 gives sub-frame (motion blur) resolution.
+        self.oversample = max(1, int(oversample))
+        # Ordered stem name -> wav; one texture row per stem.
+        self.stems: Dict[str, Path] = dict(stems or {})
         self.data: Optional[AudioData] = None
         self.history_texture: Optional[np.ndarray] = None
-        
+        self._texture_table: Optional[np.ndarray] = None
+        self._stem_table: Optional[np.ndarray] = None
+
         self._load()
         self._precompute()
 
@@ -55,26 +176,104 @@ class AudioProcessor:
         )
 
     def _precompute(self):
-        """Pre-compute all per-frame FFT textures for faster rendering."""
+        """Pre-compute the Shadertoy texture table at ``fps * oversample`` rows/sec.
+
+        Windows are gathered in blocks and transformed with one batched
+        rfft per block, so lookups during rendering are array indexing.
+        """
         if self.data is None:
             return
         frames = self.meta.frame_count
         if frames <= 0:
             return
-        self._precomputed_textures = {}
-        for f in range(frames):
-            self._precomputed_textures[f] = self._compute_shadertoy_texture(f)
+        rows = frames * self.oversample
+        if not self.stems:
+            self._texture_table = self._mix_table(rows)
+            return
+        # Stems analyse on their own threads while the mix is transformed here.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            stems = pool.submit(analyze_stems, self.stems, self.fps, rows, self.oversample)
+            self._texture_table = self._mix_table(rows)
+            self._stem_table = stems.result()
+
+    def _mix_table(self, rows: int) -> np.ndarray:
+        return _shadertoy_texture_rows(
+            self._mono_samples(),
+            self.data.sample_rate,
+            (np.arange(rows, dtype=np.float64) / self.oversample) / self.fps,
+        )
+
+    def _mono_samples(self) -> np.ndarray:
+        if self.data.samples.shape[1] > 1:
+            return np.mean(self.data.samples, axis=1)
+        return self.data.samples[:, 0]
 
     def get_shadertoy_texture(self, frame_index: int) -> np.ndarray:
         """Return cached precomputed texture if available, otherwise compute on-the-fly."""
         if self.data is None:
             return np.zeros((2, 512), dtype=np.float32)
 
-        if hasattr(self, '_precomputed_textures') and frame_index in self._precomputed_textures:
-            return self._precomputed_textures[frame_index]
+        table = self._texture_table
+        if table is not None and 0 <= frame_index < self.meta.frame_count:
+            return table[frame_index * self.oversample]
 
         return self._compute_shadertoy_texture(frame_index)
 
+    def get_shadertoy_texture_at(self, time_sec: float) -> np.ndarray:
+        """Texture at a continuous time, linearly interpolated between table rows."""
+        if self.data is None:
+            return np.zeros((2, 512), dtype=np.float32)
+
+        table = self._texture_table
+        if table is not None:
+            pos = time_sec * self.fps * self.oversample
+            i0 = int(np.floor(pos))
+            if 0 <= i0 < len(table) - 1:
+                frac = np.float32(pos - i0)
+                return table[i0] * (1.0 - frac) + table[i0 + 1] * frac
+            if i0 == len(table) - 1 and pos == i0:
+                return table[i0]
+
+        return _shadertoy_texture_rows(
+            self._mono_samples(), self.data.sample_rate, np.array([time_sec]),
+        )[0]
+
+    def get_shadertoy_textures(self, frame_start: int, count: int) -> np.ndarray:
+        """(count, 2, 512) textures for consecutive frames; zeros outside the song."""
+        out = np.zeros((max(0, count), 2, 512), dtype=np.float32)
+        table = self._texture_table
+        if table is None:
+            return out
+        src_start = max(0, frame_start)
+        src_end = min(self.meta.frame_count, frame_start + count)
+        if src_end > src_start:
+            dst = src_start - frame_start
+            out[dst:dst + (src_end - src_start)] = table[
+                src_start * self.oversample:src_end * self.oversample:self.oversample
+            ]
+        return out
+
+    def get_stems_texture(self, frame_index: int) -> np.ndarray:
+        """(len(stems), 512) FFT rows for a frame; silence outside the song."""
+        table = self._stem_table
+        if table is None or not 0 <= frame_index < self.meta.frame_count:
+            return np.zeros((max(1, len(self.stems)), 512), dtype=np.float32)
+        return np.asarray(table[frame_index * self.oversample])
+
+    def get_stems_texture_at(self, time_sec: float) -> np.ndarray:
+        """Stem FFT rows at a continuous time, interpolated like get_shadertoy_texture_at."""
+        table = self._stem_table
+        if table is None:
+            return np.zeros((max(1, len(self.stems)), 512), dtype=np.float32)
+        pos = time_sec * self.fps * self.oversample
+        i0 = int(np.floor(pos))
+        if 0 <= i0 < len(table) - 1:
+            frac = np.float32(pos - i0)
+            return table[i0] * (1.0 - frac) + table[i0 + 1] * frac
+        if i0 == len(table) - 1:
+            return np.asarray(table[i0])
+        return np.zeros((len(self.stems), 512), dtype=np.float32)
+
     def _compute_shadertoy_texture(self, frame_index: int) -> np.ndarray:
         """Compute the 2x512 FFT+waveform texture for a single frame."""
         center_sample = int((frame_index / self.fps) * self.data.sample_rate)
@@ -162,3 +361,19 @@ class AudioProcessor:
             
         self.history_texture = tex
         return tex
+
+    def get_history_columns(self, frame_start: int, count: int) -> np.ndarray:
+        """Return ``count`` history columns starting at ``frame_start``.
+
+        Frames outside the song are zero, so a ring buffer can be primed
+        before frame 0 without special-casing the edges.
+        """
+        tex = self.get_history_texture()
+        rows, frames = tex.shape
+        out = np.zeros((rows, count), dtype=np.float32)
+        src_start = max(0, frame_start)
+        src_end = min(frames, frame_start + count)
+        if src_end > src_start:
+            dst = src_start - frame_start
+            out[:, dst:dst + (src_end - src_start)] = tex[:, src_start:src_end]
+        return out
@@ -1,18 +1,18 @@
 import argparse
+import json
 import sys
-import webbrowser
 import threading
 import time
 from pathlib import Path
 from collections import defaultdict, deque
 from typing import Any, Dict, List, Optional
-from .config import build_config
-from .ui import run_wizard
-from .render import Renderer
-from .webserver import run_server
 from .types import RenderJob, MultipassGraphConfig, BufferConfig, AudioMeta
 from .options_schema import OPTIONS
 
+# Subcommands import what they need (render: moderngl, numpy, scipy;
+# config: pydantic, yaml) when they run, so `--help`, `wizard` and `watch`
+# start quickly. tests/test_startup.py guards this.
+
 def create_default_multipass(shader_path: Path, channels: Optional[Dict[int, str]] = None) -> MultipassGraphConfig:
     # Single pass "Image"
     return MultipassGraphConfig(
@@ -29,6 +29,13 @@ def create_default_multipass(shader_path: Path, channels: Optional[Dict[int, str
         execution_order=["Image"]
     )
 
+# Named channel sources the renderer binds itself (see Renderer._render_pass).
+_AUDIO_CHANNEL_SOURCES = (
+    "audio", "shadertoy_audio", "history", "audiohistory", "audio_history",
+    "stems", "audio_stems",
+)
+
+
 def _normalize_channels(raw: Any) -> Dict[int, str]:
     if raw is None:
         return {}
@@ -147,8 +154,11 @@ def config_to_job(cfg: dict) -> RenderJob:
         mp = parse_multipass(cfg, shader_path)
     else:
         top_channels = _normalize_channels(cfg.get("iChannel_paths") or cfg.get("channels"))
-        # Convert top-level file channels to file sources
-        file_channels = {i: f"file:{p}" for i, p in top_channels.items()}
+        # Convert top-level file channels to file sources; audio sources stay named.
+        file_channels = {
+            i: p if p.lower() in _AUDIO_CHANNEL_SOURCES else f"file:{p}"
+            for i, p in top_channels.items()
+        }
         mp = create_default_multipass(shader_path, channels=file_channels)
 
     shader_buffers = {name: buf.shader for name, buf in mp.buffers.items() if name != "Image"}
@@ -191,17 +201,27 @@ def config_to_job(cfg: dict) -> RenderJob:
         bundle_path=Path(cfg["bundle_path"]) if cfg.get("bundle_path") else None,
         bundle_mode=cfg.get("bundle_mode", "auto"),
         bundle_blend=cfg.get("bundle_blend", 0.5),
+        bundle_adsr=cfg.get("bundle_adsr") or {},
+        audio_history_sec=cfg.get("audio_history_sec", 0.0),
     )
 
 def run_ui_server(args):
     """Start the FastAPI web UI server"""
+    import webbrowser
     try:
         import uvicorn
         from cedartoy.server.app import app
+        from cedartoy.server.settings import settings
     except ImportError:
         print("Error: FastAPI dependencies not installed. Run: pip install fastapi uvicorn[standard]")
         sys.exit(1)
 
+    settings.prewarm_thumbnails = args.prewarm_thumbnails
+    settings.render_workers = args.render_workers
+    settings.ram_budget_mb = args.ram_budget_mb
+    settings.worker_max_jobs = args.worker_max_jobs
+    settings.worker_memory_budget_mb = args.worker_memory_budget_mb
+
     # Open browser automatically unless disabled
     if not args.no_browser:
         def open_browser():
@@ -215,6 +235,73 @@ def run_ui_server(args):
 
     uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="info")
 
+_WATCH_DONE = ("render_complete", "render_error", "render_cancelled")
+
+
+def format_watch_message(message: Dict[str, Any]) -> List[str]:
+    """Terminal lines for one message from the render WebSocket."""
+    kind = message.get("type")
+    if kind == "render_status":
+        line = f"Job {message.get('job_id')}: {message.get('status')}"
+        if message.get("queue_position"):
+            line += f" ({message['queue_position']} job(s) ahead)"
+        return [line]
+    if kind == "render_started":
+        return ["Render started"]
+    if kind == "render_progress":
+        line = f"Frame {message.get('frame')}/{message.get('total')}"
+        if message.get("eta_sec") is not None:
+            line += f"  ETA {message['eta_sec']}s"
+        return [line]
+    if kind == "render_log":
+        return [message.get("message", "")]
+    if kind == "render_logs":
+        skipped = [f"({message['dropped']} log lines skipped)"] if message.get("dropped") else []
+        return skipped + list(message.get("messages", []))
+    if kind == "render_complete":
+        return [f"Render complete: {message.get('output_dir', '')}"]
+    if kind == "render_error":
+        line = f"Render failed: {message.get('message', '')}"
+        if message.get("resumable"):
+            line += " (resumable)"
+        return [line]
+    if kind == "render_cancelled":
+        return ["Render cancelled"]
+    return []
+
+
+def run_watch(args) -> int:
+    """Follow a render job on a running UI server until it finishes."""
+    try:
+        import asyncio
+        import websockets
+    except ImportError:
+        print("Error: websockets is not installed. Run: pip install websockets")
+        return 1
+
+    url = args.url.rstrip("/").replace("http", "ws", 1) + "/ws/render"
+
+    async def follow() -> Optional[str]:
+        async with websockets.connect(url) as ws:
+            await ws.send(json.dumps({"type": "subscribe", "job_id": args.job_id}))
+            async for raw in ws:
+                message = json.loads(raw)
+                for line in format_watch_message(message):
+                    print(line, flush=True)
+                if message.get("type") in _WATCH_DONE:
+                    return message["type"]
+        return None
+
+    try:
+        outcome = asyncio.run(follow())
+    except (OSError, websockets.exceptions.WebSocketException) as e:
+        print(f"Error: cannot follow the job on {url}: {e}")
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0 if outcome == "render_complete" else 1
+
+
 def main():
     parser = argparse.ArgumentParser(description="CedarToy Renderer")
     subparsers = parser.add_subparsers(dest="command")
@@ -244,18 +331,42 @@ def main():
     serve_parser = subparsers.add_parser("serve", help="Start web preview server")
     serve_parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
 
-    # UI
+    # UI (defaults come from the server settings; that module is light to import)
+    from .server.settings import ServerSettings
     ui_parser = subparsers.add_parser("ui", help="Start web UI server")
     ui_parser.add_argument("--port", type=int, default=8080, help="Server port")
     ui_parser.add_argument("--no-browser", action="store_true", help="Do not open browser automatically")
+    ui_parser.add_argument("--no-prewarm-thumbnails", dest="prewarm_thumbnails", action="store_false",
+                           help="Do not render missing shader library thumbnails at start-up")
+    ui_parser.add_argument("--render-workers", type=int, default=ServerSettings.render_workers,
+                           help="Render workers, i.e. renders run at once (one per GPU)")
+    ui_parser.add_argument("--ram-budget-mb", type=float, default=None,
+                           help="RAM running renders may reserve (default: 80%% of free RAM at start-up)")
+    ui_parser.add_argument("--worker-max-jobs", type=int, default=ServerSettings.worker_max_jobs,
+                           help="Jobs a render worker runs before it is replaced")
+    ui_parser.add_argument("--worker-memory-budget-mb", type=float,
+                           default=ServerSettings.worker_memory_budget_mb,
+                           help="RSS above which a render worker is replaced after its job")
+
+    # Watch
+    watch_parser = subparsers.add_parser("watch", help="Follow a render job on a running UI server")
+    watch_parser.add_argument("job_id", help="Render job ID")
+    watch_parser.add_argument("--url", default="http://localhost:8080", help="UI server URL")
+
+    # Farm agent
+    from . import farm_agent
+    agent_parser = subparsers.add_parser("farm-agent", help="Render chunks leased from a farm coordinator")
+    farm_agent.add_arguments(agent_parser)
 
     args = parser.parse_args()
     
     if args.command == "wizard":
+        from .ui import run_wizard
         run_wizard()
         return
         
     if args.command == "serve":
+        from .webserver import run_server
         run_server(port=args.port)
         return
 
@@ -263,7 +374,16 @@ def main():
         run_ui_server(args)
         return
 
+    if args.command == "watch":
+        sys.exit(run_watch(args))
+
+    if args.command == "farm-agent":
+        sys.exit(farm_agent.run(args))
+
     if args.command == "render":
+        from .config import build_config
+        from .render import Renderer
+
         if not args.shader and not args.config:
             parser.error("render requires a shader path or --config with a 'shader' entry.")
             
@@ -280,6 +400,11 @@ def main():
                         val = True
                     elif val.lower() == "false":
                         val = False
+                if opt.type == "dict" and isinstance(val, str):
+                    try:
+                        val = json.loads(val)
+                    except json.JSONDecodeError as e:
+                        parser.error(f"--{opt.name.replace('_', '-')} must be a JSON object: {e}")
                 cli_args[opt.name] = val
         
         # Shader path from positional arg overrides
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Dict, Literal, Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
@@ -31,9 +31,11 @@ class CedarToyConfig(BaseModel):
     default_bit_depth: BitDepth = "8"
     audio_path: Optional[Path] = None
     audio_mode: AudioMode = "both"
+    audio_history_sec: float = 0.0
     bundle_path: Optional[Path] = None
     bundle_mode: BundleMode = "auto"
     bundle_blend: float = 0.5
+    bundle_adsr: Dict[str, Tuple[float, float, float, float]] = Field(default_factory=dict)
     camera_mode: CameraMode = "2d"
     camera_stereo: StereoMode = "none"
     camera_fov: float = 90.0
@@ -82,6 +84,13 @@ class CedarToyConfig(BaseModel):
             raise ValueError("shutter must be between 0 and 1")
         return value
 
+    @field_validator("audio_history_sec")
+    @classmethod
+    def _audio_history_non_negative(cls, value: float) -> float:
+        if value < 0:
+            raise ValueError("audio_history_sec must be 0 (whole song) or positive")
+        return value
+
     @field_validator("bundle_blend")
     @classmethod
     def _bundle_blend_in_unit_range(cls, value: float) -> float:
@@ -89,6 +98,16 @@ class CedarToyConfig(BaseModel):
             raise ValueError("bundle_blend must be between 0 and 1")
         return value
 
+    @field_validator("bundle_adsr")
+    @classmethod
+    def _bundle_adsr_valid(cls, value: Dict[str, Tuple[float, float, float, float]]):
+        for name, (attack, decay, sustain, release) in value.items():
+            if min(attack, decay, release) < 0:
+                raise ValueError(f"bundle_adsr[{name}] times must be non-negative")
+            if sustain < 0 or sustain > 1:
+                raise ValueError(f"bundle_adsr[{name}] sustain must be between 0 and 1")
+        return value
+
     @property
     def camera_params(self) -> Dict[str, float]:
         return {"tilt_deg": self.camera_tilt_deg, "ipd": self.camera_ipd}
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from enum import StrEnum
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 
 class DiagnosticSeverity(StrEnum):
@@ -35,6 +35,41 @@ class DiagnosticResult:
         }
 
 
+# Interpreter, GL driver and audio analysis of a render worker, before buffers.
+WORKER_BASE_BYTES = 512 * 1024**2
+
+
+def _rgba32_buffer_bytes(config: Dict[str, Any]) -> Tuple[int, int]:
+    """(full-frame, per-tile) RGBA32 buffer sizes at the internal resolution."""
+    width = int(config.get("width", 1920))
+    height = int(config.get("height", 1080))
+    ss_scale = float(config.get("ss_scale", 1.0))
+    tiles_x = max(1, int(config.get("tiles_x", 1)))
+    tiles_y = max(1, int(config.get("tiles_y", 1)))
+
+    internal_width = max(1, int(round(width * ss_scale)))
+    internal_height = max(1, int(round(height * ss_scale)))
+    full_rgba32_bytes = internal_width * internal_height * 4 * 4
+    tile_rgba32_bytes = (
+        ((internal_width + tiles_x - 1) // tiles_x)
+        * ((internal_height + tiles_y - 1) // tiles_y)
+        * 4
+        * 4
+    )
+    return full_rgba32_bytes, tile_rgba32_bytes
+
+
+def estimate_memory_bytes(config: Dict[str, Any]) -> int:
+    """Rough peak host RAM of one render job, for admission control.
+
+    A tile is rendered and read back (two tile buffers); tiles are then
+    stitched into a full frame in RAM unless ``disk_streaming`` is on.
+    """
+    full_rgba32_bytes, tile_rgba32_bytes = _rgba32_buffer_bytes(config)
+    stitched = 0 if config.get("disk_streaming") is True else full_rgba32_bytes
+    return WORKER_BASE_BYTES + 2 * tile_rgba32_bytes + stitched
+
+
 def run_preflight_checks(config: Dict[str, Any]) -> DiagnosticResult:
     items: List[DiagnosticItem] = []
     shader = Path(str(config.get("shader", "")))
@@ -52,23 +87,10 @@ def run_preflight_checks(config: Dict[str, Any]) -> DiagnosticResult:
             f"Shader path is not a file: {shader}",
         ))
 
-    width = int(config.get("width", 1920))
-    height = int(config.get("height", 1080))
-    ss_scale = float(config.get("ss_scale", 1.0))
-    tiles_x = int(config.get("tiles_x", 1))
-    tiles_y = int(config.get("tiles_y", 1))
-
-    internal_width = max(1, int(round(width * ss_scale)))
-    internal_height = max(1, int(round(height * ss_scale)))
-    full_rgba32_bytes = internal_width * internal_height * 4 * 4
-    tile_rgba32_bytes = (
-        ((internal_width + tiles_x - 1) // tiles_x)
-        * ((internal_height + tiles_y - 1) // tiles_y)
-        * 4
-        * 4
-    )
+    full_rgba32_bytes, tile_rgba32_bytes = _rgba32_buffer_bytes(config)
 
-    if full_rgba32_bytes > 4 * 1024**3 and tiles_x * tiles_y == 1:
+    untiled = int(config.get("tiles_x", 1)) * int(config.get("tiles_y", 1)) == 1
+    if full_rgba32_bytes > 4 * 1024**3 and untiled:
         gb = full_rgba32_bytes / 1024**3
         items.append(DiagnosticItem(
             DiagnosticSeverity.WARNING,
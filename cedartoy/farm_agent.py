@@ -0,0 +1,188 @@
+"""Render farm agent: leases frame chunks from a coordinator and renders them.
+
+Run one per render host, pointed at the server running the coordinator
+(``cedartoy.server.farm``)::
+
+    python -m cedartoy.farm_agent --server http://render-head:8080
+
+The agent asks ``/api/farm/lease`` for work and renders each chunk on a
+warm render worker (``cedartoy.render_worker``). While it renders, it
+sends a heartbeat every third of the lease with the frames done so far,
+and at the end it reports ``complete`` or ``fail``. A refused heartbeat
+(409) means the chunk is no longer this agent's: the lease ran out and
+the chunk went to another agent, or the job was cancelled. The render is
+then stopped. Several agents on one machine can stand in for hosts when
+testing.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# The CLI imports this module to build its parser, so urllib.request and
+# yaml are imported where they are used.
+
+POLL_SEC = 2.0
+
+
+class LeaseRefused(Exception):
+    """The coordinator answered 409: the agent no longer holds the chunk."""
+
+
+def post_json(server: str, path: str, payload: Dict[str, Any], timeout: float = 10.0) -> Dict[str, Any]:
+    """POST ``payload`` to the coordinator; ``LeaseRefused`` on 409, ``OSError`` if unreachable."""
+    import urllib.error
+    import urllib.request
+
+    request = urllib.request.Request(
+        server.rstrip("/") + path, data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        if e.code == 409:
+            raise LeaseRefused(e.read().decode("utf-8", "replace")) from None
+        raise
+
+
+class FarmAgent:
+    def __init__(self, server: str = "", agent_id: Optional[str] = None, pool: Optional[Any] = None,
+                 work_dir: Optional[Path] = None, output_dir: Optional[str] = None,
+                 post: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                 poll_sec: float = POLL_SEC):
+        self.agent_id = agent_id or f"{socket.gethostname()}-{os.getpid()}"
+        if pool is None:
+            from cedartoy.server.render_pool import RenderWorkerPool
+            pool = RenderWorkerPool(size=1)
+        self.pool = pool
+        self.work_dir = Path(work_dir or tempfile.mkdtemp(prefix="cedartoy-agent-"))
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = output_dir
+        self.post = post or (lambda path, payload: post_json(server, path, payload))
+        self.poll_sec = poll_sec
+
+    def run(self, max_chunks: Optional[int] = None) -> int:
+        """Lease and render chunks until stopped (or ``max_chunks`` were rendered)."""
+        rendered = 0
+        while max_chunks is None or rendered < max_chunks:
+            try:
+                lease = self.post("/api/farm/lease", {"agent_id": self.agent_id})["lease"]
+            except OSError as e:
+                print(f"[agent {self.agent_id}] coordinator unreachable: {e}", flush=True)
+                lease = None
+            if lease is None:
+                time.sleep(self.poll_sec)
+                continue
+            self.render_chunk(lease)
+            rendered += 1
+        return rendered
+
+    def render_chunk(self, lease: Dict[str, Any]) -> str:
+        """Render one leased chunk; returns ``"complete"``, ``"failed"`` or ``"lost"``."""
+        import yaml
+
+        job_id, chunk = lease["job_id"], lease["chunk"]
+        tag = f"[agent {self.agent_id}] chunk {chunk} (frames {lease['frame_start']}-{lease['frame_end']})"
+        config = dict(lease["config"])
+        if self.output_dir:
+            config["output_dir"] = self.output_dir
+        config_file = self.work_dir / f"{job_id}-{chunk}.yaml"
+        config_file.write_text(yaml.safe_dump(config, sort_keys=False), encoding="utf-8")
+        report = {"agent_id": self.agent_id, "job_id": job_id, "chunk": chunk}
+
+        state: Dict[str, Any] = {"frames_done": 0, "error": ""}
+        lost = threading.Event()
+        stop = threading.Event()
+        worker = self.pool.acquire()
+
+        def on_line(line: str) -> None:
+            if line.startswith("[PROGRESS]"):
+                try:
+                    state["frames_done"] = int(json.loads(line[10:])["frame"])
+                except (ValueError, KeyError, TypeError):
+                    pass
+            elif line.startswith("[ERROR]"):
+                try:
+                    state["error"] = json.loads(line[7:]).get("message", "")
+                except (ValueError, AttributeError):
+                    state["error"] = line[7:].strip()
+
+        def heartbeat() -> None:
+            while not stop.wait(float(lease["lease_sec"]) / 3):
+                try:
+                    self.post("/api/farm/heartbeat", {**report, "frames_done": state["frames_done"]})
+                except LeaseRefused:
+                    lost.set()
+                    worker.terminate()
+                    return
+                except OSError:
+                    pass  # keep rendering; the lease may survive a short outage
+
+        print(f"{tag}: rendering", flush=True)
+        beating = threading.Thread(target=heartbeat, daemon=True)
+        beating.start()
+        try:
+            code = worker.run(f"{job_id}-{chunk}", str(config_file), on_line)
+        finally:
+            stop.set()
+            beating.join()
+            self.pool.release(worker)
+            config_file.unlink(missing_ok=True)
+
+        try:
+            if lost.is_set():
+                outcome = "lost"
+            elif code == 0:
+                self.post("/api/farm/complete", {**report, "frames_done": state["frames_done"]})
+                outcome = "complete"
+            else:
+                message = state["error"] or f"render exited with code {code}"
+                self.post("/api/farm/fail", {**report, "message": message})
+                outcome = "failed"
+        except LeaseRefused:
+            outcome = "lost"
+        print(f"{tag}: {outcome}", flush=True)
+        return outcome
+
+    def close(self) -> None:
+        shutdown = getattr(self.pool, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--server", default="http://localhost:8080", help="Coordinator (UI server) URL")
+    parser.add_argument("--agent-id", help="Name shown on the coordinator (default: host-pid)")
+    parser.add_argument("--output-dir", help="Write frames here instead of the job's output_dir")
+    parser.add_argument("--poll-sec", type=float, default=POLL_SEC, help="Wait between lease requests when idle")
+
+
+def run(args: argparse.Namespace) -> int:
+    agent = FarmAgent(args.server, agent_id=args.agent_id, output_dir=args.output_dir, poll_sec=args.poll_sec)
+    print(f"Farm agent {agent.agent_id} polling {args.server}", flush=True)
+    try:
+        agent.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        agent.close()
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="CedarToy render farm agent")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
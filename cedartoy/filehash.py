@@ -0,0 +1,133 @@
+"""Memoized sha256 of large files (song masters, stems).
+
+Hashing a 1–2 GB WAV is seconds of pure I/O, and both the renderer
+(``musicue.load_for_audio``) and the project loader verify the audio on
+every call. Digests are cached under a (resolved path, size, mtime_ns,
+inode) key and persisted in ~/.cedartoy/hash_cache.json, so a file is
+only re-read after it actually changes.
+
+``sha256_async`` runs the hash on a background thread and de-duplicates
+concurrent requests for the same file.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+HASH_CACHE_PATH = Path.home() / ".cedartoy" / "hash_cache.json"
+MAX_ENTRIES = 512  # oldest entries are dropped beyond this
+
+_lock = threading.Lock()
+_entries: dict[str, dict] | None = None  # resolved path -> {"key": [...], "sha256": str}
+_loaded_from: Path | None = None
+_pending: dict[tuple, Future] = {}
+_executor: ThreadPoolExecutor | None = None
+
+
+def file_key(path: Path) -> tuple[str, int, int, int]:
+    """(resolved path, size, mtime_ns, inode) — changes whenever the file does."""
+    resolved = Path(path).resolve()
+    st = resolved.stat()
+    return (str(resolved), st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def sha256_file(path: Path, chunk: int = 1024 * 1024) -> str:
+    """Uncached sha256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while data := f.read(chunk):
+            h.update(data)
+    return h.hexdigest()
+
+
+def _cache() -> dict[str, dict]:
+    # Caller holds _lock. Reload when HASH_CACHE_PATH is repointed (tests).
+    global _entries, _loaded_from
+    if _entries is None or _loaded_from != HASH_CACHE_PATH:
+        _loaded_from = HASH_CACHE_PATH
+        try:
+            _entries = json.loads(HASH_CACHE_PATH.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            _entries = {}
+        except Exception as e:
+            _logger.warning("Ignoring unreadable hash cache %s: %s", HASH_CACHE_PATH, e)
+            _entries = {}
+    return _entries
+
+
+def _persist(entries: dict[str, dict]) -> None:
+    try:
+        HASH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = HASH_CACHE_PATH.with_name(HASH_CACHE_PATH.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries), encoding="utf-8")
+        os.replace(tmp, HASH_CACHE_PATH)
+    except OSError as e:
+        _logger.warning("Could not write hash cache %s: %s", HASH_CACHE_PATH, e)
+
+
+def peek_sha256(path: Path) -> str | None:
+    """Cached digest if the file is unchanged since it was hashed, else None."""
+    key = file_key(path)
+    with _lock:
+        entry = _cache().get(key[0])
+    if entry is not None and tuple(entry["key"]) == key:
+        return entry["sha256"]
+    return None
+
+
+def _store(key: tuple[str, int, int, int], digest: str) -> None:
+    with _lock:
+        entries = _cache()
+        entries.pop(key[0], None)
+        entries[key[0]] = {"key": list(key), "sha256": digest}
+        while len(entries) > MAX_ENTRIES:
+            entries.pop(next(iter(entries)))
+        _persist(entries)
+
+
+def cached_sha256(path: Path) -> str:
+    """sha256 of ``path``, re-reading the file only if it changed."""
+    digest = peek_sha256(path)
+    if digest is not None:
+        return digest
+    key = file_key(path)
+    digest = sha256_file(path)
+    _store(key, digest)
+    return digest
+
+
+def sha256_async(path: Path) -> Future:
+    """Hash ``path`` on the background thread; resolved immediately on a cache hit.
+
+    Callers asking for the same unchanged file while it is being hashed
+    share one Future.
+    """
+    global _executor
+    digest = peek_sha256(path)
+    if digest is not None:
+        done: Future = Future()
+        done.set_result(digest)
+        return done
+    key = file_key(path)
+    with _lock:
+        future = _pending.get(key)
+        if future is not None:
+            return future
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cedartoy-hash")
+        future = _executor.submit(cached_sha256, Path(key[0]))
+        _pending[key] = future
+
+    def _forget(_f: Future) -> None:
+        with _lock:
+            _pending.pop(key, None)
+
+    future.add_done_callback(_forget)
+    return future
@@ -11,13 +11,16 @@ import hashlib
 import json
 import logging
 import math
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from pydantic import BaseModel, Field, ValidationError
 
+from .filehash import cached_sha256
+
 SUPPORTED_SCHEMA_MAJOR = 1
 _logger = logging.getLogger(__name__)
 
@@ -116,6 +119,189 @@ def load_bundle(path: Path) -> MusiCueBundle:
         raise ValueError(f"Bundle {path} failed validation: {exc}") from exc
 
 
+# ---- Compiled (columnar) bundles ----
+
+COMPILED_CACHE_DIR = Path.home() / ".cedartoy" / "cache" / "bundles"
+_COMPILED_FORMAT = 1
+
+_BEAT_DTYPE = np.dtype([
+    ("t", "f8"), ("beat_in_bar", "i8"), ("bar", "i8"),
+    ("is_downbeat", "?"), ("confidence", "f8"),
+])
+_DRUM_DTYPE = np.dtype([("t", "f8"), ("strength", "f8"), ("confidence", "f8")])
+_MIDI_DTYPE = np.dtype([("t", "f8"), ("duration", "f8"), ("pitch", "i4"), ("velocity", "i4")])
+
+
+@dataclass
+class CompiledCurve:
+    """``StemEnergyCurve`` with its values held as a float64 array."""
+    hop_sec: float
+    values: np.ndarray
+
+
+@dataclass
+class CompiledBundle:
+    """A MusiCueBundle stored column-wise in NumPy arrays.
+
+    Beats, drum onsets and MIDI notes are structured arrays (one field per
+    model attribute) and energy curves are plain float arrays, so dense
+    bundles load without building a pydantic object per element. Sections,
+    tempo and the cuesheet are small and stay as models / dicts.
+    """
+    schema_version: str
+    source_sha256: str
+    duration_sec: float
+    fps: float
+    tempo: TempoInfo
+    sections: List[SectionBundleEntry]
+    cuesheet: Dict[str, Any]
+    beats: np.ndarray
+    drums: Dict[str, np.ndarray]
+    midi: Dict[str, np.ndarray]
+    midi_energy: Dict[str, CompiledCurve]
+    stems_energy: Dict[str, CompiledCurve]
+    global_energy: CompiledCurve
+
+    @classmethod
+    def from_bundle(cls, bundle: MusiCueBundle) -> "CompiledBundle":
+        def curve(c: StemEnergyCurve) -> CompiledCurve:
+            return CompiledCurve(c.hop_sec, np.asarray(c.values, dtype=np.float64))
+
+        return cls(
+            schema_version=bundle.schema_version,
+            source_sha256=bundle.source_sha256,
+            duration_sec=bundle.duration_sec,
+            fps=bundle.fps,
+            tempo=bundle.tempo,
+            sections=list(bundle.sections),
+            cuesheet=bundle.cuesheet,
+            beats=np.array(
+                [(b.t, b.beat_in_bar, b.bar, b.is_downbeat, b.confidence) for b in bundle.beats],
+                dtype=_BEAT_DTYPE,
+            ),
+            drums={
+                k: np.array(
+                    [(o.t, o.strength, math.nan if o.confidence is None else o.confidence)
+                     for o in v],
+                    dtype=_DRUM_DTYPE,
+                )
+                for k, v in bundle.drums.items()
+            },
+            midi={
+                k: np.array([(n.t, n.duration, n.pitch, n.velocity) for n in v], dtype=_MIDI_DTYPE)
+                for k, v in bundle.midi.items()
+            },
+            midi_energy={k: curve(v) for k, v in bundle.midi_energy.items()},
+            stems_energy={k: curve(v) for k, v in bundle.stems_energy.items()},
+            global_energy=curve(bundle.global_energy),
+        )
+
+    def save(self, path: Path, source_key: Tuple[int, int]) -> None:
+        """Write as an uncompressed ``.npz`` tagged with the source's stat key."""
+        header = {
+            "format": _COMPILED_FORMAT,
+            "source_key": list(source_key),
+            "schema_version": self.schema_version,
+            "source_sha256": self.source_sha256,
+            "duration_sec": self.duration_sec,
+            "fps": self.fps,
+            "tempo": self.tempo.model_dump(),
+            "sections": [s.model_dump() for s in self.sections],
+            "cuesheet": self.cuesheet,
+            "drums": list(self.drums),
+            "midi": list(self.midi),
+            "midi_energy": {k: c.hop_sec for k, c in self.midi_energy.items()},
+            "stems_energy": {k: c.hop_sec for k, c in self.stems_energy.items()},
+            "global_energy": self.global_energy.hop_sec,
+        }
+        # Arrays are keyed by position, not name, so odd class names are safe.
+        arrays: Dict[str, np.ndarray] = {
+            "header": np.array(json.dumps(header)),
+            "beats": self.beats,
+            "global_energy": self.global_energy.values,
+        }
+        arrays.update({f"drums_{i}": v for i, v in enumerate(self.drums.values())})
+        arrays.update({f"midi_{i}": v for i, v in enumerate(self.midi.values())})
+        arrays.update({f"midi_energy_{i}": c.values for i, c in enumerate(self.midi_energy.values())})
+        arrays.update({f"stems_energy_{i}": c.values for i, c in enumerate(self.stems_energy.values())})
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, source_key: Optional[Tuple[int, int]] = None) -> Optional["CompiledBundle"]:
+        """Read a compiled bundle; None if missing, stale or unreadable."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                header = json.loads(str(data["header"]))
+                if header.get("format") != _COMPILED_FORMAT:
+                    return None
+                if source_key is not None and tuple(header["source_key"]) != tuple(source_key):
+                    return None
+
+                def curves(name: str) -> Dict[str, CompiledCurve]:
+                    return {
+                        k: CompiledCurve(hop, data[f"{name}_{i}"])
+                        for i, (k, hop) in enumerate(header[name].items())
+                    }
+
+                return cls(
+                    schema_version=header["schema_version"],
+                    source_sha256=header["source_sha256"],
+                    duration_sec=header["duration_sec"],
+                    fps=header["fps"],
+                    tempo=TempoInfo.model_validate(header["tempo"]),
+                    sections=[SectionBundleEntry.model_validate(s) for s in header["sections"]],
+                    cuesheet=header["cuesheet"],
+                    beats=data["beats"],
+                    drums={k: data[f"drums_{i}"] for i, k in enumerate(header["drums"])},
+                    midi={k: data[f"midi_{i}"] for i, k in enumerate(header["midi"])},
+                    midi_energy=curves("midi_energy"),
+                    stems_energy=curves("stems_energy"),
+                    global_energy=CompiledCurve(header["global_energy"], data["global_energy"]),
+                )
+        except FileNotFoundError:
+            return None
+        except Exception as exc:  # corrupt / truncated cache: rebuild it
+            _logger.debug("Ignoring unreadable compiled bundle %s: %s", path, exc)
+            return None
+
+
+def file_stat_key(path: Path) -> Tuple[int, int]:
+    """(size, mtime_ns) — changes whenever the file is rewritten."""
+    st = Path(path).stat()
+    return (st.st_size, st.st_mtime_ns)
+
+
+def compiled_cache_path(path: Path) -> Path:
+    digest = hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:16]
+    return COMPILED_CACHE_DIR / f"{Path(path).stem}-{digest}.npz"
+
+
+def load_compiled_bundle(path: Path) -> CompiledBundle:
+    """Load a bundle through the compiled ``.npz`` cache.
+
+    A hit (same size and mtime as when it was compiled) skips JSON parsing
+    and pydantic validation entirely. A miss goes through ``load_bundle``
+    — so errors are reported exactly as before — then refreshes the cache.
+    """
+    key = file_stat_key(path)
+    cache_path = compiled_cache_path(path)
+    compiled = CompiledBundle.load(cache_path, source_key=key)
+    if compiled is not None:
+        return compiled
+
+    compiled = CompiledBundle.from_bundle(load_bundle(path))
+    try:
+        compiled.save(cache_path, key)
+    except OSError as exc:
+        _logger.warning("Could not write compiled bundle cache %s: %s", cache_path, exc)
+    return compiled
+
+
 _DEFAULT_ADSR = (0.0, 0.08, 0.0, 0.0)
 # Attack=0 (instantaneous): visual impulses are sub-frame flashes; ramping
 # from 0 over 5ms means a frame landing exactly on an event sees 0.
@@ -133,8 +319,24 @@ def _adsr_value(t_since: float, adsr: Tuple[float, float, float, float], strengt
     return strength * s
 
 
-def _sample_curve(curve: "StemEnergyCurve", t: float) -> float:
-    if not curve.values or curve.hop_sec <= 0:
+def _adsr_values(t_since: np.ndarray, adsr: Tuple[float, float, float, float], strength: np.ndarray) -> np.ndarray:
+    """Vectorized ``_adsr_value`` for non-negative ``t_since``."""
+    a, d, s, _r = adsr
+    out = strength * s
+    in_decay = t_since < a + d
+    if d > 0:
+        progress = (t_since - a) / d
+        out = np.where(in_decay, strength * (1.0 - progress * (1.0 - s)), out)
+    in_attack = t_since < a
+    if a > 0:
+        out = np.where(in_attack, strength * (t_since / a), out)
+    else:
+        out = np.where(in_attack, strength, out)
+    return out
+
+
+def _sample_curve(curve: "StemEnergyCurve | CompiledCurve", t: float) -> float:
+    if len(curve.values) == 0 or curve.hop_sec <= 0:
         return 0.0
     idx_f = t / curve.hop_sec
     i0 = int(idx_f)
@@ -146,6 +348,76 @@ def _sample_curve(curve: "StemEnergyCurve", t: float) -> float:
     return float(curve.values[i0]) * (1.0 - frac) + float(curve.values[i0 + 1]) * frac
 
 
+def _sample_curve_range(curve: "StemEnergyCurve | CompiledCurve", t: np.ndarray) -> np.ndarray:
+    if len(curve.values) == 0 or curve.hop_sec <= 0:
+        return np.zeros(len(t), dtype=np.float64)
+    values = np.asarray(curve.values, dtype=np.float64)
+    return np.interp(t, np.arange(len(values)) * curve.hop_sec, values)
+
+
+@dataclass
+class _DrumTrack:
+    """Sorted onsets of one drum class plus the data for windowed evaluation.
+
+    Only onsets younger than attack+decay still change shape; everything
+    older contributes ``sustain * strength``, which a prefix sum answers.
+    Evaluation is therefore a bisect plus the (short) active window,
+    independent of how far into the song ``t`` is.
+    """
+    times: List[float]
+    strengths: List[float]
+    cumulative: List[float]
+    adsr: Tuple[float, float, float, float]
+
+    @classmethod
+    def from_arrays(
+        cls,
+        times: np.ndarray,
+        strengths: np.ndarray,
+        adsr: Tuple[float, float, float, float],
+    ) -> "_DrumTrack":
+        order = np.argsort(times, kind="stable")
+        strengths = np.asarray(strengths, dtype=np.float64)[order]
+        cumulative = np.concatenate([[0.0], np.cumsum(strengths)])
+        return cls(
+            times=np.asarray(times, dtype=np.float64)[order].tolist(),
+            strengths=strengths.tolist(),
+            cumulative=cumulative.tolist(),
+            adsr=adsr,
+        )
+
+    @property
+    def support(self) -> float:
+        a, d, _s, _r = self.adsr
+        return a + d
+
+    def value_at(self, t: float) -> float:
+        sustain = self.adsr[2]
+        hi = bisect.bisect_right(self.times, t)
+        lo = bisect.bisect_right(self.times, t - self.support, 0, hi)
+        value = sustain * self.cumulative[hi]
+        for i in range(lo, hi):
+            strength = self.strengths[i]
+            value += _adsr_value(t - self.times[i], self.adsr, strength) - sustain * strength
+        return min(1.0, max(0.0, value))
+
+    def values_at(self, t: np.ndarray) -> np.ndarray:
+        sustain = self.adsr[2]
+        ev_t = np.asarray(self.times, dtype=np.float64)
+        ev_s = np.asarray(self.strengths, dtype=np.float64)
+        hi = np.searchsorted(ev_t, t, side="right")
+        lo = np.searchsorted(ev_t, t - self.support, side="right")
+        value = sustain * np.asarray(self.cumulative, dtype=np.float64)[hi]
+        depth = int((hi - lo).max()) if len(t) else 0
+        for k in range(depth):
+            idx = lo + k
+            m = idx < hi
+            strength = ev_s[idx[m]]
+            shape = _adsr_values(t[m] - ev_t[idx[m]], self.adsr, strength)
+            value[m] += shape - sustain * strength
+        return np.clip(value, 0.0, 1.0)
+
+
 @dataclass
 class EvalFrame:
     bpm: float = 0.0
@@ -158,25 +430,120 @@ class EvalFrame:
     stems_energy: Dict[str, float] = field(default_factory=dict)
 
 
+@dataclass
+class EvalTimeline:
+    """Struct-of-arrays EvalFrame values from ``frame_start`` onwards.
+
+    Built once by ``BundleEvaluator.evaluate_range``; ``frame()`` is then
+    an O(1) index instead of a fresh evaluation. Rows are spaced
+    ``1 / (fps * oversample)`` seconds apart so ``at_time()`` can serve
+    sub-frame (temporal sample) times.
+    """
+    frame_start: int
+    fps: float
+    oversample: int
+    bpm: np.ndarray
+    beat_phase: np.ndarray
+    bar: np.ndarray
+    section_energy: np.ndarray
+    global_energy: np.ndarray
+    drum_pulses: Dict[str, np.ndarray] = field(default_factory=dict)
+    midi_energy: Dict[str, np.ndarray] = field(default_factory=dict)
+    stems_energy: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.bpm) // self.oversample
+
+    def __contains__(self, frame_index: int) -> bool:
+        return 0 <= frame_index - self.frame_start < len(self)
+
+    def _row(self, i: int) -> EvalFrame:
+        return EvalFrame(
+            bpm=float(self.bpm[i]),
+            beat_phase=float(self.beat_phase[i]),
+            bar=int(self.bar[i]),
+            section_energy=float(self.section_energy[i]),
+            global_energy=float(self.global_energy[i]),
+            drum_pulses={k: float(v[i]) for k, v in self.drum_pulses.items()},
+            midi_energy={k: float(v[i]) for k, v in self.midi_energy.items()},
+            stems_energy={k: float(v[i]) for k, v in self.stems_energy.items()},
+        )
+
+    def row_of(self, frame_index: int) -> int:
+        """Row holding ``frame_index`` (for arrays aligned with the timeline)."""
+        return (frame_index - self.frame_start) * self.oversample
+
+    def frame(self, frame_index: int) -> EvalFrame:
+        return self._row(self.row_of(frame_index))
+
+    def position(self, t: float) -> float:
+        """Fractional row for time ``t``."""
+        return (t * self.fps - self.frame_start) * self.oversample
+
+    def covers(self, t: float) -> bool:
+        return 0.0 <= self.position(t) <= len(self.bpm) - 1
+
+    def at_time(self, t: float) -> EvalFrame:
+        """EvalFrame at a continuous time inside the timeline.
+
+        Energies and pulses interpolate linearly between rows; the beat
+        phase (which wraps 1 -> 0) and the bar come from the nearest row.
+        """
+        pos = min(max(self.position(t), 0.0), len(self.bpm) - 1)
+        i0 = int(math.floor(pos))
+        i1 = min(i0 + 1, len(self.bpm) - 1)
+        frac = pos - i0
+        nearest = i1 if frac >= 0.5 else i0
+
+        def lerp(values: np.ndarray) -> float:
+            return float(values[i0] * (1.0 - frac) + values[i1] * frac)
+
+        return EvalFrame(
+            bpm=lerp(self.bpm),
+            beat_phase=float(self.beat_phase[nearest]),
+            bar=int(self.bar[nearest]),
+            section_energy=float(self.section_energy[nearest]),
+            global_energy=lerp(self.global_energy),
+            drum_pulses={k: lerp(v) for k, v in self.drum_pulses.items()},
+            midi_energy={k: lerp(v) for k, v in self.midi_energy.items()},
+            stems_energy={k: lerp(v) for k, v in self.stems_energy.items()},
+        )
+
+
 class BundleEvaluator:
-    def __init__(self, bundle: MusiCueBundle, fps: float):
+    def __init__(
+        self,
+        bundle: Union[MusiCueBundle, CompiledBundle],
+        fps: float,
+        adsr: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+    ):
         if fps <= 0:
             raise ValueError("fps must be positive")
         self.bundle = bundle
         self.fps = fps
-        self._bpm_global = bundle.tempo.bpm_global
-        self._beat_times = [b.t for b in bundle.beats]
-        self._downbeats = [(b.t, b.bar) for b in bundle.beats if b.is_downbeat]
-        self._sections = sorted(bundle.sections, key=lambda s: s.start)
+        compiled = bundle if isinstance(bundle, CompiledBundle) else CompiledBundle.from_bundle(bundle)
+        self.compiled = compiled
+        self._bpm_global = compiled.tempo.bpm_global
+        beats = compiled.beats
+        self._beat_times = beats["t"].tolist()
+        downbeats = beats[beats["is_downbeat"]]
+        self._downbeats = list(zip(downbeats["t"].tolist(), downbeats["bar"].tolist()))
+        self._downbeat_times = [t for t, _bar in self._downbeats]
+        self._sections = sorted(compiled.sections, key=lambda s: s.start)
         self._beats_per_bar = (
-            bundle.tempo.time_signature[0]
-            if bundle.tempo.time_signature else 4
+            compiled.tempo.time_signature[0]
+            if compiled.tempo.time_signature else 4
         )
-        self._drums: Dict[str, List[Tuple[float, float]]] = {
-            cls: sorted([(o.t, o.strength) for o in events], key=lambda e: e[0])
-            for cls, events in bundle.drums.items()
+        self._adsr = {k: tuple(float(x) for x in v) for k, v in (adsr or {}).items()}
+        self._drums: Dict[str, _DrumTrack] = {
+            cls: _DrumTrack.from_arrays(events["t"], events["strength"], self.adsr_for(cls))
+            for cls, events in compiled.drums.items()
         }
 
+    def adsr_for(self, drum_class: str) -> Tuple[float, float, float, float]:
+        """ADSR profile for a drum class: explicit, then ``default``, then built-in."""
+        return self._adsr.get(drum_class, self._adsr.get("default", _DEFAULT_ADSR))
+
     def _beat_phase_at(self, t: float) -> float:
         times = self._beat_times
         if len(times) < 2:
@@ -191,13 +558,8 @@ class BundleEvaluator:
 
     def _bar_at(self, t: float) -> int:
         if self._downbeats:
-            bar = 0
-            for time_t, b in self._downbeats:
-                if time_t <= t:
-                    bar = b
-                else:
-                    break
-            return bar
+            idx = bisect.bisect_right(self._downbeat_times, t) - 1
+            return self._downbeats[idx][1] if idx >= 0 else 0
         bps = self._bpm_global / 60.0
         return int(t * bps / max(1, self._beats_per_bar))
 
@@ -208,30 +570,82 @@ class BundleEvaluator:
         return 0.0
 
     def _drum_pulses_at(self, t: float) -> Dict[str, float]:
-        out: Dict[str, float] = {}
-        for cls, events in self._drums.items():
-            value = 0.0
-            for event_t, strength in events:
-                if event_t > t:
-                    break
-                value += _adsr_value(t - event_t, _DEFAULT_ADSR, strength)
-            out[cls] = min(1.0, max(0.0, value))
-        return out
+        return {cls: track.value_at(t) for cls, track in self._drums.items()}
 
-    def _curve_dict_at(self, curves: Dict[str, "StemEnergyCurve"], t: float) -> Dict[str, float]:
+    def _curve_dict_at(self, curves: Dict[str, CompiledCurve], t: float) -> Dict[str, float]:
         return {k: _sample_curve(v, t) for k, v in curves.items()}
 
+    # ---- Vectorized range evaluation ----
+
+    def _beat_phase_range(self, t: np.ndarray) -> np.ndarray:
+        times = np.asarray(self._beat_times, dtype=np.float64)
+        out = np.zeros(len(t), dtype=np.float64)
+        if len(times) < 2:
+            return out
+        idx = np.searchsorted(times, t, side="right") - 1
+        valid = (idx >= 0) & (idx < len(times) - 1)
+        i = np.clip(idx, 0, len(times) - 2)
+        span = times[i + 1] - times[i]
+        valid &= span > 0
+        phase = (t - times[i]) / np.where(span > 0, span, 1.0)
+        out[valid] = np.clip(phase[valid], 0.0, 1.0)
+        return out
+
+    def _bar_range(self, t: np.ndarray) -> np.ndarray:
+        if self._downbeats:
+            db_t = np.asarray([d[0] for d in self._downbeats], dtype=np.float64)
+            db_bar = np.asarray([d[1] for d in self._downbeats], dtype=np.int64)
+            idx = np.searchsorted(db_t, t, side="right") - 1
+            return np.where(idx >= 0, db_bar[np.clip(idx, 0, None)], 0)
+        bps = self._bpm_global / 60.0
+        return np.trunc(t * bps / max(1, self._beats_per_bar)).astype(np.int64)
+
+    def _section_energy_range(self, t: np.ndarray) -> np.ndarray:
+        out = np.zeros(len(t), dtype=np.float64)
+        # Reverse order so the earliest matching section wins, like the scalar scan.
+        for sec in reversed(self._sections):
+            out[(t >= sec.start) & (t < sec.end)] = sec.energy_rank
+        return out
+
+    def _drum_pulses_range(self, t: np.ndarray) -> Dict[str, np.ndarray]:
+        return {cls: track.values_at(t) for cls, track in self._drums.items()}
+
+    def evaluate_range(self, frame_start: int, frame_end: int, oversample: int = 1) -> EvalTimeline:
+        """Evaluate frames ``[frame_start, frame_end)`` in one vectorized pass.
+
+        ``oversample`` rows are produced per frame for sub-frame lookups.
+        """
+        oversample = max(1, int(oversample))
+        n = max(0, frame_end - frame_start) * oversample
+        t = (frame_start + np.arange(n, dtype=np.float64) / oversample) / self.fps
+        return EvalTimeline(
+            frame_start=frame_start,
+            fps=self.fps,
+            oversample=oversample,
+            bpm=np.full(n, self._bpm_global, dtype=np.float64),
+            beat_phase=self._beat_phase_range(t),
+            bar=self._bar_range(t),
+            section_energy=self._section_energy_range(t),
+            global_energy=_sample_curve_range(self.compiled.global_energy, t),
+            drum_pulses=self._drum_pulses_range(t),
+            midi_energy={k: _sample_curve_range(v, t) for k, v in self.compiled.midi_energy.items()},
+            stems_energy={k: _sample_curve_range(v, t) for k, v in self.compiled.stems_energy.items()},
+        )
+
     def evaluate(self, frame_index: int) -> EvalFrame:
-        t = frame_index / self.fps
+        return self.evaluate_at(frame_index / self.fps)
+
+    def evaluate_at(self, t: float) -> EvalFrame:
+        """Evaluate at a continuous time in seconds."""
         return EvalFrame(
             bpm=self._bpm_global,
             beat_phase=self._beat_phase_at(t),
             bar=self._bar_at(t),
             section_energy=self._section_energy_at(t),
-            global_energy=_sample_curve(self.bundle.global_energy, t),
+            global_energy=_sample_curve(self.compiled.global_energy, t),
             drum_pulses=self._drum_pulses_at(t),
-            midi_energy=self._curve_dict_at(self.bundle.midi_energy, t),
-            stems_energy=self._curve_dict_at(self.bundle.stems_energy, t),
+            midi_energy=self._curve_dict_at(self.compiled.midi_energy, t),
+            stems_energy=self._curve_dict_at(self.compiled.stems_energy, t),
         )
 
 
@@ -252,47 +666,78 @@ def _hann_envelope(width: int) -> np.ndarray:
 
 
 class MusicalSpectrumSynth:
-    """Synthesize a 2x512 iChannel0 texture from an EvalFrame."""
+    """Synthesize a 2x512 iChannel0 texture from an EvalFrame.
+
+    Row 0 is linear in four band weights (kick / snare+tom / hat+cymbal /
+    vocals+other MIDI energy), so it is a ``weights @ basis`` product with
+    one Hann-shaped basis row per band. ``synthesize_batch`` applies that
+    product to a whole EvalTimeline at once.
+    """
 
     def __init__(self) -> None:
         self._envelopes = {
             name: _hann_envelope(end - start)
             for name, (start, end) in _BIN_RANGES.items()
         }
-
-    def _add_range(self, row: np.ndarray, name: str, weight: float) -> None:
-        if weight <= 0:
-            return
-        s, e = _BIN_RANGES[name]
-        row[s:e] += self._envelopes[name] * weight
+        self._basis = np.zeros((len(_BIN_RANGES), 512), dtype=np.float32)
+        for i, (name, (start, end)) in enumerate(_BIN_RANGES.items()):
+            self._basis[i, start:end] = self._envelopes[name]
+
+    def _fill(self, weights: np.ndarray, section_energy: np.ndarray,
+              global_energy: np.ndarray, beat_phase: np.ndarray) -> np.ndarray:
+        """(N, 4) band weights + per-row scalars -> (N, 2, 512) textures."""
+        n = len(weights)
+        tex = np.empty((n, 2, 512), dtype=np.float32)
+        # Non-positive weights add nothing, as in the per-band formulation.
+        np.matmul(np.maximum(weights, 0.0).astype(np.float32), self._basis, out=tex[:, 0, :])
+        tex[:, 0, :] += (0.1 * section_energy).astype(np.float32)[:, None]
+        np.clip(tex[:, 0, :], 0.0, 1.0, out=tex[:, 0, :])
+
+        wave = 0.5 + 0.5 * global_energy * np.sin(2.0 * math.pi * beat_phase)
+        tex[:, 1, :] = np.clip(wave, 0.0, 1.0).astype(np.float32)[:, None]
+        return tex
 
     def synthesize(self, frame: EvalFrame) -> np.ndarray:
-        tex = np.zeros((2, 512), dtype=np.float32)
-        row0 = tex[0]
-
-        low = frame.drum_pulses.get("kick", 0.0)
-        low_mid = frame.drum_pulses.get("snare", 0.0) + frame.drum_pulses.get("tom", 0.0)
-        mid_hi = frame.drum_pulses.get("hat", 0.0) + frame.drum_pulses.get("cymbal", 0.0)
-        high = frame.midi_energy.get("vocals", 0.0) + frame.midi_energy.get("other", 0.0)
-
-        self._add_range(row0, "low", low)
-        self._add_range(row0, "low_mid", low_mid)
-        self._add_range(row0, "mid_hi", mid_hi)
-        self._add_range(row0, "high", high)
-
-        row0 += 0.1 * float(frame.section_energy)
-        np.clip(row0, 0.0, 1.0, out=row0)
-
-        wave = 0.5 + 0.5 * float(frame.global_energy) * math.sin(
-            2.0 * math.pi * float(frame.beat_phase)
+        pulses, midi = frame.drum_pulses, frame.midi_energy
+        weights = np.array([[
+            pulses.get("kick", 0.0),
+            pulses.get("snare", 0.0) + pulses.get("tom", 0.0),
+            pulses.get("hat", 0.0) + pulses.get("cymbal", 0.0),
+            midi.get("vocals", 0.0) + midi.get("other", 0.0),
+        ]], dtype=np.float64)
+        return self._fill(
+            weights,
+            np.array([frame.section_energy], dtype=np.float64),
+            np.array([frame.global_energy], dtype=np.float64),
+            np.array([frame.beat_phase], dtype=np.float64),
+        )[0]
+
+    def synthesize_batch(self, timeline: EvalTimeline) -> np.ndarray:
+        """Textures for every row of ``timeline`` as an (N, 2, 512) stack."""
+        n = len(timeline.bpm)
+        zeros = np.zeros(n, dtype=np.float64)
+        pulses, midi = timeline.drum_pulses, timeline.midi_energy
+
+        def band(source: Dict[str, np.ndarray], *names: str) -> np.ndarray:
+            return sum((source.get(name, zeros) for name in names), zeros)
+
+        weights = np.stack([
+            band(pulses, "kick"),
+            band(pulses, "snare", "tom"),
+            band(pulses, "hat", "cymbal"),
+            band(midi, "vocals", "other"),
+        ], axis=1)
+        return self._fill(
+            weights,
+            np.asarray(timeline.section_energy, dtype=np.float64),
+            np.asarray(timeline.global_energy, dtype=np.float64),
+            np.asarray(timeline.beat_phase, dtype=np.float64),
         )
-        tex[1, :] = max(0.0, min(1.0, wave))
-        return tex
 
 
 @dataclass
 class BundleLoadResult:
-    bundle: Optional[MusiCueBundle] = None
+    bundle: Optional[Union[MusiCueBundle, CompiledBundle]] = None
     path: Optional[Path] = None
     sha_match: bool = False
 
@@ -304,23 +749,26 @@ def discover_bundle_path(audio_path: Path) -> Optional[Path]:
 
 
 def compute_audio_sha256(audio_path: Path) -> str:
-    h = hashlib.sha256()
-    with open(audio_path, "rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    return cached_sha256(audio_path)
 
 
 def load_for_audio(
     audio_path: Path,
     override_path: Optional[Path] = None,
+    compiled: bool = False,
 ) -> BundleLoadResult:
+    """Find, load and sha-check the bundle for ``audio_path``.
+
+    With ``compiled=True`` the bundle comes back as a ``CompiledBundle``
+    via the on-disk cache (what the renderer wants); otherwise as the
+    validated pydantic model.
+    """
     target = override_path if override_path is not None else discover_bundle_path(audio_path)
     if target is None:
         _logger.info("No MusiCue bundle for %s; rendering with raw FFT.", audio_path)
         return BundleLoadResult()
 
-    bundle = load_bundle(target)
+    bundle = load_compiled_bundle(target) if compiled else load_bundle(target)
     audio_sha = compute_audio_sha256(audio_path)
     sha_match = bundle.source_sha256 == audio_sha
     if not sha_match:
@@ -1,7 +1,30 @@
+"""Render options shared by the CLI, the wizard, config files and the web UI.
+
+This module is imported on every CLI start, so it stays light: the EXR
+probe below runs only when EXR output is actually requested.
+"""
+import json
+import sys
 from dataclasses import dataclass, field
-from typing import Any, List, Optional, Callable
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Callable
+
+EXR_PROBE_PATH = Path.home() / ".cedartoy" / "cache" / "exr_probe.json"
+
+_exr_available: Optional[bool] = None
+
+
+def _exr_probe_key() -> Dict[str, Any]:
+    """What the probe result depends on: the interpreter and its installed imageio."""
+    from importlib import metadata
+    try:
+        dist = metadata.distribution("imageio")
+        site = Path(str(dist.locate_file("")))
+        return {"python": sys.executable, "imageio": dist.version, "site_mtime_ns": site.stat().st_mtime_ns}
+    except Exception:
+        return {"python": sys.executable, "imageio": None}
+
 
-# EXR Gating Check
 def _check_exr_available() -> bool:
     try:
         import numpy as _np
@@ -23,7 +46,39 @@ def _check_exr_available() -> bool:
     except Exception:
         return False
 
-EXR_AVAILABLE = _check_exr_available()
+
+def exr_available() -> bool:
+    """Whether imageio can write EXR here.
+
+    Probed by writing a tiny EXR file the first time it is asked. The
+    answer is kept on disk in ``EXR_PROBE_PATH``, keyed by the interpreter
+    and imageio install, so later processes skip the probe.
+    """
+    global _exr_available
+    if _exr_available is not None:
+        return _exr_available
+    key = _exr_probe_key()
+    try:
+        cached = json.loads(EXR_PROBE_PATH.read_text(encoding="utf-8"))
+        if cached.get("key") == key:
+            _exr_available = bool(cached["available"])
+            return _exr_available
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    _exr_available = _check_exr_available()
+    try:
+        EXR_PROBE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        EXR_PROBE_PATH.write_text(json.dumps({"key": key, "available": _exr_available}), encoding="utf-8")
+    except OSError:
+        pass
+    return _exr_available
+
+
+def __getattr__(name: str) -> Any:
+    # ``EXR_AVAILABLE`` used to be computed at import time; it is now probed on first access.
+    if name == "EXR_AVAILABLE":
+        return exr_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 @dataclass
 class Option:
@@ -60,13 +115,10 @@ OPTIONS.append(Option("ss_scale", "SuperSampling Scale", "float", 1.0))
 OPTIONS.append(Option("temporal_samples", "Temporal Samples", "int", 1))
 OPTIONS.append(Option("shutter", "Shutter Angle (0-1)", "float", 0.5))
 
-available_formats = ["png"]
-if EXR_AVAILABLE:
-    available_formats.append("exr")
-
+# EXR is always offered; rendering checks ``exr_available()`` when it is chosen.
 OPTIONS.append(Option(
     "default_output_format", "Default Output Format", "choice", "png",
-    choices=available_formats
+    choices=["png", "exr"]
 ))
 
 OPTIONS.append(Option(
@@ -78,6 +130,8 @@ OPTIONS.append(Option(
 # --- Audio ---
 OPTIONS.append(Option("audio_path", "Audio Path", "path", None))
 OPTIONS.append(Option("audio_mode", "Audio Mode", "choice", "both", choices=["shadertoy", "history", "both"]))
+OPTIONS.append(Option("audio_history_sec", "Audio History Window (sec)", "float", 0.0,
+    help_text="0 = whole song in iAudioHistoryTex; >0 keeps only the last N seconds in a ring buffer"))
 OPTIONS.append(Option("bundle_path", "Bundle Path", "path", None,
     help_text="Path to a MusiCue bundle JSON (defaults to sibling of audio_path)."))
 OPTIONS.append(Option("bundle_mode", "Bundle Mode", "choice", "auto",
@@ -85,6 +139,8 @@ OPTIONS.append(Option("bundle_mode", "Bundle Mode", "choice", "auto",
     help_text="auto=cued when bundle present; raw=ignore; cued=synthesized; blend=mix"))
 OPTIONS.append(Option("bundle_blend", "Bundle Blend (0-1)", "float", 0.5,
     help_text="Mix weight for cued texture when bundle_mode='blend'"))
+OPTIONS.append(Option("bundle_adsr", "Drum ADSR Profiles", "dict", {},
+    help_text='Per drum class [attack, decay, sustain, release] in seconds as JSON, e.g. {"kick": [0, 0.12, 0, 0]}; "default" applies to unlisted classes'))
 
 # --- Camera ---
 OPTIONS.append(Option("camera_mode", "Camera Mode", "choice", "2d", choices=["2d", "equirect", "ll180"]))
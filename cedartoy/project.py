@@ -15,12 +15,13 @@ audio file, the bundle, or a stem) and returns a CedarToyProject.
 """
 from __future__ import annotations
 
-import hashlib
 import json
 import logging
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from .filehash import cached_sha256, file_key, sha256_async
+
 _logger = logging.getLogger(__name__)
 
 STEM_NAMES = ("drums", "bass", "vocals", "other")
@@ -34,7 +35,16 @@ class CedarToyProject:
     stems_paths: dict[str, Path] = field(default_factory=dict)
     manifest: dict | None = None
     bundle_sha_matches_audio: bool | None = None
+    sha_pending: bool = False
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ShaCheck:
+    """Outcome of comparing the audio's sha with the bundle's recorded one."""
+    matches: bool | None
     warnings: list[str] = field(default_factory=list)
+    pending: bool = False
 
 
 def discover_audio_in_folder(folder: Path) -> Path | None:
@@ -50,12 +60,71 @@ def discover_audio_in_folder(folder: Path) -> Path | None:
     return wavs[0] if wavs else None
 
 
-def compute_audio_sha256(path: Path, chunk: int = 1024 * 1024) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        while data := f.read(chunk):
-            h.update(data)
-    return h.hexdigest()
+def discover_stems(folder: Path) -> dict[str, Path]:
+    """Existing ``stems/<name>.wav`` files, in STEM_NAMES order."""
+    stems_dir = Path(folder) / "stems"
+    if not stems_dir.is_dir():
+        return {}
+    return {
+        name: stems_dir / f"{name}.wav"
+        for name in STEM_NAMES
+        if (stems_dir / f"{name}.wav").exists()
+    }
+
+
+def compute_audio_sha256(path: Path) -> str:
+    """sha256 of the audio file; memoized until the file changes."""
+    return cached_sha256(path)
+
+
+# Resolved bundle path -> (file_key, decoded_audio_sha256). /api/project/sha
+# polls twice a second and must not re-parse a large bundle each time.
+_decoded_sha_cache: dict[str, tuple[tuple, str | None]] = {}
+
+
+def bundle_decoded_sha(bundle_path: Path) -> str | None:
+    """The bundle's ``decoded_audio_sha256``, re-read only when the file changes."""
+    key = file_key(bundle_path)
+    cached = _decoded_sha_cache.get(key[0])
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    bundle_doc = json.loads(Path(bundle_path).read_text(encoding="utf-8"))
+    decoded_sha = bundle_doc.get("decoded_audio_sha256")
+    _decoded_sha_cache[key[0]] = (key, decoded_sha)
+    return decoded_sha
+
+
+def check_bundle_sha(audio_path: Path, bundle_path: Path, background: bool = False) -> ShaCheck:
+    """Cross-check the bundle's ``decoded_audio_sha256`` against the audio.
+
+    With ``background=True`` an uncached audio file is hashed on a worker
+    thread and the result is ``pending``; call again later (the hash is
+    shared, not restarted) to collect the verdict.
+    """
+    try:
+        decoded_sha = bundle_decoded_sha(bundle_path)
+        if not decoded_sha:
+            # Legacy bundle schema 1.0 — no decoded sha available.
+            return ShaCheck(None, [
+                "Bundle schema 1.0 — audio integrity check unavailable. "
+                "Re-export from MusiCue for schema 1.1."
+            ])
+        if background:
+            future = sha256_async(audio_path)
+            if not future.done():
+                return ShaCheck(None, pending=True)
+            audio_sha = future.result()
+        else:
+            audio_sha = compute_audio_sha256(audio_path)
+    except Exception as e:
+        return ShaCheck(None, [f"sha check failed: {e}"])
+    if audio_sha == decoded_sha:
+        return ShaCheck(True)
+    return ShaCheck(False, [
+        f"Audio has changed since MusiCue exported it "
+        f"(sha {audio_sha[:12]}… vs. expected {decoded_sha[:12]}…). "
+        f"Re-export from MusiCue for fresh bundle data."
+    ])
 
 
 def _resolve_folder(target: Path) -> Path:
@@ -64,12 +133,14 @@ def _resolve_folder(target: Path) -> Path:
     return target if target.is_dir() else target.parent
 
 
-def load_project(target: Path) -> CedarToyProject:
+def load_project(target: Path, background_sha: bool = False) -> CedarToyProject:
     """Resolve any path inside a project folder to a CedarToyProject.
 
     Accepts a folder, an audio file, a bundle file, or a stem file. Walks
     up to the containing folder, locates audio/bundle/manifest/stems, and
-    cross-checks the bundle sha against the audio.
+    cross-checks the bundle sha against the audio. ``background_sha``
+    returns before an uncached audio file is hashed, with ``sha_pending``
+    set; see check_bundle_sha().
     """
     folder = _resolve_folder(Path(target))
     warnings: list[str] = []
@@ -88,36 +159,12 @@ def load_project(target: Path) -> CedarToyProject:
             warnings.append(f"manifest.json unreadable: {e}")
             manifest = None
 
-    stems_paths: dict[str, Path] = {}
-    stems_dir = folder / "stems"
-    if stems_dir.is_dir():
-        for name in STEM_NAMES:
-            p = stems_dir / f"{name}.wav"
-            if p.exists():
-                stems_paths[name] = p
+    stems_paths = discover_stems(folder)
 
-    sha_match: bool | None = None
+    sha = ShaCheck(None)
     if audio_path is not None and bundle_path is not None:
-        try:
-            bundle_doc = json.loads(bundle_path.read_text(encoding="utf-8"))
-            decoded_sha = bundle_doc.get("decoded_audio_sha256")
-            if decoded_sha:
-                audio_sha = compute_audio_sha256(audio_path)
-                sha_match = audio_sha == decoded_sha
-                if not sha_match:
-                    warnings.append(
-                        f"Audio has changed since MusiCue exported it "
-                        f"(sha {audio_sha[:12]}… vs. expected {decoded_sha[:12]}…). "
-                        f"Re-export from MusiCue for fresh bundle data."
-                    )
-            else:
-                # Legacy bundle schema 1.0 — no decoded sha available.
-                warnings.append(
-                    "Bundle schema 1.0 — audio integrity check unavailable. "
-                    "Re-export from MusiCue for schema 1.1."
-                )
-        except Exception as e:
-            warnings.append(f"sha check failed: {e}")
+        sha = check_bundle_sha(audio_path, bundle_path, background=background_sha)
+        warnings.extend(sha.warnings)
 
     return CedarToyProject(
         folder=folder,
@@ -125,6 +172,7 @@ def load_project(target: Path) -> CedarToyProject:
         bundle_path=bundle_path,
         stems_paths=stems_paths,
         manifest=manifest,
-        bundle_sha_matches_audio=sha_match,
+        bundle_sha_matches_audio=sha.matches,
+        sha_pending=sha.pending,
         warnings=warnings,
     )
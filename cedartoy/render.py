@@ -1,3 +1,4 @@
+import hashlib
 import moderngl
 import numpy as np
 import os
@@ -7,14 +8,173 @@ import time
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import math
+from collections import OrderedDict
 from dataclasses import asdict
 from datetime import datetime
 
 from .types import RenderJob, BufferConfig, MultipassGraphConfig
-from .shader import load_shader_from_file
+from .shader import load_shader_from_file, map_compile_error
 from .audio import AudioProcessor
 from .naming import resolve_output_path
-from .options_schema import EXR_AVAILABLE
+from .options_schema import exr_available
+
+
+QUAD_VERTEX_SHADER = """
+#version 430
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 uv;
+void main() {
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+    uv = in_uv;
+}
+"""
+
+
+# Where the GL driver keeps compiled shader binaries between processes.
+GL_SHADER_CACHE_DIR = Path.home() / ".cedartoy" / "cache" / "gl_shaders"
+
+
+def configure_driver_shader_cache(cache_dir: Optional[Path] = None) -> None:
+    """Point the driver's on-disk shader cache at ~/.cedartoy before a context exists.
+
+    moderngl exposes no glGetProgramBinary/glProgramBinary, so cross-process
+    reuse relies on the driver cache. Mesa (llvmpipe, radeonsi, iris) and
+    NVIDIA key it on the shader source plus the driver build and GPU. Any
+    value the user already exported wins.
+    """
+    path = Path(cache_dir or GL_SHADER_CACHE_DIR)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return
+    for var, value in (
+        ("MESA_SHADER_CACHE_DIR", str(path)),
+        ("MESA_GLSL_CACHE_DIR", str(path)),          # Mesa < 21.2
+        ("__GL_SHADER_DISK_CACHE", "1"),             # NVIDIA
+        ("__GL_SHADER_DISK_CACHE_PATH", str(path)),
+        ("__GL_SHADER_DISK_CACHE_SKIP_CLEANUP", "1"),
+    ):
+        os.environ.setdefault(var, value)
+
+
+class ProgramCache:
+    """Linked programs for one context, keyed by the assembled sources.
+
+    Buffers whose shader file and defines assemble to the same source share
+    one program; every pass re-binds all of its uniforms, so sharing is safe.
+    """
+
+    def __init__(self, ctx: moderngl.Context):
+        self.ctx = ctx
+        info = ctx.info
+        self._driver = "|".join(str(info.get(k, "")) for k in ("GL_VENDOR", "GL_RENDERER", "GL_VERSION"))
+        self._programs: Dict[str, moderngl.Program] = {}
+        self.compiled = 0
+        self.reused = 0
+
+    def key(self, vertex_shader: str, fragment_shader: str) -> str:
+        h = hashlib.sha256(self._driver.encode())
+        for part in (vertex_shader, fragment_shader):
+            h.update(b"\0")
+            h.update(part.encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, vertex_shader: str, fragment_shader: str) -> moderngl.Program:
+        key = self.key(vertex_shader, fragment_shader)
+        prog = self._programs.get(key)
+        if prog is not None:
+            self.reused += 1
+            return prog
+        prog = self.ctx.program(vertex_shader=vertex_shader, fragment_shader=fragment_shader)
+        self._programs[key] = prog
+        self.compiled += 1
+        return prog
+
+    def release(self) -> None:
+        for prog in self._programs.values():
+            prog.release()
+        self._programs.clear()
+
+
+def create_standalone_context() -> moderngl.Context:
+    """Headless GL context: the platform default (GLX/WGL/CGL), else EGL.
+
+    Render nodes and servers without an X display only have EGL.
+    """
+    configure_driver_shader_cache()
+    try:
+        return moderngl.create_context(standalone=True)
+    except Exception as default_error:
+        try:
+            return moderngl.create_context(standalone=True, backend="egl")
+        except Exception:
+            raise default_error
+
+
+class RenderResources:
+    """GL context, linked programs and audio analyses shared by successive renders.
+
+    A long-lived render worker (``cedartoy.render_worker``) passes one
+    instance to every ``Renderer``; the renderer borrows the context,
+    program cache and analysed audio instead of creating and releasing its
+    own, so the next job on the same shaders and song starts warm. The
+    context is created on first use. Only the ``max_audio`` most recently
+    used analyses are kept.
+    """
+
+    def __init__(self, max_audio: int = 2):
+        self.max_audio = max_audio
+        self._ctx: Optional[moderngl.Context] = None
+        self._programs: Optional[ProgramCache] = None
+        self._audio: "OrderedDict[tuple, AudioProcessor]" = OrderedDict()
+        self.audio_hits = 0
+
+    def _open(self) -> None:
+        if self._ctx is None:
+            self._ctx = create_standalone_context()
+            self._programs = ProgramCache(self._ctx)
+
+    @property
+    def ctx(self) -> moderngl.Context:
+        self._open()
+        return self._ctx
+
+    @property
+    def programs(self) -> ProgramCache:
+        self._open()
+        return self._programs
+
+    @staticmethod
+    def _audio_key(audio_path: Path, fps: float, oversample: int, stems: Dict[str, Path]) -> tuple:
+        files = [Path(audio_path)] + [Path(p) for p in stems.values()]
+        stats = tuple((str(f.resolve()), f.stat().st_size, f.stat().st_mtime_ns) for f in files)
+        return (stats, float(fps), int(oversample), tuple(stems))
+
+    def audio(self, audio_path: Path, fps: float, oversample: int = 1,
+              stems: Optional[Dict[str, Path]] = None) -> AudioProcessor:
+        """Analysed audio, reused while the files and settings are unchanged."""
+        stems = dict(stems or {})
+        key = self._audio_key(audio_path, fps, oversample, stems)
+        processor = self._audio.get(key)
+        if processor is not None:
+            self._audio.move_to_end(key)
+            self.audio_hits += 1
+            return processor
+        processor = AudioProcessor(audio_path, fps, oversample=oversample, stems=stems)
+        self._audio[key] = processor
+        while len(self._audio) > self.max_audio:
+            self._audio.popitem(last=False)
+        return processor
+
+    def release(self) -> None:
+        self._audio.clear()
+        if self._programs is not None:
+            self._programs.release()
+            self._programs = None
+        if self._ctx is not None:
+            self._ctx.release()
+            self._ctx = None
 
 
 def _mix_audio_textures(
@@ -115,6 +275,34 @@ def temporal_offsets(num_samples: int, frame_index: int) -> List[float]:
         offsets.append(max(0.0, min(1.0, base + jitter)))
     return offsets
 
+# Cap on texture-table rows per frame for sub-frame audio (memory grows linearly).
+MAX_AUDIO_OVERSAMPLE = 4
+# Channel source names that bind the per-stem (len(stems) x 512) FFT texture.
+STEMS_CHANNEL_SOURCES = ("stems", "audio_stems")
+
+# --- Audio History Ring Buffer ---
+def history_ring_writes(last_frame: Optional[int], frame_index: int, width: int) -> List[Tuple[int, int, int]]:
+    """
+    Plan the sub-rectangle uploads that bring a history ring up to ``frame_index``.
+    Returns (column, first_frame, count) runs; frame f lives in column f % width.
+    Sequential frames upload a single column; seeks and first use refill the window.
+    """
+    if width <= 0 or last_frame == frame_index:
+        return []
+    if last_frame is None or frame_index < last_frame or frame_index - last_frame >= width:
+        first = frame_index - width + 1
+    else:
+        first = last_frame + 1
+
+    writes = []
+    f = first
+    while f <= frame_index:
+        col = f % width
+        count = min(frame_index - f + 1, width - col)
+        writes.append((col, f, count))
+        f += count
+    return writes
+
 # --- Halton Sequence for Subpixel Jitter ---
 def halton(index: int, base: int) -> float:
     """Generate element of Halton sequence (low-discrepancy sequence for AA)"""
@@ -151,8 +339,10 @@ def build_basis(forward: np.ndarray, up: np.ndarray) -> np.ndarray:
     return np.array([r, u, f])
 
 class Renderer:
-    def __init__(self, job: RenderJob):
+    def __init__(self, job: RenderJob, resources: Optional[RenderResources] = None):
         self.job = job
+        # Borrowed context, programs and audio; owned by the caller.
+        self.resources = resources
         self.output_width = job.width
         self.output_height = job.height
 
@@ -178,7 +368,7 @@ class Renderer:
         print(f"[LOG] Renderer init: output={self.output_width}x{self.output_height}, internal={self.internal_width}x{self.internal_height}, ss_scale={scale}")
         print(f"[LOG] Job params: tiles={job.tiles_x}x{job.tiles_y}, temporal_samples={job.temporal_samples}, bit_depth={job.default_bit_depth}")
 
-        self.ctx = moderngl.create_context(standalone=True)
+        self.ctx = resources.ctx if resources is not None else create_standalone_context()
 
         # Feedback buffers (self-referencing channels) use ping-pong textures.
         self.feedback_pairs: Dict[str, Dict[str, Any]] = {}
@@ -194,19 +384,62 @@ class Renderer:
         # Audio
         self.audio = None
         self.history_tex = None
+        self.history_ring: Optional[Dict[str, Any]] = None
+        # Motion-blurred renders read audio at each temporal sample's own time
+        # from an oversampled texture table instead of once per frame.
+        self.subframe_audio = job.temporal_samples > 1 and job.shutter > 0
+        self.audio_oversample = min(job.temporal_samples, MAX_AUDIO_OVERSAMPLE) if self.subframe_audio else 1
+        self.stems_tex: Optional[moderngl.Texture] = None
+        self._stem_textures: Optional[Dict[int, moderngl.Texture]] = None
         if job.audio_path:
-            self.audio = AudioProcessor(job.audio_path, job.audio_fps)
+            stems: Dict[str, Path] = {}
+            # Stems are only analysed when some buffer actually samples them.
+            if any(str(src).lower() in STEMS_CHANNEL_SOURCES
+                   for buf in job.multipass_graph.buffers.values()
+                   for src in (buf.channels or {}).values()):
+                from .project import discover_stems
+                stems = discover_stems(Path(job.audio_path).parent)
+                if stems:
+                    self._stem_textures = {}
+                    print(f"[LOG] Audio stems: {', '.join(stems)}")
+                else:
+                    print("[LOG] WARNING: 'stems' channel requested but no stems/ folder next to the audio", file=sys.stderr)
+            if resources is not None:
+                self.audio = resources.audio(
+                    job.audio_path, job.audio_fps, oversample=self.audio_oversample, stems=stems,
+                )
+            else:
+                self.audio = AudioProcessor(
+                    job.audio_path, job.audio_fps, oversample=self.audio_oversample, stems=stems,
+                )
             if job.audio_mode in ("history", "both"):
                 history_tex_data = self.audio.get_history_texture()
-                self.history_tex = self.ctx.texture(
-                    (history_tex_data.shape[1], history_tex_data.shape[0]),
-                    1,
-                    data=history_tex_data.tobytes(),
-                    dtype='f4'
-                )
+                window_sec = job.audio_history_sec
+                if window_sec > 0:
+                    # Ring buffer: constant GPU memory, new columns uploaded per frame.
+                    ring_width = max(1, int(round(window_sec * job.audio_fps)))
+                    self.history_tex = self.ctx.texture(
+                        (ring_width, history_tex_data.shape[0]),
+                        1,
+                        data=np.zeros((history_tex_data.shape[0], ring_width), dtype=np.float32).tobytes(),
+                        dtype='f4'
+                    )
+                    self.history_ring = {"width": ring_width, "last_frame": None}
+                    print(f"[LOG] Audio history ring: {ring_width} columns ({window_sec:.2f}s)")
+                else:
+                    self.history_tex = self.ctx.texture(
+                        (history_tex_data.shape[1], history_tex_data.shape[0]),
+                        1,
+                        data=history_tex_data.tobytes(),
+                        dtype='f4'
+                    )
 
         # MusiCue bundle integration
         self.bundle_eval = None
+        self.bundle_timeline = None
+        self.cued_stack: Optional[np.ndarray] = None
+        self._audio_frame_cache: Optional[Dict[str, Any]] = None
+        self._audio_textures: Dict[int, moderngl.Texture] = {}
         self.spectrum_synth = None
         self.bundle_mode = getattr(job, "bundle_mode", "auto")
         self.bundle_blend = getattr(job, "bundle_blend", 0.5)
@@ -216,9 +449,13 @@ class Renderer:
             result = load_for_audio(
                 job.audio_path,
                 override_path=getattr(job, "bundle_path", None),
+                compiled=True,
             )
             if result.bundle is not None:
-                self.bundle_eval = BundleEvaluator(result.bundle, fps=job.fps)
+                self.bundle_eval = BundleEvaluator(
+                    result.bundle, fps=job.fps,
+                    adsr=getattr(job, "bundle_adsr", None),
+                )
                 self.spectrum_synth = MusicalSpectrumSynth()
                 if self.bundle_mode == "auto":
                     self.bundle_mode = "cued"
@@ -255,26 +492,21 @@ class Renderer:
         self.tile_w = math.ceil(self.internal_width / tiles_x)
         self.tile_h = math.ceil(self.internal_height / tiles_y)
         
+        if self.resources is not None:
+            self.program_cache = self.resources.programs
+        else:
+            self.program_cache = ProgramCache(self.ctx)
+        compiled_before = self.program_cache.compiled
+        reused_before = self.program_cache.reused
         for name, buf in self.job.multipass_graph.buffers.items():
-            # 1. Compile Shader
+            # 1. Compile Shader (buffers sharing a shader share the program)
             defines = self.job.defines.copy()
             src = load_shader_from_file(buf.shader, defines)
             try:
-                prog = self.ctx.program(
-                    vertex_shader="""
-                    #version 430
-                    in vec2 in_vert;
-                    in vec2 in_uv;
-                    out vec2 uv;
-                    void main() {
-                        gl_Position = vec4(in_vert, 0.0, 1.0);
-                        uv = in_uv;
-                    }
-                    """,
-                    fragment_shader=src
-                )
+                prog = self.program_cache.get(QUAD_VERTEX_SHADER, src)
             except Exception as e:
                 print(f"Error compiling shader for buffer {name}:")
+                print(map_compile_error(str(e), src), file=sys.stderr)
                 raise e
             
             self.programs[name] = prog
@@ -356,6 +588,11 @@ class Renderer:
                     print(f"[ERROR] Failed to create texture/FBO for '{name}' ({width}x{height}, dtype={dtype}): {e}")
                     raise
 
+        compiled = self.program_cache.compiled - compiled_before
+        reused = self.program_cache.reused - reused_before
+        if reused:
+            print(f"[LOG] Shader programs: {compiled} compiled, {reused} reused")
+
     def _begin_frame(self):
         # Establish read/write targets for feedback buffers and expose current write texture.
         for name, pair in self.feedback_pairs.items():
@@ -379,8 +616,13 @@ class Renderer:
             tex.release()
         self.file_textures.clear()
 
-        if hasattr(self, 'audio_tex_512'):
-            self.audio_tex_512.release()
+        for tex in self._audio_textures.values():
+            tex.release()
+        self._audio_textures.clear()
+        for tex in (self._stem_textures or {}).values():
+            tex.release()
+        self._stem_textures = None
+        self.stems_tex = None
 
         if self.history_tex:
             self.history_tex.release()
@@ -406,15 +648,18 @@ class Renderer:
             vao.release()
         self.vaos.clear()
 
-        for prog in self.programs.values():
-            prog.release()
+        owned = self.resources is None
+        if owned and getattr(self, "program_cache", None) is not None:
+            self.program_cache.release()
         self.programs.clear()
 
         if hasattr(self, 'vbo') and self.vbo:
             self.vbo.release()
+            self.vbo = None
 
         if self.ctx:
-            self.ctx.release()
+            if owned:
+                self.ctx.release()
             self.ctx = None
 
     def __del__(self):
@@ -424,10 +669,107 @@ class Renderer:
         except Exception:
             pass
 
+    def _update_history_ring(self, frame_idx: int):
+        """Upload only the history columns the ring is missing for this frame."""
+        ring = self.history_ring
+        rows = self.history_tex.height
+        for col, first, count in history_ring_writes(ring["last_frame"], frame_idx, ring["width"]):
+            cols = self.audio.get_history_columns(first, count)
+            self.history_tex.write(
+                np.ascontiguousarray(cols, dtype=np.float32).tobytes(),
+                viewport=(col, 0, count, rows),
+            )
+        ring["last_frame"] = frame_idx
+
+    def _prepare_audio(self, frame_idx: int, sample_idx: int = 0, time_val: Optional[float] = None):
+        """
+        Evaluate, synthesize and upload audio once per frame (or per temporal
+        sample when sub-frame audio is on). _render_pass runs per buffer, tile
+        and sample; repeated calls reuse the cached EvalFrame and texture.
+        """
+        subframe = self.subframe_audio and time_val is not None
+        slot = sample_idx if subframe else 0
+        cache = self._audio_frame_cache
+        if cache is None or cache["frame"] != frame_idx:
+            cache = self._audio_frame_cache = {"frame": frame_idx, "slots": {}}
+        if slot in cache["slots"]:
+            if slot in self._audio_textures:
+                self.audio_tex_512 = self._audio_textures[slot]
+            if self._stem_textures:
+                self.stems_tex = self._stem_textures[slot]
+            return cache["slots"][slot]
+
+        eval_frame = None
+        if self.job.audio_mode in ("shadertoy", "both"):
+            if subframe:
+                raw_aud = self.audio.get_shadertoy_texture_at(time_val)
+            else:
+                raw_aud = self.audio.get_shadertoy_texture(frame_idx)
+            if self.bundle_eval is not None and self.spectrum_synth is not None:
+                if subframe:
+                    eval_frame = self._evaluate_bundle_at(time_val)
+                else:
+                    eval_frame = self._evaluate_bundle(frame_idx)
+                cued_aud = self._cued_texture(eval_frame, frame_idx, time_val if subframe else None)
+                aud_data = _mix_audio_textures(
+                    raw_aud, cued_aud, self.bundle_mode, self.bundle_blend,
+                )
+            else:
+                aud_data = raw_aud
+            tex = self._audio_textures.get(slot)
+            if tex is None:
+                tex = self._audio_textures[slot] = self.ctx.texture((512, 2), 1, dtype='f4')
+            tex.write(aud_data.astype('f4').tobytes())
+            self.audio_tex_512 = tex
+
+        if self._stem_textures is not None:
+            if subframe:
+                stem_data = self.audio.get_stems_texture_at(time_val)
+            else:
+                stem_data = self.audio.get_stems_texture(frame_idx)
+            tex = self._stem_textures.get(slot)
+            if tex is None:
+                tex = self._stem_textures[slot] = self.ctx.texture((512, stem_data.shape[0]), 1, dtype='f4')
+            tex.write(np.ascontiguousarray(stem_data, dtype=np.float32).tobytes())
+            self.stems_tex = tex
+
+        cache["slots"][slot] = eval_frame
+        return eval_frame
+
+    def _cued_texture(self, eval_frame, frame_idx: int, time_val: Optional[float] = None) -> np.ndarray:
+        """Cued texture from the precomputed stack; synthesize only off-timeline."""
+        stack, timeline = self.cued_stack, self.bundle_timeline
+        if stack is not None:
+            if time_val is None:
+                if frame_idx in timeline:
+                    return stack[timeline.row_of(frame_idx)]
+            elif timeline.covers(time_val):
+                pos = timeline.position(time_val)
+                i0 = int(math.floor(pos))
+                i1 = min(i0 + 1, len(stack) - 1)
+                frac = np.float32(pos - i0)
+                return stack[i0] * (1.0 - frac) + stack[i1] * frac
+        return self.spectrum_synth.synthesize(eval_frame)
+
+    def _evaluate_bundle(self, frame_idx: int):
+        timeline = self.bundle_timeline
+        if timeline is not None and frame_idx in timeline:
+            return timeline.frame(frame_idx)
+        return self.bundle_eval.evaluate(frame_idx)
+
+    def _evaluate_bundle_at(self, time_val: float):
+        timeline = self.bundle_timeline
+        if timeline is not None and timeline.covers(time_val):
+            return timeline.at_time(time_val)
+        return self.bundle_eval.evaluate_at(time_val)
+
     def _bind_uniforms(self, prog, uniforms: Dict[str, Any]):
         for k, v in uniforms.items():
             if k in prog:
                 try:
+                    if isinstance(v, list):
+                        # Drivers trim uniform arrays to the highest index the shader reads.
+                        v = v[:prog[k].array_length]
                     prog[k].value = v
                 except Exception as e:
                     print(f"[LOG] WARNING: Failed to set uniform '{k}': {e}", file=sys.stderr, flush=True)
@@ -476,6 +818,15 @@ class Renderer:
         out_path.mkdir(parents=True, exist_ok=True)
 
         total_frames = end - start
+        if self.bundle_eval is not None:
+            # One vectorized pass over the whole range; per-frame lookups become O(1).
+            margin = int(math.ceil(self.job.shutter * self.job.fps / 2.0)) + 1 if self.subframe_audio else 0
+            self.bundle_timeline = self.bundle_eval.evaluate_range(
+                start - margin, end + margin, oversample=self.audio_oversample,
+            )
+            if self.spectrum_synth is not None and self.bundle_mode in ("cued", "blend"):
+                # Whole-range texture stack: cued/blend frames become a row lookup.
+                self.cued_stack = self.spectrum_synth.synthesize_batch(self.bundle_timeline)
         print(f"Rendering frames {start} to {end}...")
         log_info(f"Starting render: {total_frames} frames at {self.job.fps} fps")
 
@@ -511,7 +862,7 @@ class Renderer:
 
         if iio is None:
             raise RuntimeError("imageio is required to write output frames.")
-        if fmt == "exr" and not EXR_AVAILABLE:
+        if fmt == "exr" and not exr_available():
             raise RuntimeError("EXR output requested but EXR support is not available in this environment.")
 
         if self.feedback_pairs:
@@ -1016,19 +1367,7 @@ class Renderer:
         eval_frame = None
         if self.audio:
             uni['iSampleRate'] = float(self.audio.meta.sample_rate)
-            if self.job.audio_mode in ("shadertoy", "both"):
-                raw_aud = self.audio.get_shadertoy_texture(frame_idx)
-                if self.bundle_eval is not None and self.spectrum_synth is not None:
-                    eval_frame = self.bundle_eval.evaluate(frame_idx)
-                    cued_aud = self.spectrum_synth.synthesize(eval_frame)
-                    aud_data = _mix_audio_textures(
-                        raw_aud, cued_aud, self.bundle_mode, self.bundle_blend,
-                    )
-                else:
-                    aud_data = raw_aud
-                if not hasattr(self, 'audio_tex_512'):
-                    self.audio_tex_512 = self.ctx.texture((512, 2), 1, dtype='f4')
-                self.audio_tex_512.write(aud_data.astype('f4').tobytes())
+            eval_frame = self._prepare_audio(frame_idx, sample_idx, time_val)
         else:
             uni['iSampleRate'] = 0.0
 
@@ -1036,9 +1375,16 @@ class Renderer:
         uni.update(_builtin_uniforms_from_eval(eval_frame))
 
         if self.history_tex:
+            if self.history_ring is not None:
+                self._update_history_ring(frame_idx)
+                uni['iAudioHistoryHead'] = frame_idx % self.history_ring["width"]
+                ring_flag = 1
+            else:
+                uni['iAudioHistoryHead'] = max(0, min(frame_idx, self.history_tex.width - 1))
+                ring_flag = 0
             self.history_tex.use(location=4)
             uni['iAudioHistoryTex'] = 4
-            uni['iAudioHistoryResolution'] = (self.history_tex.width, self.history_tex.height, 0)
+            uni['iAudioHistoryResolution'] = (self.history_tex.width, self.history_tex.height, ring_flag)
 
         # Default audio binding for compatibility if not overridden.
         if self.audio and self.job.audio_mode in ("shadertoy", "both") and 0 not in (buf_conf.channels or {}):
@@ -1066,6 +1412,11 @@ class Renderer:
                     tex_to_bind = self.audio_tex_512
                     ch_res[unit] = (512.0, 2.0, 1.0)
                     ch_time[unit] = time_val
+            elif lower in STEMS_CHANNEL_SOURCES:
+                if self.stems_tex is not None:
+                    tex_to_bind = self.stems_tex
+                    ch_res[unit] = (512.0, float(self.stems_tex.height), 1.0)
+                    ch_time[unit] = time_val
             elif lower in ("history", "audiohistory", "audio_history"):
                 if self.history_tex:
                     tex_to_bind = self.history_tex
@@ -1096,7 +1447,7 @@ class Renderer:
                 uni[f'iChannel{unit}'] = unit
 
         uni['iChannelTime'] = tuple(ch_time)
-        uni['iChannelResolution'] = tuple(v for triple in ch_res for v in triple)
+        uni['iChannelResolution'] = [tuple(triple) for triple in ch_res]
 
         self._bind_uniforms(prog, uni)
         self.vaos[buf_name].render(moderngl.TRIANGLE_STRIP)
@@ -12,6 +12,7 @@ import json
 import math
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 DEFAULT_FRAME_TIME_SEC = 5.0  # conservative default with no prior history
 
@@ -90,7 +91,8 @@ def estimate_render(
     )
 
 
-def load_history(path: Path = HISTORY_PATH) -> dict:
+def load_history(path: Optional[Path] = None) -> dict:
+    path = path or HISTORY_PATH  # looked up per call, so tests can redirect it
     if not path.exists():
         return {}
     try:
@@ -105,13 +107,14 @@ def record_history(
     width: int,
     height: int,
     mean_frame_time: float,
-    path: Path = HISTORY_PATH,
+    path: Optional[Path] = None,
 ) -> None:
     """Update the moving average for (shader, resolution).
 
     Uses an EMA with alpha=0.3 so a single outlier render doesn't
     dominate the estimate.
     """
+    path = path or HISTORY_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
     history = load_history(path)
     key = _history_key(shader_basename, width, height)
@@ -0,0 +1,144 @@
+"""Long-lived render worker: renders job after job in one warm process.
+
+The web server starts workers with ``python -m cedartoy.render_worker``
+(see ``cedartoy.server.render_pool``) and sends one JSON command per line
+on stdin::
+
+    {"cmd": "render", "job_id": "...", "config_file": "/path/job.yaml"}
+    {"cmd": "exit"}
+
+While a job runs, the worker writes the usual ``[PROGRESS]`` / ``[LOG]`` /
+``[COMPLETE]`` / ``[ERROR]`` lines, exactly as ``cedartoy.cli render``
+does. When the job ends it writes one status line::
+
+    [WORKER] {"event": "job_done", "job_id": "...", "code": 0,
+              "jobs": 3, "rss_mb": 412.5, "retiring": false}
+
+The GL context, compiled programs and analysed audio
+(``render.RenderResources``) stay alive between jobs. The worker exits
+after ``--max-jobs`` jobs, or once its resident memory passes
+``--memory-budget-mb``. Either way it reports ``"retiring": true`` on its
+last job first, so the server can start a fresh worker. This bounds
+leaks from drivers and long sessions.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import traceback
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:  # the server imports this module for its constants only
+    from .render import RenderResources
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+WORKER_PREFIX = "[WORKER]"
+DEFAULT_MAX_JOBS = 20
+DEFAULT_MEMORY_BUDGET_MB = 4096
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process (peak RSS when psutil is missing)."""
+    if psutil is not None:
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+    except Exception:
+        return 0
+
+
+def emit(event: str, **data) -> None:
+    sys.stderr.flush()
+    print(f"{WORKER_PREFIX} {json.dumps({'event': event, **data})}", flush=True)
+
+
+def run_job(config_file: Path, resources: RenderResources) -> int:
+    """Render one job config with shared resources; returns an exit code like the CLI's."""
+    from .cli import config_to_job
+    from .config import build_config
+    from .render import Renderer
+
+    renderer: Optional[Renderer] = None
+    try:
+        job = config_to_job(build_config(Path(config_file)))
+        renderer = Renderer(job, resources=resources)
+        renderer.render()
+        return 0
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        if renderer is not None:
+            renderer.cleanup()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def serve(commands, max_jobs: int = DEFAULT_MAX_JOBS,
+          memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+          resources: Optional[RenderResources] = None) -> int:
+    """Run commands (JSON lines) until exit, end of input or retirement; returns jobs run."""
+    if resources is None:
+        from .render import RenderResources
+        resources = RenderResources()
+    jobs = 0
+    try:
+        try:
+            resources.ctx  # warm the context before the first job arrives
+        except Exception as e:
+            print(f"[LOG] WARNING: render worker could not create a GL context yet: {e}", flush=True)
+        emit("ready")
+        for raw in commands:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                command = json.loads(raw)
+            except json.JSONDecodeError:
+                print(f"[LOG] WARNING: ignoring malformed worker command: {raw[:200]}", flush=True)
+                continue
+            if command.get("cmd") == "exit":
+                break
+            if command.get("cmd") != "render":
+                print(f"[LOG] WARNING: unknown worker command {command.get('cmd')!r}", flush=True)
+                continue
+
+            code = run_job(Path(command["config_file"]), resources)
+            jobs += 1
+            gc.collect()
+            rss = rss_bytes()
+            retiring = jobs >= max_jobs or rss > memory_budget_mb * 1024 * 1024
+            emit("job_done", job_id=command.get("job_id"), code=code, jobs=jobs,
+                 rss_mb=round(rss / (1024 * 1024), 1), retiring=retiring)
+            if retiring:
+                break
+    finally:
+        resources.release()
+    return jobs
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="CedarToy persistent render worker")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS,
+                        help="Exit after this many jobs")
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help="Exit after a job that leaves resident memory above this")
+    args = parser.parse_args(argv)
+    # The server reads stdout and stderr as one pipe; keep lines in order.
+    sys.stdout.reconfigure(line_buffering=True)
+    serve(sys.stdin, max_jobs=max(1, args.max_jobs), memory_budget_mb=args.memory_budget_mb)
+
+
+if __name__ == "__main__":
+    main()
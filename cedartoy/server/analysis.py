@@ -0,0 +1,225 @@
+"""Shared, reference-counted audio analyses for the web UI.
+
+Replaces the single module-global processor in ``api/audio.py``. Each
+analysis is keyed by (audio sha256, fps), so several tabs or projects
+opening the same song share one AudioProcessor. ``AudioProcessor`` runs
+in the shared worker process pool (``server.workers``), off the event
+loop; concurrent requests for a key that is still being analysed await
+the same future.
+
+Entries with no holders are evicted least-recently-used first once more
+than ``max_entries`` are cached; held entries are never evicted. Uploaded
+audio is written to a registry-owned temp directory, and each file is
+deleted when its entry is evicted, when a duplicate upload turns out to
+be cached already, or when the registry is closed.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator
+
+from cedartoy.audio import AudioProcessor
+from cedartoy.filehash import cached_sha256
+from cedartoy.server import workers
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4
+_UPLOAD_CHUNK = 1024 * 1024
+
+
+def _analyze(path: str, fps: float) -> AudioProcessor:
+    # Runs in a worker process; the processor is pickled back to the server.
+    return AudioProcessor(Path(path), fps=fps)
+
+
+@dataclass
+class Analysis:
+    key: str
+    path: Path
+    fps: float
+    processor: AudioProcessor
+    owns_file: bool = False
+    refs: int = 0
+
+    @property
+    def metadata(self) -> dict:
+        meta = self.processor.meta
+        return {
+            "duration": meta.duration_sec,
+            "sample_rate": meta.sample_rate,
+            "channels": meta.channels,
+            "frames": meta.frame_count,
+        }
+
+
+class AnalysisRegistry:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, executor: Executor | None = None):
+        self.max_entries = max_entries
+        self._executor = executor
+        self._entries: "OrderedDict[str, Analysis]" = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._waiting: dict[str, int] = {}  # acquirers awaiting each pending build
+        self._lock = threading.Lock()
+        self._tmp_dir: Path | None = None
+        self.latest: str | None = None  # most recent acquire, for id-less requests
+
+    @staticmethod
+    def make_key(sha256: str, fps: float) -> str:
+        return f"{sha256[:32]}@{fps:g}"
+
+    def _pool(self) -> Executor:
+        # Shared CPU pool unless one was injected (tests use a thread pool).
+        return self._executor if self._executor is not None else workers.pools.cpu
+
+    def _upload_dir(self) -> Path:
+        if self._tmp_dir is None:
+            self._tmp_dir = Path(tempfile.mkdtemp(prefix="cedartoy-audio-"))
+        return self._tmp_dir
+
+    def get(self, key: str | None = None) -> Analysis | None:
+        key = key or self.latest
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    async def _build(self, key: str, path: Path, fps: float, owns_file: bool) -> Analysis:
+        loop = asyncio.get_running_loop()
+        try:
+            processor = await loop.run_in_executor(self._pool(), _analyze, str(path), fps)
+        except BaseException:
+            if owns_file:
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._pending.pop(key, None)
+                self._waiting.pop(key, None)
+            raise
+        entry = Analysis(key=key, path=path, fps=fps, processor=processor, owns_file=owns_file)
+        # Insert with the waiters' references already taken, so an eviction
+        # before they resume cannot drop the entry (and delete its upload).
+        with self._lock:
+            self._pending.pop(key, None)
+            entry.refs = self._waiting.pop(key, 0)
+            self._entries[key] = entry
+        return entry
+
+    async def _acquire(self, key: str, path: Path, fps: float, owns_file: bool) -> Analysis:
+        with self._lock:
+            entry = self._entries.get(key)
+            build = None
+            if entry is None:
+                build = self._pending.get(key)
+                if build is None:
+                    build = self._pending[key] = asyncio.ensure_future(
+                        self._build(key, path, fps, owns_file))
+                    owns_file = False  # the build now owns (or deletes) the file
+                self._waiting[key] = self._waiting.get(key, 0) + 1
+            else:
+                entry.refs += 1
+        if owns_file:
+            path.unlink(missing_ok=True)  # duplicate upload of a cached or in-flight song
+        if entry is None:
+            try:
+                # Shielded: a cancelled request must not cancel a build that
+                # other requests share.
+                entry = await asyncio.shield(build)
+            except asyncio.CancelledError:
+                self._drop_waiter(key, build)
+                raise
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            evicted = self._evict_locked()
+        for old in evicted:
+            self._discard(old)
+        self.latest = key
+        return entry
+
+    def _drop_waiter(self, key: str, build: asyncio.Future) -> None:
+        if build.done():
+            if not build.cancelled() and build.exception() is None:
+                self.release(key)
+            return
+        with self._lock:
+            if self._waiting.get(key, 0) > 0:
+                self._waiting[key] -= 1
+
+    async def acquire_path(self, path: Path, fps: float) -> Analysis:
+        """Analysis for an audio file already on disk (e.g. a project's song.wav)."""
+        loop = asyncio.get_running_loop()
+        sha = await loop.run_in_executor(workers.pools.io, cached_sha256, path)
+        return await self._acquire(self.make_key(sha, fps), Path(path), fps, owns_file=False)
+
+    async def acquire_upload(self, chunks: AsyncIterator[bytes], suffix: str, fps: float) -> Analysis:
+        """Store an upload in the registry's temp dir (hashing as it streams) and analyse it."""
+        loop = asyncio.get_running_loop()
+        h = hashlib.sha256()
+
+        def write(f, chunk: bytes) -> None:
+            h.update(chunk)
+            f.write(chunk)
+
+        with tempfile.NamedTemporaryFile(dir=self._upload_dir(), suffix=suffix, delete=False) as f:
+            path = Path(f.name)
+            async for chunk in chunks:
+                await loop.run_in_executor(workers.pools.io, write, f, chunk)
+        return await self._acquire(self.make_key(h.hexdigest(), fps), path, fps, owns_file=True)
+
+    def release(self, key: str) -> bool:
+        """Drop one reference; returns False for unknown keys."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.refs = max(0, entry.refs - 1)
+            evicted = self._evict_locked()
+        for old in evicted:
+            self._discard(old)
+        return True
+
+    def _evict_locked(self) -> list[Analysis]:
+        evicted = []
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_entries:
+                break
+            if self._entries[key].refs == 0:
+                evicted.append(self._entries.pop(key))
+        return evicted
+
+    def _discard(self, entry: Analysis) -> None:
+        if self.latest == entry.key:
+            self.latest = None
+        if entry.owns_file:
+            try:
+                entry.path.unlink(missing_ok=True)
+            except OSError as e:
+                _logger.warning("Could not remove %s: %s", entry.path, e)
+
+    def close(self) -> None:
+        """Forget all analyses, delete uploaded files and stop an injected pool."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._discard(entry)
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+registry = AnalysisRegistry()
@@ -1,68 +1,108 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import Response
 from pathlib import Path
-import tempfile
+from typing import Optional
 import numpy as np
+from pydantic import BaseModel, Field
 
-from cedartoy.audio import AudioProcessor
+from cedartoy.server import analysis, workers
+from cedartoy.server.analysis import Analysis
 
 router = APIRouter()
 
-# Global audio state
-audio_state = {
-    "processor": None,
-    "file_path": None,
-    "metadata": None
-}
+# Largest block /frames will return in one response (~1 min at 60 fps).
+MAX_FRAMES_PER_REQUEST = 3600
+
+# Preview analyses run at 60 fps (renders use their own fps).
+PREVIEW_FPS = 60.0
+
+
+def encode_binary(values: np.ndarray, fmt: str) -> bytes:
+    """Pack values as little-endian float32 as-is, or as uint8 mapping 0..1 to 0..255."""
+    if fmt == "f32":
+        return np.ascontiguousarray(values, dtype="<f4").tobytes()
+    if fmt == "u8":
+        return np.round(np.clip(values, 0.0, 1.0) * 255.0).astype(np.uint8).tobytes()
+    raise HTTPException(status_code=400, detail=f"unknown format {fmt!r}; use 'f32' or 'u8'")
+
+
+def _analysis(analysis_id: Optional[str]) -> Analysis:
+    """Look up an analysis; without an id, the most recently opened one."""
+    entry = analysis.registry.get(analysis_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No audio loaded")
+    return entry
+
+
+def _describe(entry: Analysis) -> dict:
+    return {"status": "success", "analysis_id": entry.key, "metadata": entry.metadata}
+
+
+class AudioOpenRequest(BaseModel):
+    path: str = Field(..., description="Server-local audio file to analyse.")
+
 
 @router.post("/upload")
 async def upload_audio(file: UploadFile = File(...)):
-    """Upload audio file for processing"""
-    global audio_state
+    """Upload audio file for processing.
 
-    # Save to temp file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix, mode='wb')
-    content = await file.read()
-    temp_file.write(content)
-    temp_file.close()
+    Identical songs (by sha256) share one analysis; the response's
+    ``analysis_id`` selects it on the other endpoints and releases it via
+    ``DELETE /api/audio/{analysis_id}``.
+    """
+    async def chunks():
+        while data := await file.read(analysis._UPLOAD_CHUNK):
+            yield data
 
-    # Process audio
     try:
-        # Use 60 fps for preview (will be overridden for actual renders)
-        from pathlib import Path as PathLib
-        processor = AudioProcessor(PathLib(temp_file.name), fps=60.0)
-        audio_state["processor"] = processor
-        audio_state["file_path"] = temp_file.name
-        audio_state["metadata"] = {
-            "duration": processor.meta.duration_sec,
-            "sample_rate": processor.meta.sample_rate,
-            "channels": processor.meta.channels,
-            "frames": processor.meta.frame_count,
-        }
-
-        return {
-            "status": "success",
-            "metadata": audio_state["metadata"]
-        }
+        async with workers.pools.semaphore("audio_upload"):
+            entry = await analysis.registry.acquire_upload(
+                chunks(), suffix=Path(file.filename or "").suffix, fps=PREVIEW_FPS,
+            )
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    return _describe(entry)
+
+
+@router.post("/open")
+async def open_audio(body: AudioOpenRequest):
+    """Analyse (or share an existing analysis of) an audio file on disk."""
+    p = Path(body.path)
+    if not p.is_file():
+        raise HTTPException(status_code=404, detail="audio not found")
+    try:
+        async with workers.pools.semaphore("audio_upload"):
+            entry = await analysis.registry.acquire_path(p, fps=PREVIEW_FPS)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _describe(entry)
+
+
+@router.delete("/{analysis_id}")
+async def release_audio(analysis_id: str):
+    """Drop this client's hold on an analysis so it can be evicted."""
+    if not analysis.registry.release(analysis_id):
+        raise HTTPException(status_code=404, detail="unknown analysis")
+    return {"status": "released"}
+
 
 @router.get("/info")
-async def get_audio_info():
+async def get_audio_info(analysis_id: Optional[str] = None):
     """Get loaded audio metadata"""
-    if not audio_state["processor"]:
-        raise HTTPException(status_code=404, detail="No audio loaded")
-
-    return {"metadata": audio_state["metadata"]}
+    entry = _analysis(analysis_id)
+    return {"analysis_id": entry.key, "metadata": entry.metadata}
 
 @router.get("/waveform")
-async def get_waveform(num_samples: int = 1000):
-    """Get downsampled waveform for visualization"""
-    if not audio_state["processor"]:
-        raise HTTPException(status_code=404, detail="No audio loaded")
+async def get_waveform(num_samples: int = 1000, format: str = "json",
+                       analysis_id: Optional[str] = None):
+    """Get downsampled waveform for visualization.
 
-    processor = audio_state["processor"]
+    ``format=f32|u8`` returns the samples as a binary body instead; u8
+    maps -1..1 onto 0..255.
+    """
+    processor = _analysis(analysis_id).processor
 
     # Access the samples from AudioData object
     if processor.data is None or processor.data.samples is None:
@@ -79,22 +119,41 @@ async def get_waveform(num_samples: int = 1000):
 
     # Downsample for visualization
     if total_samples <= num_samples:
-        waveform = mono.tolist()
+        waveform = mono
     else:
         # Simple decimation
         step = total_samples // num_samples
-        waveform = mono[::step][:num_samples].tolist()
-
-    return {"waveform": waveform, "total_samples": total_samples}
+        waveform = mono[::step][:num_samples]
+
+    if format != "json":
+        values = waveform * 0.5 + 0.5 if format == "u8" else waveform
+        return Response(
+            content=encode_binary(values, format),
+            media_type="application/octet-stream",
+            headers={
+                "X-Total-Samples": str(total_samples),
+                "X-Waveform-Columns": str(len(waveform)),
+                "X-Audio-Format": format,
+            },
+        )
+    return {"waveform": waveform.tolist(), "total_samples": total_samples}
 
 @router.get("/fft/{frame}")
-async def get_fft(frame: int):
-    """Get FFT data for specific frame"""
-    if not audio_state["processor"]:
-        raise HTTPException(status_code=404, detail="No audio loaded")
+async def get_fft(frame: int, format: str = "json", analysis_id: Optional[str] = None):
+    """Get FFT data for specific frame.
 
+    ``format=f32|u8`` returns the 2x512 texture (row 0 FFT, row 1
+    waveform) as a binary body, laid out like one frame of ``/frames``.
+    """
     # Get Shadertoy texture data
-    texture_data = audio_state["processor"].get_shadertoy_texture(frame)
+    texture_data = _analysis(analysis_id).processor.get_shadertoy_texture(frame)
+
+    if format != "json":
+        return Response(
+            content=encode_binary(texture_data, format),
+            media_type="application/octet-stream",
+            headers={"X-Frame": str(frame), "X-Audio-Format": format, "X-Audio-Shape": "2,512"},
+        )
 
     # Extract FFT (row 0) and waveform (row 1)
     fft = texture_data[0, :].tolist()
@@ -105,3 +164,30 @@ async def get_fft(frame: int):
         "waveform": waveform,
         "frame": frame
     }
+
+
+@router.get("/frames")
+async def get_frames(start: int = 0, count: int = 1, format: str = "u8",
+                     analysis_id: Optional[str] = None):
+    """Block of Shadertoy audio textures as a raw binary body.
+
+    The body is ``count`` frames of 2x512 values (row 0 FFT, row 1
+    waveform, both 0..1), frame-major. Use f32 for float textures or u8
+    for direct UNSIGNED_BYTE uploads. Frames outside the song are zero.
+    Lets the preview prefetch seconds of textures in one request.
+    """
+    processor = _analysis(analysis_id).processor
+    if count < 1 or count > MAX_FRAMES_PER_REQUEST:
+        raise HTTPException(status_code=400,
+                            detail=f"count must be between 1 and {MAX_FRAMES_PER_REQUEST}")
+    block = processor.get_shadertoy_textures(start, count)
+    return Response(
+        content=encode_binary(block, format),
+        media_type="application/octet-stream",
+        headers={
+            "X-Frame-Start": str(start),
+            "X-Frame-Count": str(count),
+            "X-Audio-Format": format,
+            "X-Audio-Shape": f"{count},2,512",
+        },
+    )
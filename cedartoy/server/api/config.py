@@ -30,7 +30,7 @@ class ConfigData(BaseModel):
 @router.get("/schema")
 async def get_schema():
     """Get options schema for form generation"""
-    from cedartoy.options_schema import OPTIONS
+    from cedartoy.options_schema import OPTIONS, exr_available
 
     schema = []
     for opt in OPTIONS:
@@ -45,6 +45,8 @@ async def get_schema():
         # Add choices if available
         if hasattr(opt, 'choices') and opt.choices:
             opt_dict["choices"] = opt.choices
+            if opt.name == "default_output_format" and not exr_available():
+                opt_dict["choices"] = [c for c in opt.choices if c != "exr"]
 
         schema.append(opt_dict)
 
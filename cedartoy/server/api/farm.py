@@ -0,0 +1,123 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from cedartoy.diagnostics import run_preflight_checks
+from cedartoy.server.api.render import job_manager, scheduler
+from cedartoy.server.farm import DEFAULT_CHUNK_FRAMES, FarmCoordinator, LeaseLost
+
+
+router = APIRouter()
+# Shares the render scheduler's hub, so /ws/render subscribers see farm jobs too.
+coordinator = FarmCoordinator(job_manager, hub=scheduler.hub)
+
+
+class FarmJobRequest(BaseModel):
+    config: Dict[str, Any]
+    chunk_frames: int = Field(DEFAULT_CHUNK_FRAMES, gt=0, description="Frames per leased chunk.")
+
+
+class LeaseRequest(BaseModel):
+    agent_id: str = Field(..., min_length=1)
+
+
+class ChunkReport(BaseModel):
+    agent_id: str = Field(..., min_length=1)
+    job_id: str
+    chunk: int
+    frames_done: int = 0
+    message: str = ""
+
+
+def _chunk_view(farm_job) -> Dict[str, Any]:
+    return {
+        "job_id": farm_job.job_id,
+        "agents": sorted(farm_job.agents),
+        "chunks": [
+            {"chunk": c.index, "frame_start": c.frame_start, "frame_end": c.frame_end,
+             "state": c.state, "agent": c.agent, "attempts": c.attempts, "frames_done": c.frames_done}
+            for c in farm_job.chunks
+        ],
+    }
+
+
+@router.post("/jobs")
+async def create_farm_job(data: FarmJobRequest):
+    """Create a render job whose frame range is split into chunks for farm agents."""
+    diagnostics = run_preflight_checks(data.config)
+    if not diagnostics.ok:
+        raise HTTPException(status_code=400, detail=diagnostics.to_dict())
+    job = job_manager.create_job(data.config)
+    try:
+        farm_job = coordinator.submit(job.id, data.chunk_frames)
+    except ValueError as e:
+        job_manager.mark_error(job.id, {"message": str(e)})
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "running", **_chunk_view(farm_job), "diagnostics": diagnostics.to_dict()}
+
+
+@router.get("/jobs")
+async def list_farm_jobs():
+    """Farm jobs still being rendered, with the state of each chunk."""
+    return {"jobs": [_chunk_view(farm_job) for farm_job in coordinator.jobs()]}
+
+
+@router.get("/jobs/{job_id}")
+async def get_farm_job(job_id: str):
+    try:
+        return _chunk_view(coordinator.get(job_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Farm job not found or no longer running")
+
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_farm_job(job_id: str):
+    """Re-split an interrupted job from its first unfinished chunk."""
+    try:
+        job_manager.resume_job(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Render job not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "running", **_chunk_view(coordinator.submit(job_id))}
+
+
+@router.get("/agents")
+async def list_agents():
+    """Agents that have called in, with seconds since they were last heard from."""
+    return {"agents": coordinator.agents()}
+
+
+@router.post("/lease")
+async def lease_chunk(data: LeaseRequest):
+    """Lease the next pending chunk; ``lease`` is null when there is no work."""
+    return {"lease": coordinator.lease(data.agent_id)}
+
+
+@router.post("/heartbeat")
+async def heartbeat(data: ChunkReport):
+    """Extend a lease. 409 tells the agent to stop: the chunk is no longer its."""
+    try:
+        coordinator.heartbeat(data.agent_id, data.job_id, data.chunk, data.frames_done)
+    except LeaseLost as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "ok"}
+
+
+@router.post("/complete")
+async def complete_chunk(data: ChunkReport):
+    try:
+        coordinator.complete(data.agent_id, data.job_id, data.chunk)
+    except LeaseLost as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "ok"}
+
+
+@router.post("/fail")
+async def fail_chunk(data: ChunkReport):
+    try:
+        coordinator.fail(data.agent_id, data.job_id, data.chunk, data.message)
+    except LeaseLost as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "ok"}
@@ -2,27 +2,45 @@
 from __future__ import annotations
 
 import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+import numpy as np
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel, Field
 
-from cedartoy.project import load_project
+from cedartoy.musicue import file_stat_key
+from cedartoy.project import check_bundle_sha, load_project
+from cedartoy.server import workers
+from cedartoy.server.api.audio import encode_binary
+from cedartoy.waveform import load_peak_pyramid
 
 router = APIRouter()
 
+# Validated bundle bytes keyed by path; an entry is reused only while the
+# file's (size, mtime_ns) is unchanged. Bounded so long sessions that open
+# many projects don't pin every bundle in memory.
+_BUNDLE_CACHE_MAX = 8
+_bundle_cache: "OrderedDict[str, tuple[tuple[int, int], bytes]]" = OrderedDict()
+_bundle_lock = threading.Lock()  # project_bundle runs on FastAPI's threadpool
+
 
 class ProjectLoadRequest(BaseModel):
     path: str = Field(..., description="Folder, audio, bundle, or stem path.")
+    background_sha: bool = Field(
+        False, description="Return before hashing the audio; poll /sha for the verdict.")
 
 
 @router.post("/load")
-def project_load(body: ProjectLoadRequest) -> dict:
+async def project_load(body: ProjectLoadRequest) -> dict:
     p = Path(body.path)
     if not p.exists():
         raise HTTPException(status_code=404, detail=f"path does not exist: {p}")
-    proj = load_project(p)
+    # May hash a multi-GB WAV; keep it on the I/O pool.
+    proj = await workers.run("project_load", load_project, p,
+                             background_sha=body.background_sha)
     audio_path_str = str(proj.audio_path) if proj.audio_path else None
     audio_url = f"/api/project/audio?path={audio_path_str}" if audio_path_str else None
     return {
@@ -33,10 +51,25 @@ def project_load(body: ProjectLoadRequest) -> dict:
         "stems_paths": {k: str(v) for k, v in proj.stems_paths.items()},
         "manifest": proj.manifest,
         "bundle_sha_matches_audio": proj.bundle_sha_matches_audio,
+        "sha_pending": proj.sha_pending,
         "warnings": proj.warnings,
     }
 
 
+@router.get("/sha")
+def project_sha(audio_path: str, bundle_path: str) -> dict:
+    """Poll the background audio-vs-bundle sha check started by /load."""
+    audio, bundle = Path(audio_path), Path(bundle_path)
+    if not audio.is_file() or not bundle.is_file():
+        raise HTTPException(status_code=404, detail="audio or bundle not found")
+    sha = check_bundle_sha(audio, bundle, background=True)
+    return {
+        "sha_pending": sha.pending,
+        "bundle_sha_matches_audio": sha.matches,
+        "warnings": sha.warnings,
+    }
+
+
 @router.get("/audio")
 def project_audio(path: str):
     """Stream the project's audio file with Range support.
@@ -52,43 +85,77 @@ def project_audio(path: str):
 
 
 @router.get("/waveform")
-def project_waveform(path: str, n: int = 1000) -> dict:
-    """Return `n` peak values (range -1.0..1.0) sampled across the audio file.
-
-    Used by cue-scrubber to paint the waveform underlay. The wav is read
-    fresh each call (no global state) — cheap for typical 3-5 minute songs.
+async def project_waveform(path: str, n: int = 1000, start: float = 0.0,
+                           end: float | None = None, format: str = "json"):
+    """Return `n` peak columns of the audio between `start` and `end` seconds.
+
+    Used by cue-scrubber to paint the waveform underlay. Served from the
+    file's min/max peak pyramid (cedartoy.waveform), built on first use and
+    cached on disk, so any zoom level is answered without reading the PCM.
+    `peaks` (0..1 absolute peak) is kept for existing callers; `min`/`max`
+    carry the signed envelope. `format=f32|u8` returns the (min, max)
+    pairs as a binary body instead.
     """
     p = Path(path)
     if not p.exists() or not p.is_file():
         raise HTTPException(status_code=404, detail="audio not found")
-    import numpy as np
-    import soundfile as sf
-    data, _ = sf.read(str(p), always_2d=False)
-    if data.ndim == 2:
-        data = data.mean(axis=1)
-    if len(data) == 0:
-        return {"peaks": [0.0] * n}
-    bucket = max(1, len(data) // n)
-    peaks = []
-    for i in range(n):
-        start = i * bucket
-        end = min(start + bucket, len(data))
-        chunk = data[start:end]
-        peaks.append(float(np.max(np.abs(chunk))) if len(chunk) else 0.0)
-    return {"peaks": peaks}
+    if n < 1 or n > 100_000:
+        raise HTTPException(status_code=400, detail="n must be between 1 and 100000")
+    pyramid = await workers.run("waveform", load_peak_pyramid, p)
+    end_sec = pyramid.duration_sec if end is None else end
+    lo, hi = pyramid.view(start, end_sec, n)
+    if format != "json":
+        # Interleaved (min, max) per column; u8 maps -1..1 onto 0..255.
+        pairs = np.stack([lo, hi], axis=1)
+        if format == "u8":
+            pairs = pairs * 0.5 + 0.5
+        return Response(
+            content=encode_binary(pairs, format),
+            media_type="application/octet-stream",
+            headers={
+                "X-Waveform-Columns": str(n),
+                "X-Waveform-Start": str(start),
+                "X-Waveform-End": str(end_sec),
+                "X-Audio-Format": format,
+            },
+        )
+    return {
+        "peaks": np.maximum(np.abs(lo), np.abs(hi)).tolist(),
+        "min": lo.tolist(),
+        "max": hi.tolist(),
+        "start": start,
+        "end": end_sec,
+        "duration": pyramid.duration_sec,
+    }
 
 
 @router.get("/bundle")
-def project_bundle(path: str) -> dict:
+def project_bundle(path: str) -> Response:
     """Return the bundle JSON at a server-local path.
 
     Consumed by the cue-scrubber which needs sections/beats/drums/energy
-    arrays to render the timeline.
+    arrays to render the timeline. The file is parsed once to validate it;
+    while it stays unchanged on disk the same bytes are served as-is.
     """
     p = Path(path)
     if not p.exists() or not p.is_file():
         raise HTTPException(status_code=404, detail="bundle not found")
+    cache_key = str(p.resolve())
+    stat_key = file_stat_key(p)
+    with _bundle_lock:
+        cached = _bundle_cache.get(cache_key)
+        if cached is not None and cached[0] == stat_key:
+            _bundle_cache.move_to_end(cache_key)
+    if cached is not None and cached[0] == stat_key:
+        return Response(content=cached[1], media_type="application/json")
+    raw = p.read_bytes()
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        json.loads(raw)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"bundle parse error: {e}") from e
+    with _bundle_lock:
+        _bundle_cache[cache_key] = (stat_key, raw)
+        _bundle_cache.move_to_end(cache_key)
+        while len(_bundle_cache) > _BUNDLE_CACHE_MAX:
+            _bundle_cache.popitem(last=False)
+    return Response(content=raw, media_type="application/json")
@@ -8,10 +8,12 @@ from pydantic import BaseModel, Field
 from cedartoy.diagnostics import run_preflight_checks
 from cedartoy.render_estimate import estimate_render, load_history
 from cedartoy.server.jobs import RenderJobManager
+from cedartoy.server.scheduler import RenderScheduler
 
 
 router = APIRouter()
 job_manager = RenderJobManager(Path(gettempdir()) / "cedartoy_jobs")
+scheduler = RenderScheduler(job_manager)
 
 
 class EstimateRequest(BaseModel):
@@ -53,28 +55,74 @@ def estimate(body: EstimateRequest) -> dict:
 
 class RenderConfig(BaseModel):
     config: Dict[str, Any]
+    priority: int = Field(0, description="Higher runs first; equal priorities run in order.")
 
 
 @router.post("/start")
 async def start_render(data: RenderConfig):
-    """Create a render job and write its normalized config to a temp file."""
+    """Create a render job and queue it on the server's scheduler.
+
+    The job runs without a WebSocket; subscribe on ``/ws/render`` with
+    its ``job_id`` to follow progress.
+    """
     diagnostics = run_preflight_checks(data.config)
     if not diagnostics.ok:
         raise HTTPException(status_code=400, detail=diagnostics.to_dict())
     job = job_manager.create_job(data.config)
+    position = scheduler.submit(job.id, priority=data.priority)
     return {
         "status": "queued",
         "job_id": job.id,
         "config_file": str(job.config_file),
+        "queue_position": position,
         "diagnostics": diagnostics.to_dict(),
     }
 
 
+@router.get("/queue")
+async def get_render_queue():
+    """Running jobs and queued jobs in start order."""
+    return {
+        "running": scheduler.running(),
+        "queued": scheduler.queued(),
+        "max_concurrent": scheduler.max_concurrent,
+        "ram_budget_bytes": scheduler.ram_budget_bytes,
+        "reserved_bytes": scheduler.reserved_bytes,
+    }
+
+
+@router.get("/jobs")
+async def list_render_jobs(limit: int = 50):
+    """Most recent jobs, including those from before a server restart."""
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    return {"jobs": [
+        {"job_id": job.id, "status": job.status, "shader": job.config.get("shader"),
+         "progress": job.progress, "resumable": job.resumable,
+         "created_at": job.created_at, "updated_at": job.updated_at}
+        for job in job_manager.list_jobs(limit)
+    ]}
+
+
+@router.post("/{job_id}/resume")
+async def resume_render(job_id: str):
+    """Re-queue a job interrupted by a server restart, skipping frames already rendered."""
+    try:
+        position = scheduler.resume(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Render job not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    job = job_manager.get_job(job_id)
+    return {"status": "queued", "job_id": job_id, "queue_position": position,
+            "frame_start": job.config.get("frame_start")}
+
+
 @router.post("/{job_id}/cancel")
 async def cancel_render(job_id: str):
-    """Cancel a render job by ID."""
+    """Cancel a queued or running render job by ID."""
     try:
-        job_manager.cancel_job(job_id)
+        scheduler.cancel(job_id)
     except KeyError:
         raise HTTPException(status_code=404, detail="Render job not found")
     return {"status": "cancelled", "job_id": job_id}
@@ -90,9 +138,13 @@ async def get_render_status(job_id: str):
     return {
         "job_id": job.id,
         "status": job.status,
+        "priority": job.priority,
+        "queue_position": scheduler.position(job.id),
         "progress": job.progress,
         "result": job.result,
         "error": job.error,
+        "resumable": job.resumable,
+        "subscribers": scheduler.hub.subscriber_count(job.id),
         "logs": [entry.__dict__ for entry in job.logs],
     }
 
@@ -1,33 +1,37 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse, Response
 from pathlib import Path
-from typing import List, Dict
-import re
+from typing import List, Dict, Optional
 from PIL import Image
 import io
-import tempfile
-import shutil
+
+from cedartoy import shader as shader_mod
+from cedartoy import thumbnails
+from cedartoy.server import workers
+from cedartoy.server.shader_index import ShaderIndex, parse_shader_metadata
 
 router = APIRouter()
 
 SHADERS_DIR = Path(__file__).parent.parent.parent.parent / "shaders"
-THUMBNAIL_CACHE_DIR = Path(__file__).parent.parent.parent.parent / "thumbnails"
-THUMBNAIL_CACHE_DIR.mkdir(exist_ok=True)
+shader_index = ShaderIndex(SHADERS_DIR)
 
 # Note: Route order matters! Specific routes must come before catch-all routes.
 # /thumbnail must be defined before /{shader_path:path}
 
+def _placeholder_png() -> bytes:
+    img = Image.new('RGB', (256, 144), color=(26, 26, 46))
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
 @router.get("/thumbnail")
 async def get_thumbnail(path: str):
-    """Generate or retrieve cached shader thumbnail"""
-    # Sanitize path for cache filename
-    safe_name = path.replace('/', '_').replace('\\', '_').replace('..', '')
-    cache_path = THUMBNAIL_CACHE_DIR / f"{safe_name}.png"
-
-    if cache_path.exists():
-        return FileResponse(cache_path, media_type="image/png")
+    """Generate or retrieve cached shader thumbnail
 
-    # Generate thumbnail using renderer
+    Served by the thumbnail service (cedartoy.thumbnails): one persistent
+    GL worker, cache keyed on the shader source and header contents.
+    """
     shader_path = SHADERS_DIR / path
 
     if not shader_path.exists():
@@ -40,113 +44,46 @@ async def get_thumbnail(path: str):
         raise HTTPException(status_code=403, detail="Access denied")
 
     try:
-        from cedartoy.render import Renderer
-        from cedartoy.types import RenderJob, BufferConfig, MultipassGraphConfig
-
-        # Create minimal render job for thumbnail
-        output_dir = Path(tempfile.mkdtemp())
-
-        # Create simple multipass config for single-pass render
-        multipass = MultipassGraphConfig(
-            buffers={
-                "Image": BufferConfig(
-                    name="Image",
-                    shader=shader_path,
-                    outputs_to_screen=True,
-                    channels={}
-                )
-            },
-            execution_order=["Image"]
-        )
-
-        job = RenderJob(
-            shader_main=shader_path,
-            shader_buffers={},
-            output_dir=output_dir,
-            output_pattern="thumb_{frame:05d}.png",
-            width=256,
-            height=144,
-            fps=1.0,
-            duration_sec=0.0,
-            frame_start=0,
-            frame_end=0,
-            ss_scale=1.0,
-            temporal_samples=1,
-            shutter=0.0,
-            tiles_x=1,
-            tiles_y=1,
-            default_output_format="png",
-            default_bit_depth="8",
-            iMouse=(0.0, 0.0, 0.0, 0.0),
-            iChannel_paths={},
-            defines={},
-            audio_path=None,
-            audio_mode="shadertoy",
-            audio_fps=1.0,
-            audio_meta=None,
-            camera_mode="2d",
-            camera_stereo="none",
-            camera_fov=90.0,
-            camera_params={"tilt_deg": 0.0, "ipd": 0.064},
-            multipass_graph=multipass
-        )
-
-        # Render single frame
-        renderer = Renderer(job)
-        renderer.render_frame(0, output_dir)
-        renderer.cleanup()
-
-        # Find generated image
-        thumb_path = output_dir / "thumb_00000.png"
-        if thumb_path.exists():
-            # Copy to cache
-            shutil.copy(thumb_path, cache_path)
-            # Clean up temp dir
-            shutil.rmtree(output_dir, ignore_errors=True)
-            return FileResponse(cache_path, media_type="image/png")
-        else:
-            shutil.rmtree(output_dir, ignore_errors=True)
-            raise HTTPException(status_code=500, detail="Thumbnail generation failed")
-
+        cache_path = await thumbnails.service.get(shader_path)
+        return FileResponse(cache_path, media_type="image/png")
     except Exception as e:
         print(f"Thumbnail error: {e}")
         import traceback
         traceback.print_exc()
         # Return placeholder on error
-        img = Image.new('RGB', (256, 144), color=(26, 26, 46))
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
+        return Response(content=_placeholder_png(), media_type="image/png")
 
-        return Response(content=buffer.getvalue(), media_type="image/png")
+def shader_files() -> List[Path]:
+    """Library shaders, skipping common header files."""
+    return [SHADERS_DIR / entry.path for entry in shader_index.entries()]
 
 @router.get("/", response_model=List[Dict])
-async def list_shaders():
-    """List all available shader files"""
-    shaders = []
-    for shader_file in SHADERS_DIR.rglob("*.glsl"):
-        # Skip common header files
-        if "common" in shader_file.parts:
-            continue
-
-        relative_path = shader_file.relative_to(SHADERS_DIR)
-
-        # Parse metadata from shader comments
-        metadata = _parse_shader_metadata(shader_file)
-
-        shaders.append({
-            "path": str(relative_path).replace("\\", "/"),
-            "name": metadata.get("name", relative_path.stem),
-            "author": metadata.get("author", "Unknown"),
-            "description": metadata.get("description", ""),
-        })
-
-    return shaders
+async def list_shaders(response: Response, q: Optional[str] = None,
+                       uniform: Optional[str] = None, offset: int = 0,
+                       limit: Optional[int] = None):
+    """List shader files from the library index.
+
+    ``q`` matches path, name, author or description (case-insensitive);
+    ``uniform`` keeps shaders declaring that uniform. ``offset``/``limit``
+    page the path-sorted result; the full match count is returned in
+    ``X-Total-Count``.
+    """
+    if offset < 0 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit >= 1")
+    total, page = await workers.run("shader_list", shader_index.query,
+                                    q=q, uniform=uniform, offset=offset, limit=limit)
+    response.headers["X-Total-Count"] = str(total)
+    return page
 
 # Catch-all route must be LAST
 @router.get("/{shader_path:path}")
 async def get_shader(shader_path: str):
-    """Get shader source code"""
+    """Get shader source code.
+
+    ``source`` is the file as written, for the editor. ``resolved_source``
+    has its ``#include`` directives expanded (``shader.resolve_includes``)
+    for the browser preview, or is null with ``include_error`` set.
+    """
     full_path = SHADERS_DIR / shader_path
 
     if not full_path.exists() or not full_path.is_file():
@@ -158,14 +95,19 @@ async def get_shader(shader_path: str):
     except ValueError:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    with open(full_path, 'r') as f:
-        source = f.read()
-
-    metadata = _parse_shader_metadata(full_path)
+    source = await workers.run("shader_read", full_path.read_text)
+    metadata = await workers.run("shader_read", _parse_shader_metadata, full_path)
+    try:
+        resolved = await workers.run("shader_read", shader_mod.resolve_includes, source, full_path)
+        resolved_source, include_error = resolved.text, None
+    except shader_mod.ShaderIncludeError as e:
+        resolved_source, include_error = None, str(e)
 
     return {
         "path": shader_path,
         "source": source,
+        "resolved_source": resolved_source,
+        "include_error": include_error,
         "metadata": metadata
     }
 
@@ -188,51 +130,14 @@ async def save_shader(data: dict):
 
     with open(full_path, 'w') as f:
         f.write(source)
+    shader_index.update(full_path)
 
     return {"status": "success"}
 
 def _parse_shader_metadata(shader_path: Path) -> Dict:
     """Parse metadata from shader header comments"""
-    metadata = {}
-
     try:
         with open(shader_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                if not line.startswith("//"):
-                    break
-
-                # Parse patterns like: // Name: My Shader
-                match = re.match(r'^//\s*(\w+):\s*(.+)$', line)
-                if match:
-                    key = match.group(1).lower()
-                    value = match.group(2).strip()
-                    metadata[key] = value
-                
-                # Parse params: // @param name type default min max label
-                # Example: // @param speed float 1.0 0.0 5.0 "Speed Factor"
-                param_match = re.match(r'^//\s*@param\s+(\w+)\s+(\w+)\s+([^\s]+)\s+([^\s]+)\s+([^\s]+)\s+(.+)$', line)
-                if param_match:
-                    if "parameters" not in metadata:
-                        metadata["parameters"] = []
-                    
-                    p_name, p_type, p_def, p_min, p_max, p_label = param_match.groups()
-                    
-                    # Strip quotes from label if present
-                    if p_label.startswith('"') and p_label.endswith('"'):
-                        p_label = p_label[1:-1]
-                        
-                    metadata["parameters"].append({
-                        "name": p_name,
-                        "type": p_type,
-                        "default": float(p_def) if p_type == "float" else int(p_def),
-                        "min": float(p_min) if p_type == "float" else int(p_min),
-                        "max": float(p_max) if p_type == "float" else int(p_max),
-                        "label": p_label
-                    })
+            return parse_shader_metadata(f)
     except Exception:
-        pass
-
-    return metadata
+        return {}
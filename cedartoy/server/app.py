@@ -1,9 +1,41 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-app = FastAPI(title="CedarToy Web UI", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    import asyncio
+    from cedartoy import thumbnails
+    from .api.render import scheduler
+    from .api.shaders import shader_files
+    from .render_pool import pool as render_workers
+    from .settings import settings
+
+    render_workers.configure(size=settings.render_workers, max_jobs=settings.worker_max_jobs,
+                             memory_budget_mb=settings.worker_memory_budget_mb)
+    scheduler.configure(max_concurrent=settings.render_workers,
+                        ram_budget_bytes=settings.ram_budget_bytes)
+    # Re-queue or re-attach render jobs from before a restart.
+    scheduler.recover()
+    if settings.prewarm_thumbnails:
+        # Render missing library thumbnails in the background.
+        asyncio.get_running_loop().run_in_executor(
+            None, lambda: thumbnails.service.prewarm(shader_files()))
+    yield
+    # Delete uploaded audio temp files, then stop the worker pools.
+    from .analysis import registry
+    from .workers import pools
+    scheduler.close()
+    registry.close()
+    pools.shutdown()
+    render_workers.shutdown()
+    thumbnails.service.close()
+
+
+app = FastAPI(title="CedarToy Web UI", version="0.1.0", lifespan=lifespan)
 
 # CORS - restricted to localhost origins only for security
 # This prevents cross-origin requests from untrusted sites
@@ -29,13 +61,14 @@ async def health_check():
     return {"status": "ok", "message": "CedarToy Web UI is running"}
 
 # Import and mount API routers
-from .api import shaders, config, audio, render, files, project, reactivity
+from .api import shaders, config, audio, render, files, project, reactivity, farm
 from .websocket import router as ws_router
 
 app.include_router(shaders.router, prefix="/api/shaders", tags=["shaders"])
 app.include_router(config.router, prefix="/api/config", tags=["config"])
 app.include_router(audio.router, prefix="/api/audio", tags=["audio"])
 app.include_router(render.router, prefix="/api/render", tags=["render"])
+app.include_router(farm.router, prefix="/api/farm", tags=["farm"])
 app.include_router(files.router, prefix="/api/files", tags=["files"])
 app.include_router(project.router, prefix="/api/project", tags=["project"])
 app.include_router(reactivity.router, prefix="/api/reactivity", tags=["reactivity"])
@@ -0,0 +1,252 @@
+"""Render farm coordinator: one job's frame range split across hosts.
+
+``POST /api/farm/jobs`` splits a job's frames into chunks of
+``chunk_frames``. Agents (``python -m cedartoy.farm_agent`` on each render
+host) lease chunks over HTTP and render them on their own GPU into the
+job's ``output_dir``, normally a share that every host mounts.
+
+A lease lasts ``lease_sec`` and is extended by heartbeats. When it runs
+out (the agent died or lost the network), the chunk goes back to the
+pending list for the next agent. A chunk that fails or expires
+``MAX_CHUNK_ATTEMPTS`` times fails the whole job.
+
+Progress and the outcome go to the job's ordinary record, so the
+``/api/render`` status, the job list, WebSocket subscribers and
+``cedartoy watch`` all work for farm jobs too. Each chunk starts with
+cleared feedback buffers, as after a resume. Chunk state lives in memory:
+after a server restart a farm job is interrupted like any running job,
+and resumes from its first unfinished chunk.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from cedartoy.config import load_defaults, merge_configs
+from cedartoy.server.jobs import JobStatus, RenderJobManager
+from cedartoy.server.progress_hub import ProgressHub
+
+DEFAULT_CHUNK_FRAMES = 50
+LEASE_SEC = 30.0
+MAX_CHUNK_ATTEMPTS = 3
+
+
+class LeaseLost(Exception):
+    """The agent no longer holds the chunk: it expired, was re-leased, or the job ended."""
+
+
+@dataclass
+class Chunk:
+    index: int
+    frame_start: int
+    frame_end: int
+    state: str = "pending"  # pending | leased | done
+    agent: Optional[str] = None
+    expires: float = 0.0
+    attempts: int = 0
+    frames_done: int = 0
+
+    @property
+    def frames(self) -> int:
+        return self.frame_end - self.frame_start
+
+
+@dataclass
+class FarmJob:
+    job_id: str
+    config: Dict[str, Any]
+    chunks: List[Chunk]
+    started: float
+    agents: Set[str] = field(default_factory=set)
+
+    @property
+    def total_frames(self) -> int:
+        return sum(chunk.frames for chunk in self.chunks)
+
+    def frames_done(self) -> int:
+        return sum(chunk.frames if chunk.state == "done" else chunk.frames_done for chunk in self.chunks)
+
+    def frames_contiguous(self) -> int:
+        """Frames finished from the start of the range without a gap (safe to resume after)."""
+        done = 0
+        for chunk in self.chunks:
+            if chunk.state != "done":
+                break
+            done += chunk.frames
+        return done
+
+
+def frame_range(config: Dict[str, Any]) -> Tuple[int, int]:
+    """``(frame_start, frame_end)`` as the renderer resolves them (``ValueError`` if empty).
+
+    Ranges the renderer would take from the audio file's length cannot be
+    split up front; those jobs need ``frame_end`` or ``duration_sec``.
+    """
+    cfg = merge_configs(load_defaults(), config)
+    start = int(cfg.get("frame_start") or 0)
+    end = int(cfg.get("frame_end") or 0)
+    if end <= start:
+        end = start + int(round(float(cfg.get("duration_sec") or 0) * float(cfg.get("fps") or 0)))
+    if end <= start:
+        raise ValueError("farm jobs need a frame range: set frame_end or duration_sec")
+    return start, end
+
+
+def split_frames(start: int, end: int, chunk_frames: int) -> List[Chunk]:
+    if chunk_frames < 1:
+        raise ValueError("chunk_frames must be at least 1")
+    return [Chunk(i, s, min(s + chunk_frames, end)) for i, s in enumerate(range(start, end, chunk_frames))]
+
+
+class FarmCoordinator:
+    def __init__(self, manager: RenderJobManager, hub: Optional[ProgressHub] = None,
+                 lease_sec: float = LEASE_SEC, clock: Callable[[], float] = time.monotonic):
+        self.manager = manager
+        self.hub = hub if hub is not None else ProgressHub()
+        self.lease_sec = lease_sec
+        self.clock = clock
+        self._jobs: Dict[str, FarmJob] = {}
+        self._seen: Dict[str, float] = {}
+
+    def submit(self, job_id: str, chunk_frames: int = DEFAULT_CHUNK_FRAMES) -> FarmJob:
+        """Split a created job into chunks for agents to lease (``ValueError`` on a bad range)."""
+        job = self.manager.get_job(job_id)
+        start, end = frame_range(job.config)
+        farm_job = FarmJob(job_id, dict(job.config), split_frames(start, end, chunk_frames), self.clock())
+        self._jobs[job_id] = farm_job
+        # No local process; a restart finds it running and marks it interrupted.
+        self.manager.mark_running(job_id, None)
+        self.manager.update_progress(job_id, self._progress(farm_job))
+        self._log(job_id, f"Split frames {start}-{end} into {len(farm_job.chunks)} chunks")
+        self.hub.publish(job_id, {"type": "render_started", "job_id": job_id})
+        return farm_job
+
+    def jobs(self) -> List[FarmJob]:
+        return list(self._jobs.values())
+
+    def get(self, job_id: str) -> FarmJob:
+        return self._jobs[job_id]
+
+    def agents(self) -> Dict[str, float]:
+        """Seconds since each agent last called in."""
+        now = self.clock()
+        return {agent: round(now - seen, 1) for agent, seen in sorted(self._seen.items())}
+
+    # --- agent calls ---------------------------------------------------
+
+    def lease(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """The next pending chunk of the oldest job, leased to ``agent_id``; None if there is none."""
+        self._seen[agent_id] = now = self.clock()
+        self._expire(now)
+        for farm_job in list(self._jobs.values()):
+            if not self._active(farm_job):
+                continue
+            for chunk in farm_job.chunks:
+                if chunk.state == "pending":
+                    chunk.state, chunk.agent, chunk.frames_done = "leased", agent_id, 0
+                    chunk.expires = now + self.lease_sec
+                    chunk.attempts += 1
+                    farm_job.agents.add(agent_id)
+                    self._log(farm_job.job_id, f"Chunk {chunk.index} (frames {chunk.frame_start}-"
+                                               f"{chunk.frame_end}) leased to {agent_id}")
+                    config = dict(farm_job.config, frame_start=chunk.frame_start, frame_end=chunk.frame_end)
+                    return {"job_id": farm_job.job_id, "chunk": chunk.index,
+                            "frame_start": chunk.frame_start, "frame_end": chunk.frame_end,
+                            "config": config, "lease_sec": self.lease_sec}
+        return None
+
+    def heartbeat(self, agent_id: str, job_id: str, chunk_index: int, frames_done: int = 0) -> None:
+        """Extend a lease and record the chunk's progress (``LeaseLost`` if it is gone)."""
+        farm_job, chunk = self._held(agent_id, job_id, chunk_index)
+        chunk.expires = self.clock() + self.lease_sec
+        chunk.frames_done = max(0, min(int(frames_done), chunk.frames))
+        progress = self._progress(farm_job)
+        self.manager.update_progress(job_id, progress)
+        self.hub.publish(job_id, {"type": "render_progress", "job_id": job_id, **progress})
+
+    def complete(self, agent_id: str, job_id: str, chunk_index: int) -> None:
+        farm_job, chunk = self._held(agent_id, job_id, chunk_index)
+        chunk.state, chunk.agent = "done", None
+        progress = self._progress(farm_job)
+        self.manager.update_progress(job_id, progress)
+        self.hub.publish(job_id, {"type": "render_progress", "job_id": job_id, **progress})
+        self._log(job_id, f"Chunk {chunk.index} done by {agent_id}")
+        if all(c.state == "done" for c in farm_job.chunks):
+            result = {"output_dir": str(farm_job.config.get("output_dir", "renders")),
+                      "frames": farm_job.total_frames, "chunks": len(farm_job.chunks),
+                      "agents": sorted(farm_job.agents),
+                      "elapsed_sec": round(self.clock() - farm_job.started, 2)}
+            del self._jobs[job_id]
+            self.manager.mark_complete(job_id, result)
+            self.hub.publish(job_id, {"type": "render_complete", "job_id": job_id, **result})
+
+    def fail(self, agent_id: str, job_id: str, chunk_index: int, message: str) -> None:
+        farm_job, chunk = self._held(agent_id, job_id, chunk_index)
+        self._log(job_id, f"Chunk {chunk.index} failed on {agent_id}: {message}", level="error")
+        self._release(farm_job, chunk, message)
+
+    # --- internals -----------------------------------------------------
+
+    def _held(self, agent_id: str, job_id: str, chunk_index: int) -> Tuple[FarmJob, Chunk]:
+        self._seen[agent_id] = self.clock()
+        farm_job = self._jobs.get(job_id)
+        if farm_job is None or not self._active(farm_job):
+            raise LeaseLost(f"job {job_id} is no longer running")
+        if not 0 <= chunk_index < len(farm_job.chunks):
+            raise LeaseLost(f"job {job_id} has no chunk {chunk_index}")
+        chunk = farm_job.chunks[chunk_index]
+        if chunk.state != "leased" or chunk.agent != agent_id:
+            raise LeaseLost(f"chunk {chunk_index} of job {job_id} is not leased to {agent_id}")
+        return farm_job, chunk
+
+    def _active(self, farm_job: FarmJob) -> bool:
+        """False (and the job dropped) once it was cancelled or failed elsewhere."""
+        try:
+            status = self.manager.get_job(farm_job.job_id).status
+        except KeyError:
+            status = None
+        if status == JobStatus.RUNNING:
+            return True
+        del self._jobs[farm_job.job_id]
+        if status == JobStatus.CANCELLED:
+            self.hub.publish(farm_job.job_id, {"type": "render_cancelled", "job_id": farm_job.job_id})
+        return False
+
+    def _expire(self, now: float) -> None:
+        for farm_job in list(self._jobs.values()):
+            for chunk in farm_job.chunks:
+                if chunk.state == "leased" and chunk.expires <= now:
+                    self._log(farm_job.job_id, f"Lease on chunk {chunk.index} held by {chunk.agent} expired",
+                              level="warning")
+                    self._release(farm_job, chunk, f"lease held by {chunk.agent} expired")
+                    if farm_job.job_id not in self._jobs:
+                        break
+
+    def _release(self, farm_job: FarmJob, chunk: Chunk, reason: str) -> None:
+        chunk.state, chunk.agent, chunk.frames_done = "pending", None, 0
+        if chunk.attempts < MAX_CHUNK_ATTEMPTS:
+            return
+        error = {"message": f"Chunk {chunk.index} (frames {chunk.frame_start}-{chunk.frame_end}) "
+                            f"failed {chunk.attempts} times; last: {reason}",
+                 "resumable": True, "frames_done": farm_job.frames_contiguous()}
+        del self._jobs[farm_job.job_id]
+        job = self.manager.get_job(farm_job.job_id)
+        job.resumable = True
+        self.manager.mark_error(farm_job.job_id, error)
+        self.hub.publish(farm_job.job_id, {"type": "render_error", "job_id": farm_job.job_id, **error})
+
+    def _progress(self, farm_job: FarmJob) -> Dict[str, Any]:
+        done, total = farm_job.frames_done(), farm_job.total_frames
+        elapsed = self.clock() - farm_job.started
+        progress = {"frame": done, "total": total, "elapsed_sec": round(elapsed, 2),
+                    "frames_contiguous": farm_job.frames_contiguous(),
+                    "chunks_done": sum(c.state == "done" for c in farm_job.chunks),
+                    "chunks": len(farm_job.chunks)}
+        if done > 0 and elapsed > 0:
+            progress["eta_sec"] = round((total - done) / (done / elapsed), 1)
+        return progress
+
+    def _log(self, job_id: str, message: str, level: str = "info") -> None:
+        self.manager.append_log(job_id, message, level=level)
+        self.hub.publish(job_id, {"type": "render_log", "job_id": job_id, "message": message})
@@ -0,0 +1,181 @@
+"""SQLite store behind ``RenderJobManager``, so job records survive restarts.
+
+The database lives at ``<work dir>/jobs.sqlite3``. It runs in WAL mode,
+so status reads never wait on the render loop's writes. Tables:
+
+- ``jobs``: one row per job. It holds the config, status, priority, PID,
+  and the JSON progress checkpoint, result and error. Indexed by
+  ``(status, created_at)`` for the queue and job listings.
+- ``job_logs``: log lines, indexed by ``(job_id, id)``.
+- ``artifacts``: the output files recorded when a job completes, keyed
+  by ``(job_id, name)``.
+
+All access goes through one connection guarded by a lock. Callers are
+the event loop and, rarely, worker threads.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+JOB_DB_NAME = "jobs.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    config TEXT NOT NULL,
+    config_file TEXT NOT NULL,
+    process_pid INTEGER,
+    progress TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    resumable INTEGER NOT NULL DEFAULT 0,
+    artifacts_recorded INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    timestamp TEXT NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_logs_job ON job_logs (job_id, id);
+CREATE TABLE IF NOT EXISTS artifacts (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (job_id, name)
+) WITHOUT ROWID;
+"""
+
+_JOB_COLUMNS = ("id", "status", "priority", "config", "config_file", "process_pid", "progress",
+                "result", "error", "resumable", "created_at", "updated_at")
+_JSON_COLUMNS = ("config", "progress", "result", "error")
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value)
+
+
+class JobStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit; multi-statement writes use explicit transactions.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def _row(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        data = dict(row)
+        for column in _JSON_COLUMNS:
+            if data.get(column) is not None:
+                data[column] = json.loads(data[column])
+        data["resumable"] = bool(data.get("resumable"))
+        return data
+
+    def save_job(self, job: Dict[str, Any]) -> None:
+        """Insert or replace a job's row (not its logs or artifacts)."""
+        values = [_dumps(job[c]) if c in _JSON_COLUMNS else job[c] for c in _JOB_COLUMNS]
+        values[_JOB_COLUMNS.index("resumable")] = int(bool(job["resumable"]))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in _JOB_COLUMNS[1:])
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(_JOB_COLUMNS)}) VALUES ({', '.join('?' * len(_JOB_COLUMNS))}) "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}",
+                values,
+            )
+
+    def save_progress(self, job_id: str, progress: Dict[str, Any], updated_at: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?",
+                               (json.dumps(progress), updated_at, job_id))
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def jobs(self, statuses: Iterable[str] = (), limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Jobs oldest first, optionally only those in ``statuses``."""
+        statuses = list(statuses)
+        sql = "SELECT * FROM jobs"
+        if statuses:
+            sql += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+        sql += " ORDER BY created_at"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, statuses).fetchall()
+        return [self._row(row) for row in rows]
+
+    def recent_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (int(limit),)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def append_log(self, job_id: str, timestamp: str, level: str, message: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_logs (job_id, timestamp, level, message) VALUES (?, ?, ?, ?)",
+                (job_id, timestamp, level, message))
+
+    def logs(self, job_id: str, limit: int) -> List[Dict[str, Any]]:
+        """The last ``limit`` log entries, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, level, message FROM job_logs WHERE job_id = ? ORDER BY id DESC LIMIT ?",
+                (job_id, int(limit))).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def trim_logs(self, job_id: str, keep: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM job_logs WHERE job_id = ? AND id NOT IN "
+                "(SELECT id FROM job_logs WHERE job_id = ? ORDER BY id DESC LIMIT ?)",
+                (job_id, job_id, int(keep)))
+
+    def record_artifacts(self, job_id: str, artifacts: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM artifacts WHERE job_id = ?", (job_id,))
+                self._conn.executemany(
+                    "INSERT INTO artifacts (job_id, name, path, size) VALUES (?, ?, ?, ?)",
+                    [(job_id, a["name"], a["path"], a["size"]) for a in artifacts])
+                self._conn.execute("UPDATE jobs SET artifacts_recorded = 1 WHERE id = ?", (job_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def artifacts(self, job_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Recorded artifacts, or None when none were recorded for the job."""
+        with self._lock:
+            recorded = self._conn.execute(
+                "SELECT artifacts_recorded FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if recorded is None or not recorded[0]:
+                return None
+            rows = self._conn.execute(
+                "SELECT name, path, size FROM artifacts WHERE job_id = ? ORDER BY name", (job_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
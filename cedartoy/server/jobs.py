@@ -1,13 +1,25 @@
+import os
+import signal
+import time
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import StrEnum
 from pathlib import Path
-from typing import Any, Deque, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
 from uuid import uuid4
 
 import yaml
 
+from .job_store import JOB_DB_NAME, JobStore
+
+# In-memory log lines per job (all lines are kept in the store until the job ends).
+LOG_LIMIT = 500
+# Lines kept in the store once a job has finished.
+STORED_LOG_LIMIT = 2000
+# Progress is written to the store at most this often (status changes always are).
+PROGRESS_CHECKPOINT_SEC = 1.0
+
 
 class JobStatus(StrEnum):
     QUEUED = "queued"
@@ -30,50 +42,78 @@ class RenderJobRecord:
     config: Dict[str, Any]
     config_file: Path
     status: JobStatus = JobStatus.QUEUED
+    priority: int = 0
     process_pid: Optional[int] = None
     progress: Dict[str, Any] = field(default_factory=lambda: {"frame": 0, "total": 0, "eta_sec": 0})
-    logs: Deque[JobLogEntry] = field(default_factory=lambda: deque(maxlen=500))
+    logs: Deque[JobLogEntry] = field(default_factory=lambda: deque(maxlen=LOG_LIMIT))
     result: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, Any]] = None
+    resumable: bool = False
     process: Optional[Any] = None
     created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     updated_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 
 class RenderJobManager:
-    def __init__(self, work_dir: Path):
+    """Render job records, written through to a ``JobStore`` in the work dir.
+
+    Active and recently used records are kept in memory; anything else is
+    loaded from the store on demand, so jobs survive a server restart
+    (see ``recover``).
+    """
+
+    def __init__(self, work_dir: Path, store: Optional[JobStore] = None):
         self.work_dir = Path(work_dir)
         self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store if store is not None else JobStore(self.work_dir / JOB_DB_NAME)
         self._jobs: Dict[str, RenderJobRecord] = {}
+        self._progress_saved: Dict[str, float] = {}
 
     def create_job(self, config: Dict[str, Any]) -> RenderJobRecord:
         job_id = uuid4().hex
         config_file = self.work_dir / f"{job_id}.yaml"
         config_data = _yaml_safe(config)
-        with open(config_file, "w", encoding="utf-8") as fh:
-            yaml.safe_dump(config_data, fh)
+        _write_config(config_file, config_data)
         record = RenderJobRecord(id=job_id, config=dict(config_data), config_file=config_file)
         self._jobs[job_id] = record
+        self._save(record)
         return record
 
     def get_job(self, job_id: str) -> RenderJobRecord:
-        return self._jobs[job_id]
+        job = self._jobs.get(job_id)
+        if job is None:
+            row = self.store.load_job(job_id)
+            if row is None:
+                raise KeyError(job_id)
+            job = self._jobs[job_id] = self._from_row(row)
+        return job
 
-    def mark_running(self, job_id: str, process_pid: int, process: Optional[Any] = None) -> None:
+    def list_jobs(self, limit: int = 50) -> List[RenderJobRecord]:
+        """Most recent jobs first."""
+        return [self._jobs.get(row["id"]) or self._from_row(row) for row in self.store.recent_jobs(limit)]
+
+    def mark_running(self, job_id: str, process_pid: Optional[int], process: Optional[Any] = None) -> None:
         job = self.get_job(job_id)
         job.status = JobStatus.RUNNING
         job.process_pid = process_pid
         job.process = process
         self._touch(job)
+        self._save(job)
 
     def update_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
         job = self.get_job(job_id)
         job.progress = dict(progress)
         self._touch(job)
+        now = time.monotonic()
+        if now - self._progress_saved.get(job_id, 0.0) >= PROGRESS_CHECKPOINT_SEC:
+            self._progress_saved[job_id] = now
+            self.store.save_progress(job_id, job.progress, job.updated_at)
 
     def append_log(self, job_id: str, message: str, level: str = "info") -> None:
         job = self.get_job(job_id)
-        job.logs.append(JobLogEntry(timestamp=datetime.now(timezone.utc).isoformat(), message=message, level=level))
+        entry = JobLogEntry(timestamp=datetime.now(timezone.utc).isoformat(), message=message, level=level)
+        job.logs.append(entry)
+        self.store.append_log(job_id, entry.timestamp, entry.level, entry.message)
         self._touch(job)
 
     def mark_complete(self, job_id: str, result: Dict[str, Any]) -> None:
@@ -84,6 +124,8 @@ class RenderJobManager:
         self._cleanup_config(job)
         self._record_history(job, result)
         self._touch(job)
+        self._finish(job)
+        self.store.record_artifacts(job_id, self._scan_artifacts(job))
 
     def _record_history(self, job: RenderJobRecord, result: Dict[str, Any]) -> None:
         """Feed completion stats into the render_estimate history file.
@@ -127,6 +169,7 @@ class RenderJobManager:
         job.process = None
         self._cleanup_config(job)
         self._touch(job)
+        self._finish(job)
 
     def mark_cancelled(self, job_id: str) -> None:
         job = self.get_job(job_id)
@@ -134,15 +177,83 @@ class RenderJobManager:
         job.process = None
         self._cleanup_config(job)
         self._touch(job)
+        self._finish(job)
 
     def cancel_job(self, job_id: str) -> None:
         job = self.get_job(job_id)
         if job.process is not None and job.process.poll() is None:
             job.process.terminate()
+        elif (job.process is None and job.status == JobStatus.RUNNING and job.process_pid
+              and render_process_alive(job.process_pid)):
+            os.kill(job.process_pid, signal.SIGTERM)  # re-attached after a restart
         self.mark_cancelled(job_id)
 
-    def list_artifacts(self, job_id: str) -> List[Dict[str, Any]]:
+    def recover(self, pid_alive: Optional[Callable[[int], bool]] = None) -> Dict[str, List[str]]:
+        """Reconcile jobs left behind by a previous server process.
+
+        Running jobs whose render process is still alive are reported as
+        ``reattached``. Running jobs whose process is gone become errors
+        flagged ``resumable``, with their last progress checkpoint kept.
+        Queued jobs are returned oldest first for re-submission.
+        """
+        pid_alive = pid_alive or render_process_alive
+        report: Dict[str, List[str]] = {"queued": [], "reattached": [], "interrupted": []}
+        for row in self.store.jobs([JobStatus.QUEUED, JobStatus.RUNNING]):
+            job = self._jobs.get(row["id"]) or self._from_row(row)
+            self._jobs[job.id] = job
+            if job.status == JobStatus.QUEUED:
+                _write_config(job.config_file, job.config)
+                report["queued"].append(job.id)
+            elif job.process_pid and pid_alive(job.process_pid):
+                report["reattached"].append(job.id)
+            else:
+                self.mark_interrupted(job.id, "The server stopped while this job was running.")
+                report["interrupted"].append(job.id)
+        return report
+
+    def mark_interrupted(self, job_id: str, message: str) -> None:
+        """Fail a job whose render process was lost, allowing ``resume_job``."""
         job = self.get_job(job_id)
+        job.resumable = True
+        self.mark_error(job_id, {"message": message, "resumable": True,
+                                 "frames_done": _frames_done(job.progress)})
+
+    def resume_job(self, job_id: str) -> RenderJobRecord:
+        """Re-queue an interrupted job from its last progress checkpoint.
+
+        Frames already written are skipped by moving ``frame_start``
+        forward, and ``frame_end`` is pinned, so the range is unchanged.
+        Feedback buffers start from a cleared state at the resume point.
+        """
+        job = self.get_job(job_id)
+        if not job.resumable or job.status != JobStatus.ERROR:
+            raise ValueError("job is not resumable")
+        config = dict(job.config)
+        done = _frames_done(job.progress)
+        total = int(job.progress.get("total") or 0)
+        if 0 < done < total:
+            start = int(config.get("frame_start") or 0)
+            config["frame_start"] = start + done
+            config["frame_end"] = start + total
+        job.config = config
+        _write_config(job.config_file, config)
+        job.status = JobStatus.QUEUED
+        job.error = None
+        job.resumable = False
+        job.process_pid = None
+        job.progress = {"frame": 0, "total": 0, "eta_sec": 0}
+        self._touch(job)
+        self._save(job)
+        self.append_log(job_id, f"Resuming from frame {config.get('frame_start', 0)}")
+        return job
+
+    def list_artifacts(self, job_id: str) -> List[Dict[str, Any]]:
+        recorded = self.store.artifacts(job_id)
+        if recorded is not None:
+            return recorded
+        return self._scan_artifacts(self.get_job(job_id))
+
+    def _scan_artifacts(self, job: RenderJobRecord) -> List[Dict[str, Any]]:
         output_dir = Path(str(job.config.get("output_dir", "renders")))
         if not output_dir.exists():
             return []
@@ -162,6 +273,65 @@ class RenderJobManager:
     def _touch(self, job: RenderJobRecord) -> None:
         job.updated_at = datetime.now(timezone.utc).isoformat()
 
+    def _save(self, job: RenderJobRecord) -> None:
+        self._progress_saved[job.id] = time.monotonic()
+        self.store.save_job({
+            "id": job.id, "status": str(job.status), "priority": job.priority,
+            "config": job.config, "config_file": str(job.config_file),
+            "process_pid": job.process_pid, "progress": job.progress,
+            "result": job.result, "error": job.error, "resumable": job.resumable,
+            "created_at": job.created_at, "updated_at": job.updated_at,
+        })
+
+    def _finish(self, job: RenderJobRecord) -> None:
+        self._save(job)
+        self._progress_saved.pop(job.id, None)
+        self.store.trim_logs(job.id, STORED_LOG_LIMIT)
+
+    def _from_row(self, row: Dict[str, Any]) -> RenderJobRecord:
+        logs = deque((JobLogEntry(**entry) for entry in self.store.logs(row["id"], LOG_LIMIT)),
+                     maxlen=LOG_LIMIT)
+        return RenderJobRecord(
+            id=row["id"], config=row["config"], config_file=Path(row["config_file"]),
+            status=JobStatus(row["status"]), priority=row["priority"],
+            process_pid=row["process_pid"], progress=row["progress"], logs=logs,
+            result=row["result"], error=row["error"], resumable=row["resumable"],
+            created_at=row["created_at"], updated_at=row["updated_at"],
+        )
+
+
+def _write_config(config_file: Path, config_data: Dict[str, Any]) -> None:
+    with open(config_file, "w", encoding="utf-8") as fh:
+        yaml.safe_dump(config_data, fh)
+
+
+def _frames_done(progress: Dict[str, Any]) -> int:
+    """Frames rendered from the start of the range without a gap.
+
+    Farm jobs finish chunks out of order and report this separately as
+    ``frames_contiguous``; local renders go in order, so it is ``frame``.
+    """
+    return int(progress.get("frames_contiguous", progress.get("frame")) or 0)
+
+
+def render_process_alive(pid: int) -> bool:
+    """True if ``pid`` is running and (where /proc exists) is a cedartoy process."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return False  # someone else's process: the PID was reused
+    except OSError:
+        return False
+    cmdline = Path(f"/proc/{pid}/cmdline")
+    if cmdline.exists():
+        try:
+            return b"cedartoy" in cmdline.read_bytes()
+        except OSError:
+            return False
+    return True
+
 
 def _yaml_safe(value: Any) -> Any:
     if isinstance(value, Path):
@@ -0,0 +1,110 @@
+"""Per-job fan-out of render messages to any number of subscribers.
+
+Browser tabs and ``cedartoy watch`` subscribe to a job. A render can print
+thousands of lines a second, so messages are not forwarded one by one.
+Each subscription buffers what is published and hands it out at most
+``MAX_UPDATES_PER_SEC`` times a second:
+
+- ``render_progress`` is coalesced: only the newest one is delivered.
+- ``render_log`` lines are batched into one ``render_logs`` message with
+  a ``messages`` list. It keeps the last ``LOG_BATCH_LIMIT`` lines and
+  counts the rest in ``dropped``.
+- Any other message (started, complete, error, ...) is delivered as is,
+  in order.
+
+Publishing never waits on a subscriber, and a slow subscriber holds a
+bounded buffer.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+MAX_UPDATES_PER_SEC = 4.0
+LOG_BATCH_LIMIT = 200
+
+
+class Subscription:
+    """One subscriber's buffered view of a job's messages."""
+
+    def __init__(self, job_id: str, interval: float):
+        self.job_id = job_id
+        self.interval = interval
+        self._pending: List[Dict[str, Any]] = []
+        # Coalescing targets in the current run of pending messages; any
+        # other message starts a new run so the order is kept.
+        self._progress: Optional[int] = None
+        self._logs: Optional[int] = None
+        self._ready = asyncio.Event()
+        self._last = float("-inf")
+
+    def put(self, message: Dict[str, Any]) -> None:
+        kind = message.get("type")
+        if kind == "render_progress":
+            if self._progress is None:
+                self._progress = len(self._pending)
+                self._pending.append(message)
+            else:
+                self._pending[self._progress] = message
+        elif kind == "render_log":
+            if self._logs is None:
+                self._logs = len(self._pending)
+                self._pending.append({"type": "render_logs", "job_id": message.get("job_id"),
+                                      "messages": deque(maxlen=LOG_BATCH_LIMIT), "dropped": 0})
+            batch = self._pending[self._logs]
+            if len(batch["messages"]) == LOG_BATCH_LIMIT:
+                batch["dropped"] += 1
+            batch["messages"].append(message.get("message", ""))
+        else:
+            self._pending.append(message)
+            self._progress = self._logs = None
+        self._ready.set()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Everything buffered so far, without waiting."""
+        pending, self._pending = self._pending, []
+        self._progress = self._logs = None
+        self._ready.clear()
+        for message in pending:
+            if message["type"] == "render_logs":
+                message["messages"] = list(message["messages"])
+        return pending
+
+    async def get(self) -> List[Dict[str, Any]]:
+        """Wait for the next batch, no sooner than ``interval`` after the last one."""
+        while True:
+            await self._ready.wait()
+            delay = self._last + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)  # let more messages coalesce meanwhile
+            batch = self.drain()
+            if batch:
+                self._last = time.monotonic()
+                return batch
+
+
+class ProgressHub:
+    def __init__(self, max_updates_per_sec: float = MAX_UPDATES_PER_SEC):
+        self.interval = 1.0 / max_updates_per_sec if max_updates_per_sec > 0 else 0.0
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, job_id: str) -> Subscription:
+        subscription = Subscription(job_id, self.interval)
+        self._subscriptions.setdefault(job_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.job_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.job_id]
+
+    def subscriber_count(self, job_id: str) -> int:
+        return len(self._subscriptions.get(job_id, ()))
+
+    def publish(self, job_id: str, message: Dict[str, Any]) -> None:
+        for subscription in list(self._subscriptions.get(job_id, ())):
+            subscription.put(message)
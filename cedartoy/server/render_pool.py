@@ -0,0 +1,197 @@
+"""Pool of persistent render workers (``cedartoy.render_worker``).
+
+Each render used to start ``python -m cedartoy.cli render`` and pay for
+interpreter start-up, imports, a new GL context, shader compiles and audio
+analysis every time. Workers now stay up between jobs, and jobs are sent
+to them over their stdin pipe. A worker's stdout and stderr share one pipe,
+so ``RenderWorker.run`` returns the job's output lines in order.
+
+A worker that exits (crash, cancel, or retiring after ``max_jobs`` jobs
+or past its memory budget) is dropped. The next ``acquire`` starts a
+replacement. ``RenderWorker`` offers the ``poll``/``terminate`` subset of
+``Popen``, so ``RenderJobManager.cancel_job`` can stop it like the old
+per-job process.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import subprocess
+import sys
+import threading
+from typing import Callable, List, Optional
+
+from cedartoy.render_worker import DEFAULT_MAX_JOBS, DEFAULT_MEMORY_BUDGET_MB, WORKER_PREFIX
+
+_logger = logging.getLogger(__name__)
+
+# One GPU: jobs queue for a single worker by default.
+DEFAULT_POOL_SIZE = 1
+
+
+class RenderWorker:
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS,
+                 memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                 command: Optional[List[str]] = None):
+        self.command = command or [
+            sys.executable, "-m", "cedartoy.render_worker",
+            "--max-jobs", str(max_jobs), "--memory-budget-mb", str(memory_budget_mb),
+        ]
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        self.jobs = 0
+        self.retiring = False
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def poll(self) -> Optional[int]:
+        return self.process.poll()
+
+    def terminate(self) -> None:
+        self.process.terminate()
+
+    @property
+    def usable(self) -> bool:
+        return not self.retiring and self.process.poll() is None
+
+    def run(self, job_id: str, config_file: str, on_line: Callable[[str], None]) -> int:
+        """Render one job, passing each output line to ``on_line``; returns its exit code.
+
+        A worker that dies mid-job returns its process exit code (negative
+        when terminated by a signal, e.g. on cancel).
+        """
+        try:
+            self.process.stdin.write(json.dumps(
+                {"cmd": "render", "job_id": job_id, "config_file": str(config_file)}) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return self._exit_code()
+
+        for line in iter(self.process.stdout.readline, ""):
+            line = line.rstrip("\n")
+            if not line.startswith(WORKER_PREFIX):
+                on_line(line)
+                continue
+            try:
+                event = json.loads(line[len(WORKER_PREFIX):])
+            except json.JSONDecodeError:
+                continue
+            if event.get("event") == "job_done" and event.get("job_id") == job_id:
+                self.jobs = int(event.get("jobs", self.jobs + 1))
+                self.retiring = bool(event.get("retiring"))
+                return int(event.get("code", 1))
+        return self._exit_code()
+
+    def _exit_code(self) -> int:
+        code = self.process.wait()
+        return code if code != 0 else 1  # exited without finishing the job
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write(json.dumps({"cmd": "exit"}) + "\n")
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+class RenderWorkerPool:
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_jobs: int = DEFAULT_MAX_JOBS,
+                 memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                 command: Optional[List[str]] = None):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.memory_budget_mb = memory_budget_mb
+        self.command = command
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[RenderWorker] = []
+        self._busy: List[RenderWorker] = []
+        self._closed = False
+        self.started = 0
+
+    def configure(self, size: Optional[int] = None, max_jobs: Optional[int] = None,
+                  memory_budget_mb: Optional[float] = None) -> None:
+        """Apply start-up options (``cedartoy ui``); only while no worker is running."""
+        with self._lock:
+            if self._idle or self._busy:
+                raise RuntimeError("render workers are already running")
+            if size is not None:
+                self.size = size
+                self._slots = threading.BoundedSemaphore(size)
+            if max_jobs is not None:
+                self.max_jobs = max_jobs
+            if memory_budget_mb is not None:
+                self.memory_budget_mb = memory_budget_mb
+
+    def acquire(self) -> RenderWorker:
+        """A warm worker, starting one if none is idle. Blocks while all ``size`` are busy."""
+        self._slots.acquire()
+        try:
+            stale = []
+            with self._lock:
+                worker = None
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if candidate.usable:
+                        worker = candidate
+                        break
+                    stale.append(candidate)
+            for old in stale:
+                old.close()
+            if worker is None:
+                worker = RenderWorker(self.max_jobs, self.memory_budget_mb, self.command)
+                self.started += 1
+            with self._lock:
+                self._busy.append(worker)
+            return worker
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, worker: RenderWorker) -> None:
+        """Return a worker after its job; dead or retiring workers are closed."""
+        with self._lock:
+            if worker in self._busy:
+                self._busy.remove(worker)
+            keep = worker.usable and not self._closed
+            if keep:
+                self._idle.append(worker)
+        if not keep:
+            if worker.retiring:
+                _logger.info("Render worker %s retired after %d jobs", worker.pid, worker.jobs)
+            worker.close()
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, busy = self._idle, self._busy
+            self._idle, self._busy = [], []
+        for worker in busy:
+            if worker.poll() is None:
+                worker.terminate()
+        for worker in idle + busy:
+            worker.close()
+
+
+pool = RenderWorkerPool()
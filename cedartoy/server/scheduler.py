@@ -0,0 +1,337 @@
+"""Server-owned render queue.
+
+``POST /api/render/start`` queues a job here. The job then runs whether
+or not any WebSocket is connected. Sockets only subscribe to a job's
+messages, and a closed browser tab no longer leaves a render unsupervised.
+
+Jobs run highest ``priority`` first, then in submission order. A job
+starts only when both of these hold:
+
+- fewer than ``max_concurrent`` jobs are running (default: one per render
+  worker, i.e. per GPU);
+- its ``diagnostics.estimate_memory_bytes`` fits in what is left of
+  ``ram_budget_bytes`` (default: ``RAM_BUDGET_FRACTION`` of the RAM free
+  at start-up).
+
+A job larger than the whole budget still runs once nothing else is
+running. The queue is strict: smaller jobs do not overtake a waiting
+head, so large renders cannot be starved.
+
+Messages go out through a ``ProgressHub``, which coalesces and rate-limits
+them per subscriber.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from cedartoy.diagnostics import estimate_memory_bytes
+from cedartoy.server import render_pool
+from cedartoy.server.jobs import JobStatus, RenderJobManager, render_process_alive
+from cedartoy.server.progress_hub import ProgressHub, Subscription
+
+_logger = logging.getLogger(__name__)
+
+RAM_BUDGET_FRACTION = 0.8
+# How often a render process re-attached after a restart is checked.
+WATCH_INTERVAL_SEC = 2.0
+# Recent log lines sent to a new subscriber.
+SNAPSHOT_LOG_LINES = 20
+
+
+def _default_ram_budget() -> Optional[int]:
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available * RAM_BUDGET_FRACTION)
+    except Exception:
+        return None  # unknown: only the concurrency limit applies
+
+
+class RenderScheduler:
+    def __init__(self, manager: RenderJobManager, pool: Optional[Any] = None,
+                 max_concurrent: Optional[int] = None, ram_budget_bytes: Optional[int] = None,
+                 hub: Optional[ProgressHub] = None):
+        self.manager = manager
+        self.pool = pool if pool is not None else render_pool.pool
+        self.max_concurrent = max_concurrent or getattr(self.pool, "size", 1)
+        self.ram_budget_bytes = ram_budget_bytes if ram_budget_bytes is not None else _default_ram_budget()
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._memory: Dict[str, int] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self.hub = hub if hub is not None else ProgressHub()
+        self._closed = False
+
+    def configure(self, max_concurrent: Optional[int] = None,
+                  ram_budget_bytes: Optional[int] = None) -> None:
+        """Apply start-up options; ``None`` keeps the pool-size / free-RAM defaults."""
+        self.max_concurrent = max_concurrent or getattr(self.pool, "size", 1)
+        if ram_budget_bytes is not None:
+            self.ram_budget_bytes = ram_budget_bytes
+
+    # --- queue ---------------------------------------------------------
+
+    @property
+    def reserved_bytes(self) -> int:
+        return sum(self._memory.get(job_id, 0) for job_id in self._running)
+
+    def submit(self, job_id: str, priority: int = 0) -> Optional[int]:
+        """Queue a job (must be called on the event loop); returns its queue position."""
+        job = self.manager.get_job(job_id)
+        job.priority = priority
+        self._memory[job_id] = estimate_memory_bytes(job.config)
+        heapq.heappush(self._heap, (-priority, next(self._seq), job_id))
+        self._pump()
+        return self.position(job_id)
+
+    def running(self) -> List[str]:
+        return list(self._running)
+
+    def queued(self) -> List[str]:
+        """Queued job ids in the order they will start."""
+        return [job_id for _, _, job_id in sorted(self._heap)
+                if self.manager.get_job(job_id).status == JobStatus.QUEUED]
+
+    def position(self, job_id: str) -> Optional[int]:
+        """0 for the next job to start; None once running or finished."""
+        try:
+            return self.queued().index(job_id)
+        except ValueError:
+            return None
+
+    def resume(self, job_id: str) -> Optional[int]:
+        """Re-queue an interrupted job from its checkpoint (``ValueError`` if not resumable)."""
+        job = self.manager.resume_job(job_id)
+        return self.submit(job_id, job.priority)
+
+    def recover(self, pid_alive: Optional[Callable[[int], bool]] = None,
+                interval: float = WATCH_INTERVAL_SEC) -> Dict[str, List[str]]:
+        """Pick up jobs from before a server restart (call once, on the event loop).
+
+        Queued jobs are queued again in their original order. A job whose
+        render process is still alive is watched until that process exits.
+        Its output pipe belonged to the old server, so the job is then
+        marked interrupted and can be resumed.
+        """
+        pid_alive = pid_alive or render_process_alive
+        report = self.manager.recover(pid_alive)
+        loop = asyncio.get_running_loop()
+        for job_id in report["reattached"]:
+            self._memory[job_id] = estimate_memory_bytes(self.manager.get_job(job_id).config)
+            self._running[job_id] = loop.create_task(self._watch(job_id, pid_alive, interval))
+        for job_id in report["queued"]:
+            self.submit(job_id, self.manager.get_job(job_id).priority)
+        return report
+
+    async def _watch(self, job_id: str, pid_alive: Callable[[int], bool], interval: float) -> None:
+        job = self.manager.get_job(job_id)
+        try:
+            while job.status == JobStatus.RUNNING and pid_alive(job.process_pid):
+                await asyncio.sleep(interval)
+            if job.status == JobStatus.RUNNING:
+                message = "The render process exited while detached from the server."
+                self.manager.mark_interrupted(job_id, message)
+                self.publish(job_id, {"type": "render_error", "job_id": job_id, **(job.error or {})})
+            elif job.status == JobStatus.CANCELLED:
+                self.publish(job_id, {"type": "render_cancelled", "job_id": job_id})
+        finally:
+            self._running.pop(job_id, None)
+            self._memory.pop(job_id, None)
+            self._pump()
+
+    def cancel(self, job_id: str) -> None:
+        """Cancel a queued or running job (``KeyError`` if unknown)."""
+        job = self.manager.get_job(job_id)
+        was_queued = job.status == JobStatus.QUEUED
+        self.manager.cancel_job(job_id)
+        if was_queued:
+            # Running jobs announce this when their worker exits.
+            self.publish(job_id, {"type": "render_cancelled", "job_id": job_id})
+        self._pump()
+
+    def _fits(self, job_id: str) -> bool:
+        if self.ram_budget_bytes is None or not self._running:
+            return True
+        return self.reserved_bytes + self._memory.get(job_id, 0) <= self.ram_budget_bytes
+
+    def _pump(self) -> None:
+        while not self._closed and self._heap and len(self._running) < self.max_concurrent:
+            _, _, job_id = self._heap[0]
+            if self.manager.get_job(job_id).status != JobStatus.QUEUED:
+                heapq.heappop(self._heap)  # cancelled while waiting
+                self._memory.pop(job_id, None)
+                continue
+            if not self._fits(job_id):
+                break
+            heapq.heappop(self._heap)
+            self._running[job_id] = asyncio.get_running_loop().create_task(self._run(job_id))
+
+    # --- running -------------------------------------------------------
+
+    async def _run(self, job_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        worker = None
+        code = 1
+        try:
+            job = self.manager.get_job(job_id)
+            # A slot is free (max_concurrent <= pool size), so this only waits for start-up.
+            worker = await loop.run_in_executor(None, self.pool.acquire)
+            if job.status != JobStatus.QUEUED:
+                return
+            self.manager.mark_running(job_id, worker.pid, process=worker)
+            self.publish(job_id, {"type": "render_started", "job_id": job_id})
+
+            # Lines are handed to the loop in batches: one wake-up per batch,
+            # not per line, however fast the render prints.
+            pending: List[Optional[str]] = []
+            pending_lock = threading.Lock()
+            ready = asyncio.Event()
+            result: Dict[str, int] = {}
+
+            def put(line: Optional[str]) -> None:
+                with pending_lock:
+                    pending.append(line)
+                    if len(pending) > 1:
+                        return  # a wake-up is already scheduled
+                try:
+                    loop.call_soon_threadsafe(ready.set)
+                except RuntimeError:
+                    pass  # server shutting down
+
+            def run_job() -> None:
+                try:
+                    result["code"] = worker.run(job_id, str(job.config_file), put)
+                except Exception as e:
+                    put(f"[LOG] Render worker error: {e}")
+                finally:
+                    put(None)
+
+            threading.Thread(target=run_job, name=f"render-{job_id[:8]}", daemon=True).start()
+            done = False
+            while not done:
+                await ready.wait()
+                with pending_lock:
+                    batch = pending[:]
+                    pending.clear()
+                    ready.clear()
+                for line in batch:
+                    if line is None:
+                        done = True
+                        break
+                    self.handle_line(job_id, line)
+            code = result.get("code", 1)
+        except Exception as e:
+            _logger.exception("Render job %s failed to run", job_id)
+            self._fail(job_id, {"message": f"Render error: {e}"})
+            return
+        finally:
+            if worker is not None:
+                self.pool.release(worker)
+            self._running.pop(job_id, None)
+            self._memory.pop(job_id, None)
+            self._pump()
+        self._finish(job_id, code)
+
+    def _finish(self, job_id: str, code: int) -> None:
+        current = self.manager.get_job(job_id)
+        if current.status == JobStatus.CANCELLED:
+            self.publish(job_id, {"type": "render_cancelled", "job_id": job_id})
+        elif code == 0:
+            if current.status != JobStatus.COMPLETE:
+                complete_data = {"code": code, "output_dir": str(current.config.get("output_dir", "renders"))}
+                self.manager.mark_complete(job_id, complete_data)
+                self.publish(job_id, {"type": "render_complete", "job_id": job_id, **complete_data})
+        elif current.status != JobStatus.ERROR:
+            self._fail(job_id, {"message": f"Render process exited with code {code}"})
+
+    def _fail(self, job_id: str, error_data: Dict[str, Any]) -> None:
+        try:
+            self.manager.mark_error(job_id, error_data)
+        except KeyError:
+            return
+        self.publish(job_id, {"type": "render_error", "job_id": job_id, **error_data})
+
+    def handle_line(self, job_id: str, line: str) -> None:
+        """Apply one render output line to the job record and publish it."""
+        line = line.strip()
+        try:
+            if line.startswith("[PROGRESS]"):
+                progress_data = json.loads(line[10:].strip())
+                if progress_data["frame"] > 0 and progress_data["elapsed_sec"] > 0:
+                    frames_per_sec = progress_data["frame"] / progress_data["elapsed_sec"]
+                    remaining_frames = progress_data["total"] - progress_data["frame"]
+                    eta_sec = remaining_frames / frames_per_sec if frames_per_sec > 0 else 0
+                    progress_data["eta_sec"] = round(eta_sec, 1)
+                self.manager.update_progress(job_id, progress_data)
+                self.publish(job_id, {"type": "render_progress", "job_id": job_id, **progress_data})
+
+            elif line.startswith("[LOG]"):
+                message = line[5:].strip()
+                self.manager.append_log(job_id, message)
+                self.publish(job_id, {"type": "render_log", "job_id": job_id, "message": message})
+
+            elif line.startswith("[COMPLETE]"):
+                complete_data = json.loads(line[10:].strip())
+                self.manager.mark_complete(job_id, complete_data)
+                self.publish(job_id, {"type": "render_complete", "job_id": job_id, **complete_data})
+
+            elif line.startswith("[ERROR]"):
+                error_data = json.loads(line[7:].strip())
+                self.manager.mark_error(job_id, error_data)
+                self.publish(job_id, {"type": "render_error", "job_id": job_id, **error_data})
+
+            elif line:
+                self.manager.append_log(job_id, line)
+                self.publish(job_id, {"type": "render_log", "job_id": job_id, "message": line})
+
+        except json.JSONDecodeError:
+            self.manager.append_log(job_id, line)
+            self.publish(job_id, {"type": "render_log", "job_id": job_id, "message": line})
+        except Exception as e:
+            _logger.warning("Error processing log line for %s: %s", job_id, e)
+
+    # --- subscribers ---------------------------------------------------
+
+    def subscribe(self, job_id: str) -> Subscription:
+        """Subscription to this job's messages from now on (``KeyError`` if unknown)."""
+        self.manager.get_job(job_id)
+        return self.hub.subscribe(job_id)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.hub.unsubscribe(subscription)
+
+    def publish(self, job_id: str, message: Dict[str, Any]) -> None:
+        self.hub.publish(job_id, message)
+
+    def snapshot(self, job_id: str) -> List[Dict[str, Any]]:
+        """Messages that bring a new subscriber up to date with the job."""
+        job = self.manager.get_job(job_id)
+        messages: List[Dict[str, Any]] = [{
+            "type": "render_status",
+            "job_id": job_id,
+            "status": job.status,
+            "progress": job.progress,
+            "queue_position": self.position(job_id),
+        }]
+        if job.logs:
+            recent = [entry.message for entry in list(job.logs)[-SNAPSHOT_LOG_LINES:]]
+            messages.append({"type": "render_logs", "job_id": job_id, "messages": recent,
+                             "dropped": max(0, len(job.logs) - len(recent))})
+        if job.status == JobStatus.COMPLETE:
+            messages.append({"type": "render_complete", "job_id": job_id, **(job.result or {})})
+        elif job.status == JobStatus.ERROR:
+            messages.append({"type": "render_error", "job_id": job_id, **(job.error or {})})
+        elif job.status == JobStatus.CANCELLED:
+            messages.append({"type": "render_cancelled", "job_id": job_id})
+        return messages
+
+    def close(self) -> None:
+        """Stop supervising running jobs (server shutdown); their workers are stopped by the pool."""
+        self._closed = True
+        for task in list(self._running.values()):
+            task.cancel()
@@ -0,0 +1,34 @@
+"""Start-up options for the web UI server.
+
+``cedartoy ui`` fills ``settings`` from its command line before uvicorn
+starts the app; the app's lifespan reads it. Tests and embedders that
+import ``cedartoy.server.app`` directly get the defaults.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from cedartoy.render_worker import DEFAULT_MAX_JOBS, DEFAULT_MEMORY_BUDGET_MB
+from cedartoy.server.render_pool import DEFAULT_POOL_SIZE
+
+
+@dataclass
+class ServerSettings:
+    # Render every missing library thumbnail in the background at start-up.
+    prewarm_thumbnails: bool = True
+    # Persistent render workers, i.e. renders that run at once (one per GPU).
+    render_workers: int = DEFAULT_POOL_SIZE
+    # Memory the scheduler may reserve for running renders; None for
+    # scheduler.RAM_BUDGET_FRACTION of the RAM free at start-up.
+    ram_budget_mb: Optional[float] = None
+    # A render worker retires after this many jobs or past this RSS.
+    worker_max_jobs: int = DEFAULT_MAX_JOBS
+    worker_memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB
+
+    @property
+    def ram_budget_bytes(self) -> Optional[int]:
+        return None if self.ram_budget_mb is None else int(self.ram_budget_mb * 1024 * 1024)
+
+
+settings = ServerSettings()
@@ -0,0 +1,238 @@
+"""In-memory index of the shader library for the browser sidebar.
+
+Each entry records a shader's relative path, mtime_ns and size, its
+header-comment metadata, and the uniforms it declares (see
+``reactivity.parse_declared_uniforms``). The index is persisted to
+``~/.cedartoy/cache/shader_index.json``, so a restarted server starts
+warm.
+
+``refresh()`` walks the tree with ``os.scandir`` and only re-reads files
+whose (mtime_ns, size) changed; it is throttled to once every
+``min_interval`` seconds. Listing, filtering and paging then run on the
+in-memory entries. No file is opened per request.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from cedartoy.reactivity import parse_declared_uniforms
+
+_logger = logging.getLogger(__name__)
+
+SHADER_INDEX_PATH = Path.home() / ".cedartoy" / "cache" / "shader_index.json"
+INDEX_VERSION = 1
+MIN_RESCAN_INTERVAL = 2.0  # seconds between directory walks
+
+
+def parse_shader_metadata(lines: Iterable[str]) -> Dict[str, Any]:
+    """Parse metadata from shader header comments"""
+    metadata: Dict[str, Any] = {}
+
+    try:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith("//"):
+                break
+
+            # Parse patterns like: // Name: My Shader
+            match = re.match(r'^//\s*(\w+):\s*(.+)$', line)
+            if match:
+                key = match.group(1).lower()
+                value = match.group(2).strip()
+                metadata[key] = value
+
+            # Parse params: // @param name type default min max label
+            # Example: // @param speed float 1.0 0.0 5.0 "Speed Factor"
+            param_match = re.match(r'^//\s*@param\s+(\w+)\s+(\w+)\s+([^\s]+)\s+([^\s]+)\s+([^\s]+)\s+(.+)$', line)
+            if param_match:
+                if "parameters" not in metadata:
+                    metadata["parameters"] = []
+
+                p_name, p_type, p_def, p_min, p_max, p_label = param_match.groups()
+
+                # Strip quotes from label if present
+                if p_label.startswith('"') and p_label.endswith('"'):
+                    p_label = p_label[1:-1]
+
+                metadata["parameters"].append({
+                    "name": p_name,
+                    "type": p_type,
+                    "default": float(p_def) if p_type == "float" else int(p_def),
+                    "min": float(p_min) if p_type == "float" else int(p_min),
+                    "max": float(p_max) if p_type == "float" else int(p_max),
+                    "label": p_label
+                })
+    except Exception:
+        pass  # keep what parsed before the bad line
+
+    return metadata
+
+
+@dataclass
+class ShaderEntry:
+    path: str                       # relative to the library root, "/"-separated
+    mtime_ns: int
+    size: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    uniforms: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_file(cls, root: Path, file: Path, st: os.stat_result) -> "ShaderEntry":
+        source = file.read_text(encoding="utf-8", errors="replace")
+        return cls(
+            path=file.relative_to(root).as_posix(),
+            mtime_ns=st.st_mtime_ns,
+            size=st.st_size,
+            metadata=parse_shader_metadata(source.splitlines()),
+            uniforms=sorted(parse_declared_uniforms(source)),
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "name": self.metadata.get("name", Path(self.path).stem),
+            "author": self.metadata.get("author", "Unknown"),
+            "description": self.metadata.get("description", ""),
+        }
+
+    def matches(self, query: str) -> bool:
+        summary = self.summary()
+        return any(query in str(summary[k]).lower() for k in ("path", "name", "author", "description"))
+
+
+class ShaderIndex:
+    def __init__(self, root: Path, cache_path: Optional[Path] = None,
+                 min_interval: float = MIN_RESCAN_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.root = Path(root)
+        self._cache_path = cache_path
+        self.min_interval = min_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, ShaderEntry]] = None
+        self._last_scan: Optional[float] = None
+
+    @property
+    def cache_path(self) -> Path:
+        return self._cache_path if self._cache_path is not None else SHADER_INDEX_PATH
+
+    def _walk(self) -> Iterable[tuple[Path, os.stat_result]]:
+        stack = [self.root]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for item in it:
+                    if item.is_dir(follow_symlinks=False):
+                        if item.name != "common":  # shared header files
+                            stack.append(Path(item.path))
+                    elif item.name.endswith(".glsl"):
+                        try:
+                            yield Path(item.path), item.stat()
+                        except OSError:
+                            continue
+
+    def _load(self) -> Dict[str, ShaderEntry]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if data.get("version") != INDEX_VERSION or data.get("root") != str(self.root.resolve()):
+                return {}
+            return {e["path"]: ShaderEntry(**e) for e in data["entries"]}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            _logger.warning("Ignoring unreadable shader index %s: %s", self.cache_path, e)
+            return {}
+
+    def _persist(self, entries: Dict[str, ShaderEntry]) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "root": str(self.root.resolve()),
+            "entries": [asdict(e) for e in entries.values()],
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(self.cache_path.name + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            _logger.warning("Could not write shader index %s: %s", self.cache_path, e)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rescan changed files; returns True if the index changed."""
+        with self._lock:
+            now = self._clock()
+            if (not force and self._entries is not None and self._last_scan is not None
+                    and now - self._last_scan < self.min_interval):
+                return False
+            entries = self._entries if self._entries is not None else self._load()
+            loaded_from_disk = self._entries is None
+            fresh: Dict[str, ShaderEntry] = {}
+            changed = False
+            for file, st in self._walk():
+                rel = file.relative_to(self.root).as_posix()
+                entry = entries.get(rel)
+                if entry is None or entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+                    try:
+                        entry = ShaderEntry.from_file(self.root, file, st)
+                    except OSError:
+                        continue
+                    changed = True
+                fresh[rel] = entry
+            changed = changed or fresh.keys() != entries.keys()
+            self._entries = dict(sorted(fresh.items()))
+            self._last_scan = now
+            if changed or loaded_from_disk and not self.cache_path.exists():
+                self._persist(self._entries)
+            return changed
+
+    def update(self, file: Path) -> None:
+        """Re-index one file right away (after the UI saves it)."""
+        with self._lock:
+            if self._entries is None:
+                return
+            # Normalise "sub/../x.glsl" so it maps to the key refresh() uses.
+            # Lexically, like the walk: a symlinked shader keeps its library path.
+            root = Path(os.path.abspath(self.root))
+            file = Path(os.path.abspath(file))
+            try:
+                rel = file.relative_to(root).as_posix()
+            except ValueError:
+                return
+            if file.suffix != ".glsl" or "common" in Path(rel).parts:
+                return
+            try:
+                self._entries[rel] = ShaderEntry.from_file(root, file, file.stat())
+            except OSError:
+                self._entries.pop(rel, None)
+            self._entries = dict(sorted(self._entries.items()))
+            self._persist(self._entries)
+
+    def entries(self) -> List[ShaderEntry]:
+        self.refresh()
+        with self._lock:
+            return list(self._entries.values())
+
+    def query(self, q: Optional[str] = None, uniform: Optional[str] = None,
+              offset: int = 0, limit: Optional[int] = None) -> tuple[int, List[Dict[str, Any]]]:
+        """(total matches, one page of summaries) sorted by path."""
+        hits = self.entries()
+        if q:
+            needle = q.lower()
+            hits = [e for e in hits if e.matches(needle)]
+        if uniform:
+            hits = [e for e in hits if uniform in e.uniforms]
+        page = hits[offset:] if limit is None else hits[offset:offset + limit]
+        return len(hits), [e.summary() for e in page]
@@ -0,0 +1,103 @@
+"""Worker pools that keep CPU-heavy and blocking API work off the event loop.
+
+Route handlers dispatch through ``run(route, fn, *args)``:
+
+- ``kind="io"`` runs ``fn`` on a shared thread pool (file reads, hashing
+  -- hashlib and numpy release the GIL).
+- ``kind="cpu"`` runs it in a process pool. Use this for GL contexts and
+  pure-Python number crunching. ``fn`` and its arguments must be
+  picklable, so pass top-level functions.
+
+Each route name has its own concurrency limit (``ROUTE_LIMITS``). A burst
+of thumbnail requests then queues on its semaphore instead of taking
+every worker, and WebSocket progress keeps flowing during the burst.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, TypeVar
+
+T = TypeVar("T")
+
+# Max in-flight calls per route; unlisted routes use DEFAULT_LIMIT.
+ROUTE_LIMITS: dict[str, int] = {
+    "audio_upload": 2,
+    "project_load": 4,
+    "waveform": 2,
+    "shader_list": 1,
+}
+DEFAULT_LIMIT = 4
+
+IO_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+CPU_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+class WorkerPools:
+    def __init__(self, io_workers: int = IO_WORKERS, cpu_workers: int = CPU_WORKERS,
+                 limits: dict[str, int] | None = None):
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.limits = dict(ROUTE_LIMITS if limits is None else limits)
+        self._io: ThreadPoolExecutor | None = None
+        self._cpu: Executor | None = None
+        self._lock = threading.Lock()
+        # asyncio semaphores belong to one loop; keep a set per running loop.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary())
+
+    @property
+    def io(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._io is None:
+                self._io = ThreadPoolExecutor(max_workers=self.io_workers,
+                                              thread_name_prefix="cedartoy-io")
+            return self._io
+
+    @property
+    def cpu(self) -> Executor:
+        with self._lock:
+            if self._cpu is None:
+                # Spawned so children do not inherit the listening socket.
+                self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+            return self._cpu
+
+    def semaphore(self, route: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        per_loop = self._semaphores.setdefault(loop, {})
+        sem = per_loop.get(route)
+        if sem is None:
+            sem = per_loop[route] = asyncio.Semaphore(self.limits.get(route, DEFAULT_LIMIT))
+        return sem
+
+    async def run(self, route: str, fn: Callable[..., T], *args: Any,
+                  kind: Literal["io", "cpu"] = "io", **kwargs: Any) -> T:
+        """Await ``fn(*args, **kwargs)`` on a worker, at most ``limits[route]`` at a time."""
+        executor = self.cpu if kind == "cpu" else self.io
+        async with self.semaphore(route):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            io, cpu = self._io, self._cpu
+            self._io = self._cpu = None
+        if io is not None:
+            io.shutdown(wait=False, cancel_futures=True)
+        if cpu is not None:
+            cpu.shutdown(wait=False, cancel_futures=True)
+
+
+pools = WorkerPools()
+
+
+async def run(route: str, fn: Callable[..., T], *args: Any,
+              kind: Literal["io", "cpu"] = "io", **kwargs: Any) -> T:
+    """Dispatch to the shared ``pools``; see ``WorkerPools.run``."""
+    return await pools.run(route, fn, *args, kind=kind, **kwargs)
@@ -1,6 +1,10 @@
+import hashlib
 import os
+import re
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 HEADER_PATH = Path(__file__).parent.parent / "shaders" / "common" / "header.glsl"
 
@@ -17,13 +21,169 @@ void main() {
 }
 """
 
+# '#include "file"' or '#include <file>'; resolved against the including
+# file's folder, then the main shader's folder, then shaders/common.
+_INCLUDE_RE = re.compile(r'^[ \t]*#[ \t]*include[ \t]+["<]([^">]+)[">][ \t]*(?://.*)?$')
+_PRAGMA_ONCE_RE = re.compile(r'^[ \t]*#[ \t]*pragma[ \t]+once\b')
+# "// source strings: 0=a.glsl 1=b.glsl" written after #version.
+_SOURCE_TABLE_PREFIX = "// source strings:"
+_ERROR_LOCATION_RE = re.compile(r'\b(\d+):(\d+)(?=\(\d+\)|:)')      # Mesa/AMD "0:12(3)"
+_NV_ERROR_LOCATION_RE = re.compile(r'\b(\d+)\((\d+)\)(?=\s*:)')          # NVIDIA "0(12) :"
+
+_lock = threading.Lock()
+_file_cache: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+_resolved_cache: Dict[str, "ResolvedSource"] = {}
+_MAX_RESOLVED = 64
+
+
+class ShaderIncludeError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ResolvedSource:
+    text: str
+    files: Tuple[Path, ...]                           # files[i] is source string i
+    deps: Tuple[Tuple[Path, Tuple[int, int]], ...]    # (file, (size, mtime_ns)) for reuse checks
+
+
+def _stat_key(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return (st.st_size, st.st_mtime_ns)
+
+
+def read_source(path: Path) -> str:
+    """File text, re-read only when its (size, mtime_ns) changes."""
+    path = Path(path).resolve()
+    key = _stat_key(path)
+    with _lock:
+        cached = _file_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with _lock:
+        _file_cache[path] = (key, text)
+    return text
+
+
 def load_header() -> str:
     if not HEADER_PATH.exists():
         return ""
-    with open(HEADER_PATH, 'r', encoding='utf-8') as f:
-        return f.read()
+    return read_source(HEADER_PATH)
+
+
+def default_include_dirs() -> List[Path]:
+    return [HEADER_PATH.parent]
+
+
+def _deps_fresh(resolved: ResolvedSource) -> bool:
+    try:
+        return all(_stat_key(path) == key for path, key in resolved.deps)
+    except OSError:
+        return False
+
+
+def _ends_in_block_comment(line: str, in_comment: bool) -> bool:
+    """Whether a ``/* ... */`` comment is still open at the end of ``line``."""
+    i = 0
+    while i < len(line):
+        pair = line[i:i + 2]
+        if in_comment:
+            if pair == "*/":
+                in_comment = False
+                i += 1
+        elif pair == "//":
+            break
+        elif pair == "/*":
+            in_comment = True
+            i += 1
+        i += 1
+    return in_comment
+
+
+def resolve_includes(source: str, source_path: Optional[Path] = None,
+                     include_dirs: Optional[Sequence[Path]] = None,
+                     first_string: int = 0,
+                     already_included: Sequence[Path] = ()) -> ResolvedSource:
+    """Expand ``#include`` directives, emitting ``#line`` so errors map to files.
 
-def assemble_shader(user_source: str, defines: Optional[dict] = None) -> str:
+    Each file is included at most once per call (an implicit include
+    guard; ``#pragma once`` lines are dropped). Directives inside
+    ``/* ... */`` comments are skipped, and ``#include`` text left in any
+    comment is defused, since moderngl rejects it even there. Preprocessor
+    conditionals are not evaluated: an ``#include`` under a false ``#if``
+    is still expanded. Files in ``already_included`` (pasted by an earlier
+    source string, such as the header) count as included. Source string
+    numbers start at ``first_string`` for ``source`` itself. Results are cached by the content hash of ``source``
+    plus the search paths, and reused while every included file is
+    unchanged on disk.
+    """
+    base_dir = Path(source_path).resolve().parent if source_path else None
+    dirs = [Path(d).resolve() for d in (include_dirs if include_dirs is not None else default_include_dirs())]
+    h = hashlib.sha256(source.encode("utf-8"))
+    skip = [Path(p).resolve() for p in already_included]
+    h.update(repr((str(source_path or ""), [str(d) for d in dirs], first_string,
+                   [str(p) for p in skip])).encode())
+    key = h.hexdigest()
+    with _lock:
+        cached = _resolved_cache.get(key)
+    if cached is not None and _deps_fresh(cached):
+        return cached
+
+    files: List[Path] = [Path(source_path).resolve() if source_path else Path("<source>")]
+    deps: Dict[Path, Tuple[int, int]] = {}
+    included: set = set(skip)
+    out: List[str] = []
+
+    def find(name: str, including_dir: Optional[Path]) -> Path:
+        candidates = [d for d in (including_dir, base_dir) if d is not None] + dirs
+        for d in candidates:
+            path = (d / name).resolve()
+            if path.is_file():
+                return path
+        raise ShaderIncludeError(f'#include "{name}" not found in: {", ".join(str(d) for d in candidates)}')
+
+    def expand(text: str, string_no: int, folder: Optional[Path], stack: Tuple[Path, ...]) -> None:
+        in_comment = False
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            commented, in_comment = in_comment, _ends_in_block_comment(line, in_comment)
+            if not commented and _PRAGMA_ONCE_RE.match(line):
+                out.append("")
+                continue
+            match = None if commented else _INCLUDE_RE.match(line)
+            if not match:
+                out.append(line.replace("#include", "# include"))
+                continue
+            path = find(match.group(1), folder)
+            if path in stack:
+                chain = " -> ".join(p.name for p in stack + (path,))
+                raise ShaderIncludeError(f"circular #include: {chain}")
+            if path in included:
+                # No "#include" text here: moderngl rejects any it finds.
+                out.append(f"// {match.group(1)} already included")
+                continue
+            included.add(path)
+            deps[path] = _stat_key(path)
+            files.append(path)
+            child_no = first_string + len(files) - 1
+            out.append(f"#line 1 {child_no}")
+            expand(read_source(path), child_no, path.parent, stack + (path,))
+            out.append(f"#line {lineno + 1} {string_no}")
+
+    root_stack = (files[0],) if source_path else ()
+    expand(source, first_string, base_dir, root_stack)
+    resolved = ResolvedSource(text="\n".join(out), files=tuple(files), deps=tuple(deps.items()))
+    with _lock:
+        _resolved_cache[key] = resolved
+        while len(_resolved_cache) > _MAX_RESOLVED:
+            _resolved_cache.pop(next(iter(_resolved_cache)))
+    return resolved
+
+
+def assemble_shader(user_source: str, defines: Optional[dict] = None,
+                    source_path: Optional[Path] = None,
+                    include_dirs: Optional[Sequence[Path]] = None) -> str:
     """
     Assembles the final fragment shader source.
     1. Version
@@ -31,45 +191,79 @@ def assemble_shader(user_source: str, defines: Optional[dict] = None) -> str:
     3. Header (Uniforms, Helpers)
     4. User Source (mainImage)
     5. Footer (main)
+
+    ``#include`` directives in the header and user source are expanded
+    (see ``resolve_includes``). Source string 0 is the header and 1 is the
+    user source; included files follow. The table is written as a comment
+    after ``#version`` for ``map_compile_error``.
     """
     parts = []
-    
+
     # We already have #version 430 core in header, but maybe we should strip it or ensure it's first.
     # The header has it.
-    
+
     header = load_header()
-    
+
     # Split header to inject defines after version
     lines = header.splitlines()
     version_line = ""
+    version_lineno = 0
     rest_header = []
-    for line in lines:
-        if line.strip().startswith("#version"):
+    for i, line in enumerate(lines, start=1):
+        if not version_line and line.strip().startswith("#version"):
             version_line = line
+            version_lineno = i
         else:
             rest_header.append(line)
-            
+
+    header_res = resolve_includes("\n".join(rest_header), HEADER_PATH if header else None,
+                                  include_dirs, first_string=0)
+    # One include guard across both: a file the header pulled in is not pasted again.
+    user_res = resolve_includes(user_source, source_path, include_dirs,
+                                first_string=len(header_res.files),
+                                already_included=header_res.files if header else ())
+
     parts.append(version_line if version_line else "#version 430 core")
-    
+    table = " ".join(f"{i}={p.name}" for i, p in enumerate(header_res.files + user_res.files))
+    parts.append(f"{_SOURCE_TABLE_PREFIX} {table}")
+
     if defines:
         for k, v in defines.items():
             if v is None:
                 parts.append(f"#define {k}")
             else:
                 parts.append(f"#define {k} {v}")
-                
-    parts.append("\n".join(rest_header))
-    parts.append("\n// --- User Shader ---\n")
-    parts.append(user_source)
+
+    # Header lines after #version keep their file line numbers.
+    parts.append(f"#line {2 if version_lineno == 1 else 1} 0")
+    parts.append(header_res.text)
+    parts.append("\n// --- User Shader ---")
+    parts.append(f"#line 1 {len(header_res.files)}")
+    parts.append(user_res.text)
     parts.append(FOOTER)
-    
+
     return "\n".join(parts)
 
+def map_compile_error(message: str, assembled: str) -> str:
+    """Rewrite "S:L" source-string locations in a driver error to "file:L"."""
+    table: Dict[str, str] = {}
+    for line in assembled.splitlines()[:3]:
+        if line.startswith(_SOURCE_TABLE_PREFIX):
+            for item in line[len(_SOURCE_TABLE_PREFIX):].split():
+                number, _, name = item.partition("=")
+                table[number] = name
+            break
+    if not table:
+        return message
+    mapped, count = _ERROR_LOCATION_RE.subn(
+        lambda m: f"{table.get(m.group(1), m.group(1))}:{m.group(2)}", message)
+    if count:
+        return mapped
+    return _NV_ERROR_LOCATION_RE.sub(
+        lambda m: f"{table.get(m.group(1), m.group(1))}({m.group(2)})", message)
+
 def load_shader_from_file(path: Path, defines: Optional[dict] = None) -> str:
     if not path.exists():
         raise FileNotFoundError(f"Shader file not found: {path}")
-        
-    with open(path, 'r', encoding='utf-8') as f:
-        source = f.read()
-        
-    return assemble_shader(source, defines)
+
+    return assemble_shader(read_source(path), defines, source_path=path)
@@ -0,0 +1,293 @@
+"""Shader library thumbnails from one long-lived GL context.
+
+A single worker process keeps a GL context, quad, framebuffer and dummy
+channel texture for its whole lifetime. Each thumbnail is then just a
+compile, one draw and a read of the framebuffer, encoded straight to PNG.
+No ``Renderer``, temp directory or copy is involved. Requests are sent to
+the worker in batches.
+
+Thumbnails are cached as ``~/.cedartoy/cache/thumbnails/<key>.png``. The
+key hashes the assembled source (``shaders/common/header.glsl``, the
+shader and anything it ``#include``s), so editing any of them produces a
+fresh thumbnail instead of a stale one. ``ThumbnailService.prewarm``
+queues every shader without a thumbnail when the web UI starts (unless
+run with ``--no-prewarm-thumbnails``). Prewarm batches go to the worker
+one at a time, so a thumbnail the browser asks for waits behind at most
+one of them.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from . import shader as shader_mod
+
+_logger = logging.getLogger(__name__)
+
+THUMBNAIL_CACHE_DIR = Path.home() / ".cedartoy" / "cache" / "thumbnails"
+THUMB_WIDTH = 256
+THUMB_HEIGHT = 144
+BATCH_SIZE = 8  # prewarm chunk; keeps interactive requests from waiting long
+CLOSE_TIMEOUT_SEC = 5.0  # how long close() lets a running batch finish
+
+
+def thumbnail_key(shader_path: Path) -> str:
+    """Cache key over the fully assembled source (header, includes, shader) and size."""
+    h = hashlib.sha256(f"{THUMB_WIDTH}x{THUMB_HEIGHT}\0".encode())
+    h.update(shader_mod.load_shader_from_file(Path(shader_path)).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+class ThumbnailRenderer:
+    """Renders frame 0 of single-pass shaders into one reusable framebuffer."""
+
+    def __init__(self, width: int = THUMB_WIDTH, height: int = THUMB_HEIGHT):
+        from .render import create_standalone_context
+
+        self.width, self.height = width, height
+        self.ctx = create_standalone_context()
+        quad = np.array([-1, -1, 0, 0, 1, -1, 1, 0, -1, 1, 0, 1, 1, 1, 1, 1], dtype="f4")
+        self.vbo = self.ctx.buffer(quad.tobytes())
+        self.color = self.ctx.texture((width, height), 4)
+        self.fbo = self.ctx.framebuffer(color_attachments=[self.color])
+        # Channels and audio history read as black.
+        self.blank = self.ctx.texture((1, 1), 4, data=bytes(4))
+
+    def render_png(self, fragment_shader: str) -> bytes:
+        """PNG bytes of frame 0 for an assembled fragment shader."""
+        import moderngl
+        from PIL import Image
+        from .render import QUAD_VERTEX_SHADER
+
+        prog = self.ctx.program(
+            vertex_shader=QUAD_VERTEX_SHADER,
+            fragment_shader=fragment_shader,
+        )
+        try:
+            attrs = [name for name in ("in_vert", "in_uv") if name in prog]
+            fmt = " ".join("2f" if name in prog else "8x" for name in ("in_vert", "in_uv"))
+            vao = self.ctx.vertex_array(prog, [(self.vbo, fmt, *attrs)])
+            uniforms = {
+                "iResolution": (float(self.width), float(self.height), 1.0),
+                "iTime": 0.0,
+                "iTimeDelta": 1.0,
+                "iFrameRate": 1.0,
+                "iFrame": 0,
+                "iMouse": (0.0, 0.0, 0.0, 0.0),
+                "iChannelResolution": [(1.0, 1.0, 1.0)] * 4,
+            }
+            for name, value in uniforms.items():
+                if name in prog:
+                    if isinstance(value, list):
+                        value = value[:prog[name].array_length]
+                    prog[name].value = value
+            unit = 0
+            for name in ("iChannel0", "iChannel1", "iChannel2", "iChannel3", "iAudioHistoryTex"):
+                if name in prog:
+                    self.blank.use(location=unit)
+                    prog[name].value = unit
+                    unit += 1
+            self.fbo.use()
+            self.fbo.clear(0.0, 0.0, 0.0, 1.0)
+            vao.render(moderngl.TRIANGLE_STRIP)
+            vao.release()
+        finally:
+            prog.release()
+
+        pixels = np.frombuffer(self.fbo.read(components=4), dtype=np.uint8)
+        pixels = np.flipud(pixels.reshape(self.height, self.width, 4))
+        buffer = io.BytesIO()
+        Image.fromarray(pixels[..., :3]).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+# The worker process's renderer; created on its first batch and reused.
+_renderer: Optional[ThumbnailRenderer] = None
+
+
+def render_batch(jobs: list[tuple[str, str]]) -> dict[str, Optional[str]]:
+    """Render ``(shader_path, png_path)`` pairs; returns {png_path: error or None}.
+
+    Runs inside the thumbnail worker process.
+    """
+    global _renderer
+    if _renderer is None:
+        _renderer = ThumbnailRenderer()
+    results: dict[str, Optional[str]] = {}
+    for shader_path, png_path in jobs:
+        try:
+            png = _renderer.render_png(shader_mod.load_shader_from_file(Path(shader_path)))
+            out = Path(png_path)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            tmp = out.with_name(out.name + f".{os.getpid()}.tmp")
+            tmp.write_bytes(png)
+            os.replace(tmp, out)
+            results[png_path] = None
+        except Exception as e:
+            results[png_path] = f"{type(e).__name__}: {e}"
+    return results
+
+
+class ThumbnailService:
+    """Queues thumbnail renders onto one GL worker and caches the PNGs by content key."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, executor: Optional[Executor] = None,
+                 batch_size: int = BATCH_SIZE, close_timeout: float = CLOSE_TIMEOUT_SEC):
+        self._cache_dir = cache_dir
+        self._executor = executor
+        self.batch_size = batch_size
+        self.close_timeout = close_timeout
+        self._lock = threading.Lock()
+        self._pending: dict[str, Future] = {}
+        self._backlog: deque = deque()  # prewarm batches not yet sent to the worker
+        self._feeding = False
+        self._in_flight: set[Future] = set()
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir if self._cache_dir is not None else THUMBNAIL_CACHE_DIR
+
+    def cache_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def _worker(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: a forked child would inherit the server's
+                # listening socket and hold the port if the server is killed.
+                self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def submit(self, shader_paths: Iterable[Path]) -> dict[Path, Future]:
+        """Futures resolving to each shader's cached PNG path; rendering only what is missing."""
+        return self._submit(shader_paths)[0]
+
+    def _submit(self, shader_paths: Iterable[Path],
+                background: bool = False) -> tuple[dict[Path, Future], int]:
+        futures: dict[Path, Future] = {}
+        todo: list[tuple[str, str, Future]] = []
+        keyed = []
+        for p in shader_paths:
+            try:
+                keyed.append((Path(p), self.cache_path(thumbnail_key(p))))
+            except Exception as e:  # unreadable file or bad #include
+                failed: Future = Future()
+                failed.set_exception(e)
+                futures[Path(p)] = failed
+        with self._lock:
+            for shader_path, png in keyed:
+                future = self._pending.get(str(png))
+                if future is None:
+                    future = Future()
+                    if png.exists():
+                        future.set_result(png)
+                    else:
+                        self._pending[str(png)] = future
+                        todo.append((str(shader_path), str(png), future))
+                futures[shader_path] = future
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+        if background:
+            with self._lock:
+                self._backlog.extend(batches)
+            self._feed()
+        else:
+            for batch in batches:
+                self._dispatch(batch)
+        return futures, len(todo)
+
+    def _feed(self) -> None:
+        """Send the next prewarm batch once the previous one has finished."""
+        with self._lock:
+            if self._feeding or not self._backlog:
+                return
+            self._feeding = True
+            batch = self._backlog.popleft()
+
+        def next_batch() -> None:
+            with self._lock:
+                self._feeding = False
+            self._feed()
+
+        self._dispatch(batch, then=next_batch)
+
+    def _dispatch(self, batch: list[tuple[str, str, Future]],
+                  then: Optional[Callable[[], None]] = None) -> None:
+        def _done(batch_future: Future) -> None:
+            try:
+                _resolve(batch_future)
+            finally:
+                if then is not None:
+                    then()
+
+        def _resolve(batch_future: Future) -> None:
+            with self._lock:
+                self._in_flight.discard(batch_future)
+                for _, png, future in batch:
+                    self._pending.pop(png, None)
+            if batch_future.cancelled():  # shut down before the worker got to it
+                for _, _, future in batch:
+                    future.cancel()
+                return
+            error = batch_future.exception()
+            results = {} if error is not None else batch_future.result()
+            for shader_path, png, future in batch:
+                if future.done():
+                    continue
+                message = str(error) if error is not None else results.get(png)
+                if message is None:
+                    future.set_result(Path(png))
+                else:
+                    _logger.warning("Thumbnail failed for %s: %s", shader_path, message)
+                    future.set_exception(RuntimeError(f"{shader_path}: {message}"))
+
+        try:
+            batch_future = self._worker().submit(render_batch, [(s, p) for s, p, _ in batch])
+        except Exception as e:
+            batch_future = Future()
+            batch_future.set_exception(e)
+        with self._lock:
+            self._in_flight.add(batch_future)
+        batch_future.add_done_callback(_done)
+
+    async def get(self, shader_path: Path) -> Path:
+        """Cached PNG for one shader, rendering it if needed."""
+        loop = asyncio.get_running_loop()
+        futures = await loop.run_in_executor(None, self.submit, [shader_path])
+        return await asyncio.wrap_future(futures[Path(shader_path)])
+
+    def prewarm(self, shader_paths: Iterable[Path]) -> int:
+        """Queue every shader without a current thumbnail at low priority; returns how many."""
+        return self._submit(shader_paths, background=True)[1]
+
+    def close(self) -> None:
+        """Cancel pending requests and stop the worker.
+
+        Queued batches are dropped; the worker exits on its own once the
+        batch it is drawing (if any) finishes. That is waited for for up to
+        ``close_timeout`` seconds.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._backlog.clear()
+            in_flight = list(self._in_flight)
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            wait(in_flight, timeout=self.close_timeout)
+
+
+service = ThumbnailService()
@@ -80,3 +80,7 @@ class RenderJob:
     bundle_path: Optional[Path] = None
     bundle_mode: str = "auto"
     bundle_blend: float = 0.5
+    bundle_adsr: Dict[str, Tuple[float, float, float, float]] = field(default_factory=dict)
+
+    # Rolling audio history window in seconds (0 = whole song)
+    audio_history_sec: float = 0.0
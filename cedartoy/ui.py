@@ -1,3 +1,4 @@
+import json
 import sys
 from .options_schema import OPTIONS, Option
 from typing import Any
@@ -34,6 +35,11 @@ def prompt_value(opt: Option, current_value: Any) -> Any:
                     print(f"Invalid choice. Must be one of {opt.choices}")
                     continue
                 return val
+            elif opt.type == "dict":
+                parsed = json.loads(val)
+                if not isinstance(parsed, dict):
+                    raise ValueError("Expected a JSON object")
+                return parsed
             elif opt.type == "path":
                 # We could validate existence here, but maybe it's an output path
                 return val
@@ -0,0 +1,173 @@
+"""Min/max waveform peak pyramid for the cue scrubber.
+
+Level 0 holds the min and max of every ``BASE_BUCKET`` mono samples; each
+level above halves the resolution. A pyramid is built once per audio
+content hash with a streaming, vectorized reduction, stored as
+``~/.cedartoy/cache/peaks/<sha256>.npz`` and kept in a small in-process
+LRU. Any (start, end, n) view is then answered from the coarsest level
+that still has ``_BUCKETS_PER_COLUMN`` buckets per output column (which
+bounds how far a column's envelope can overshoot its time span), so
+zooming into a bar of a long song never reads the PCM again.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .filehash import cached_sha256
+
+_logger = logging.getLogger(__name__)
+
+PEAK_CACHE_DIR = Path.home() / ".cedartoy" / "cache" / "peaks"
+BASE_BUCKET = 256          # samples per level-0 bucket (~6 ms at 44.1 kHz)
+_READ_BLOCK = BASE_BUCKET * 4096
+_MEMORY_ENTRIES = 8
+_BUCKETS_PER_COLUMN = 8
+
+_lock = threading.Lock()
+_memory: "OrderedDict[str, PeakPyramid]" = OrderedDict()
+
+
+@dataclass
+class PeakPyramid:
+    sample_rate: int
+    num_samples: int
+    mins: list[np.ndarray]   # level k: bucket = BASE_BUCKET * 2**k samples
+    maxs: list[np.ndarray]
+
+    @property
+    def duration_sec(self) -> float:
+        return self.num_samples / self.sample_rate if self.sample_rate else 0.0
+
+    @classmethod
+    def from_blocks(cls, blocks, sample_rate: int) -> "PeakPyramid":
+        """Build from an iterable of (frames, channels) sample blocks."""
+        level_min: list[np.ndarray] = []
+        level_max: list[np.ndarray] = []
+        carry = np.zeros(0, dtype=np.float32)
+        total = 0
+        for block in blocks:
+            mono = block.mean(axis=1) if block.ndim == 2 else block
+            total += len(mono)
+            mono = np.concatenate([carry, mono.astype(np.float32)])
+            whole = len(mono) // BASE_BUCKET * BASE_BUCKET
+            buckets = mono[:whole].reshape(-1, BASE_BUCKET)
+            level_min.append(buckets.min(axis=1))
+            level_max.append(buckets.max(axis=1))
+            carry = mono[whole:]
+        if len(carry):
+            level_min.append(carry.min(keepdims=True))
+            level_max.append(carry.max(keepdims=True))
+
+        mins = [np.concatenate(level_min) if level_min else np.zeros(1, np.float32)]
+        maxs = [np.concatenate(level_max) if level_max else np.zeros(1, np.float32)]
+        while len(mins[-1]) > 1:
+            lo, hi = mins[-1], maxs[-1]
+            if len(lo) % 2:
+                lo, hi = np.append(lo, lo[-1]), np.append(hi, hi[-1])
+            mins.append(np.minimum(lo[0::2], lo[1::2]))
+            maxs.append(np.maximum(hi[0::2], hi[1::2]))
+        return cls(sample_rate=sample_rate, num_samples=total, mins=mins, maxs=maxs)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "PeakPyramid":
+        import soundfile as sf
+        with sf.SoundFile(str(path)) as f:
+            blocks = f.blocks(blocksize=_READ_BLOCK, always_2d=True, dtype="float32")
+            return cls.from_blocks(blocks, f.samplerate)
+
+    def save(self, path: Path) -> None:
+        arrays = {"meta": np.array([self.sample_rate, self.num_samples], dtype=np.int64)}
+        for k, (lo, hi) in enumerate(zip(self.mins, self.maxs)):
+            arrays[f"min_{k}"] = lo
+            arrays[f"max_{k}"] = hi
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "PeakPyramid":
+        with np.load(path, allow_pickle=False) as data:
+            sample_rate, num_samples = (int(v) for v in data["meta"])
+            levels = sum(1 for name in data.files if name.startswith("min_"))
+            return cls(
+                sample_rate=sample_rate,
+                num_samples=num_samples,
+                mins=[data[f"min_{k}"] for k in range(levels)],
+                maxs=[data[f"max_{k}"] for k in range(levels)],
+            )
+
+    def view(self, start_sec: float, end_sec: float, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Per-column (min, max) for ``n`` columns spanning [start_sec, end_sec).
+
+        Columns beyond the end of the audio read as silence (0, 0).
+        """
+        n = max(1, int(n))
+        out_min = np.zeros(n, dtype=np.float32)
+        out_max = np.zeros(n, dtype=np.float32)
+        if self.num_samples == 0 or end_sec <= start_sec:
+            return out_min, out_max
+
+        edges = np.linspace(start_sec, end_sec, n + 1) * self.sample_rate
+        per_column = (edges[1] - edges[0]) / BASE_BUCKET
+        level = 0
+        while level + 1 < len(self.mins) and 2 ** (level + 1) * _BUCKETS_PER_COLUMN <= per_column:
+            level += 1
+        lo_level, hi_level = self.mins[level], self.maxs[level]
+        bucket = BASE_BUCKET * 2 ** level
+
+        first = np.floor(edges[:-1] / bucket).astype(np.int64)
+        last = np.ceil(edges[1:] / bucket).astype(np.int64)
+        last = np.maximum(last, first + 1)
+        valid = (first < len(lo_level)) & (last > 0)
+        if not valid.any():
+            return out_min, out_max
+        first = np.clip(first[valid], 0, len(lo_level) - 1)
+        last = np.clip(last[valid], 1, len(lo_level))
+
+        # Columns may overlap a shared bucket, so gather each [first, last) range.
+        width = int((last - first).max())
+        idx = first[:, None] + np.arange(width)
+        mask = idx < last[:, None]
+        idx = np.minimum(idx, len(lo_level) - 1)
+        out_min[valid] = np.where(mask, lo_level[idx], np.inf).min(axis=1)
+        out_max[valid] = np.where(mask, hi_level[idx], -np.inf).max(axis=1)
+        return out_min, out_max
+
+
+def load_peak_pyramid(audio_path: Path) -> PeakPyramid:
+    """Pyramid for ``audio_path``: memory, then disk cache, then a fresh build."""
+    digest = cached_sha256(audio_path)
+    with _lock:
+        pyramid = _memory.get(digest)
+        if pyramid is not None:
+            _memory.move_to_end(digest)
+            return pyramid
+
+    cache_path = PEAK_CACHE_DIR / f"{digest}.npz"
+    pyramid = None
+    if cache_path.exists():
+        try:
+            pyramid = PeakPyramid.load(cache_path)
+        except Exception as e:
+            _logger.warning("Rebuilding unreadable peak cache %s: %s", cache_path, e)
+    if pyramid is None:
+        pyramid = PeakPyramid.from_file(audio_path)
+        try:
+            pyramid.save(cache_path)
+        except OSError as e:
+            _logger.warning("Could not write peak cache %s: %s", cache_path, e)
+
+    with _lock:
+        _memory[digest] = pyramid
+        while len(_memory) > _MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+    return pyramid
@@ -10,6 +10,17 @@ PORT = 8000
 WEB_ROOT = Path(__file__).parent.parent / "web"
 SHADERS_ROOT = Path(__file__).parent.parent / "shaders"
 
+_index = None
+
+
+def _shader_index():
+    # Same incremental, persisted index as the FastAPI server's listing.
+    global _index
+    if _index is None:
+        from .server.shader_index import ShaderIndex
+        _index = ShaderIndex(SHADERS_ROOT)
+    return _index
+
 class PreviewHandler(http.server.SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(WEB_ROOT), **kwargs)
@@ -47,13 +58,8 @@ class PreviewHandler(http.server.SimpleHTTPRequestHandler):
             return
 
         if parsed.path == "/api/shaders":
-            files = []
-            if SHADERS_ROOT.exists():
-                for p in SHADERS_ROOT.rglob("*.glsl"):
-                    if "common" in p.parts:
-                        continue
-                    files.append(str(p.relative_to(SHADERS_ROOT)).replace("\\", "/"))
-            self._send_json({"shaders": sorted(files)})
+            files = [entry.path for entry in _shader_index().entries()] if SHADERS_ROOT.exists() else []
+            self._send_json({"shaders": files})
             return
 
         if parsed.path == "/api/shader":
@@ -35,7 +35,8 @@ uniform float     iCameraIPD;
 
 // Audio History
 uniform sampler2D iAudioHistoryTex;
-uniform vec3      iAudioHistoryResolution; // x=frames, y=total_rows, z=unused
+uniform vec3      iAudioHistoryResolution; // x=frames, y=total_rows, z=1 when ring buffer
+uniform int       iAudioHistoryHead;       // column holding the current frame
 
 // LL180 Helper Functions (as per design)
 const float PI = 3.141592653589793238;
@@ -90,3 +91,24 @@ vec2 sampleAudioHistoryLR(float tNorm, float freqNorm) {
     float R = texture(iAudioHistoryTex, vec2(x, yR)).r;
     return vec2(L, R);
 }
+
+// Sample L/R FFT `framesAgo` frames before the current one.
+// Works for both the whole-song texture and the rolling ring buffer.
+vec2 sampleAudioHistoryAgoLR(float framesAgo, float freqNorm) {
+    float frames = iAudioHistoryResolution.x;
+    float col = float(iAudioHistoryHead) - max(framesAgo, 0.0);
+    if (iAudioHistoryResolution.z > 0.5) {
+        if (framesAgo >= frames) return vec2(0.0);
+        col = mod(col, frames);
+    } else {
+        col = max(col, 0.0);
+    }
+    float x = (col + 0.5) / frames;
+
+    float yL = clamp(freqNorm, 0.0, 1.0) * 0.5;
+    float yR = 0.5 + clamp(freqNorm, 0.0, 1.0) * 0.5;
+
+    float L = texture(iAudioHistoryTex, vec2(x, yL)).r;
+    float R = texture(iAudioHistoryTex, vec2(x, yR)).r;
+    return vec2(L, R);
+}
@@ -0,0 +1,147 @@
+"""Shared fixtures. Every test runs against temporary ~/.cedartoy caches."""
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(tmp_path_factory, monkeypatch):
+    import cedartoy.audio as audio
+    import cedartoy.filehash as filehash
+    import cedartoy.musicue as musicue
+    import cedartoy.options_schema as options_schema
+    import cedartoy.render as render
+    import cedartoy.render_estimate as render_estimate
+    import cedartoy.server.shader_index as shader_index
+    import cedartoy.thumbnails as thumbnails
+    import cedartoy.waveform as waveform
+
+    root = tmp_path_factory.mktemp("cedartoy_home")
+    monkeypatch.setattr(filehash, "HASH_CACHE_PATH", root / "hash_cache.json")
+    monkeypatch.setattr(musicue, "COMPILED_CACHE_DIR", root / "cache" / "bundles")
+    monkeypatch.setattr(audio, "STEM_CACHE_DIR", root / "cache" / "stems")
+    monkeypatch.setattr(waveform, "PEAK_CACHE_DIR", root / "cache" / "peaks")
+    monkeypatch.setattr(waveform, "_memory", type(waveform._memory)())
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_CACHE_DIR", root / "cache" / "thumbnails")
+    monkeypatch.setattr(shader_index, "SHADER_INDEX_PATH", root / "cache" / "shader_index.json")
+    monkeypatch.setattr(options_schema, "EXR_PROBE_PATH", root / "cache" / "exr_probe.json")
+    monkeypatch.setattr(render, "GL_SHADER_CACHE_DIR", root / "cache" / "gl_shaders")
+    monkeypatch.setattr(render_estimate, "HISTORY_PATH", root / "render_history.json")
+
+
+@pytest.fixture
+def dense_bundle():
+    """A 32 s bundle with bars, sections, 464 drum onsets and energy curves."""
+    import random
+
+    from cedartoy.musicue import (
+        BeatEvent, DrumOnset, MusiCueBundle, SectionBundleEntry, StemEnergyCurve, TempoInfo,
+    )
+
+    rng = random.Random(7)
+    beats = []
+    t, bar = 0.0, 0
+    for i in range(64):
+        beats.append(BeatEvent(t=t, beat_in_bar=i % 4, bar=bar, is_downbeat=i % 4 == 0))
+        t += 0.5
+        if i % 4 == 3:
+            bar += 1
+    return MusiCueBundle(
+        schema_version="1.0",
+        source_sha256="x" * 64,
+        duration_sec=32.0,
+        fps=24.0,
+        tempo=TempoInfo(bpm_global=120.0),
+        beats=beats,
+        sections=[
+            SectionBundleEntry(start=0.0, end=8.0, label="intro", energy_rank=0.2),
+            SectionBundleEntry(start=8.0, end=20.0, label="verse", energy_rank=0.6),
+            SectionBundleEntry(start=20.0, end=32.0, label="chorus", energy_rank=1.0),
+        ],
+        drums={
+            "kick": [DrumOnset(t=x * 0.5, strength=0.9) for x in range(64)],
+            "hat": sorted(
+                [DrumOnset(t=rng.uniform(0, 32), strength=rng.uniform(0.1, 1.0)) for _ in range(400)],
+                key=lambda o: o.t,
+            ),
+        },
+        global_energy=StemEnergyCurve(hop_sec=0.04, values=[rng.random() for _ in range(800)]),
+        midi_energy={"vocals": StemEnergyCurve(hop_sec=0.1, values=[rng.random() for _ in range(320)])},
+        cuesheet={},
+    )
+
+
+def progress_line(frame: int, total: int, elapsed_sec: float = 0.5) -> str:
+    return "[PROGRESS] " + json.dumps({"frame": frame, "total": total, "elapsed_sec": elapsed_sec})
+
+
+class FakeRenderWorker:
+    """In-process stand-in for ``render_pool.RenderWorker``; scripted by its pool."""
+
+    pid = 4242
+
+    def __init__(self, pool: "FakeRenderPool"):
+        self.pool = pool
+        self.killed = threading.Event()
+
+    def poll(self):
+        return -15 if self.killed.is_set() else None
+
+    def terminate(self):
+        self.killed.set()
+
+    def run(self, job_id, config_file, on_line):
+        pool = self.pool
+        pool.started.append(job_id)
+        for line in pool.lines:
+            on_line(line)
+        if pool.gated:
+            gate = pool.gates.setdefault(job_id, threading.Event())
+            while not gate.wait(0.01):
+                if self.killed.is_set():
+                    return -15
+        for line in pool.final:
+            on_line(line)
+        return pool.code
+
+
+class FakeRenderPool:
+    """``acquire``/``release`` like ``RenderWorkerPool``, handing out ``FakeRenderWorker``s.
+
+    Each job prints ``lines``. A ``gated`` job then waits until the test
+    sets ``gates[job_id]``, returning -15 if terminated first, before it
+    prints ``final`` and returns ``code``. With ``acquire_error`` every
+    ``acquire`` raises it instead.
+    """
+
+    def __init__(self, size=1, lines=None, final=None, code=0, gated=True, acquire_error=None):
+        self.size = size
+        self.lines = (["[LOG] INFO: Starting render", progress_line(1, 2)]
+                      if lines is None else list(lines))
+        self.final = ([
+            "[COMPLETE] " + json.dumps({"output_dir": "out", "frames": 2})]
+            if final is None else list(final))
+        self.code = code
+        self.gated = gated
+        self.acquire_error = acquire_error
+        self.acquired = 0
+        self.started = []
+        self.gates = {}
+
+    def acquire(self):
+        self.acquired += 1
+        if self.acquire_error is not None:
+            raise self.acquire_error
+        return FakeRenderWorker(self)
+
+    def release(self, worker):
+        pass
+
+
+@pytest.fixture
+def fake_render_pool():
+    """``FakeRenderPool`` factory, for scheduler, farm and progress tests."""
+    return FakeRenderPool
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from cedartoy.audio import AudioProcessor
+
+
+@pytest.fixture
+def sweep(tmp_path):
+    sr = 8000
+    t = np.arange(sr * 2) / sr
+    stereo = np.stack([np.sin(2 * np.pi * (200 + 400 * t) * t),
+                       0.5 * np.sin(2 * np.pi * 880 * t)], axis=1)
+    path = tmp_path / "sweep.wav"
+    sf.write(str(path), stereo.astype(np.float32), sr)
+    return path
+
+
+def test_precomputed_table_matches_per_frame_fft(sweep):
+    proc = AudioProcessor(sweep, fps=24.0)
+    for f in range(proc.meta.frame_count):
+        np.testing.assert_allclose(
+            proc.get_shadertoy_texture(f), proc._compute_shadertoy_texture(f), atol=1e-6,
+        )
+
+
+def test_oversampled_table_serves_integer_frames(sweep):
+    proc = AudioProcessor(sweep, fps=24.0, oversample=4)
+    assert proc._texture_table.shape == (proc.meta.frame_count * 4, 2, 512)
+    np.testing.assert_allclose(
+        proc.get_shadertoy_texture(10), proc._compute_shadertoy_texture(10), atol=1e-6,
+    )
+    np.testing.assert_allclose(
+        proc.get_shadertoy_texture_at(10 / 24.0), proc.get_shadertoy_texture(10), atol=1e-6,
+    )
+
+
+def test_texture_at_interpolates_between_rows(sweep):
+    proc = AudioProcessor(sweep, fps=24.0, oversample=2)
+    table = proc._texture_table
+    mid = proc.get_shadertoy_texture_at(10.25 / 24.0)
+    np.testing.assert_allclose(mid, 0.5 * table[20] + 0.5 * table[21], atol=1e-6)
+
+
+def test_texture_at_outside_song_is_computed(sweep):
+    proc = AudioProcessor(sweep, fps=24.0)
+    assert proc.get_shadertoy_texture_at(-1.0).shape == (2, 512)
+    past_end = proc.get_shadertoy_texture_at(100.0)
+    assert np.all(past_end[0] == 0.0)
+    assert np.allclose(past_end[1], 0.5)
+
+
+def _write_stems(folder, sr=8000, seconds=2):
+    import cedartoy.project as project
+    stems_dir = folder / "stems"
+    stems_dir.mkdir()
+    t = np.arange(sr * seconds) / sr
+    for k, name in enumerate(project.STEM_NAMES):
+        tone = np.sin(2 * np.pi * 220 * (k + 1) * t).astype(np.float32)
+        sf.write(str(stems_dir / f"{name}.wav"), tone, sr)
+    return project.discover_stems(folder)
+
+
+def test_stem_table_rows_match_single_stem_fft(sweep):
+    stems = _write_stems(sweep.parent)
+    proc = AudioProcessor(sweep, fps=24.0, stems=stems)
+    assert proc._stem_table.shape == (proc.meta.frame_count, 4, 512)
+    for k, path in enumerate(stems.values()):
+        solo = AudioProcessor(path, fps=24.0)
+        np.testing.assert_allclose(
+            proc.get_stems_texture(12)[k], solo.get_shadertoy_texture(12)[0], atol=1e-6,
+        )
+    # Each stem's tone peaks in a different bin.
+    peaks = proc.get_stems_texture(12).argmax(axis=1)
+    assert len(set(peaks.tolist())) == 4
+
+
+def test_stem_analysis_is_cached(sweep, monkeypatch):
+    import cedartoy.audio as audio
+
+    stems = _write_stems(sweep.parent)
+    first = AudioProcessor(sweep, fps=24.0, stems=stems)._stem_table
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached stems should not be re-analysed")
+
+    monkeypatch.setattr(audio, "_analyze_stem", fail)
+    second = AudioProcessor(sweep, fps=24.0, stems=stems)._stem_table
+    assert isinstance(second, np.memmap)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_stems_texture_is_silent_outside_song(sweep):
+    stems = _write_stems(sweep.parent)
+    proc = AudioProcessor(sweep, fps=24.0, stems=stems)
+    assert not proc.get_stems_texture(10_000).any()
+    assert not proc.get_stems_texture_at(-1.0).any()
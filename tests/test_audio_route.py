@@ -0,0 +1,172 @@
+"""HTTP tests for the binary audio-texture transport."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import soundfile as sf
+from fastapi.testclient import TestClient
+
+from cedartoy.server import analysis
+from cedartoy.server.analysis import AnalysisRegistry
+from cedartoy.server.api import audio as audio_api
+from cedartoy.server.app import app
+
+
+def _tone(path, seconds=1.0, freq=440.0, sr=8000):
+    t = np.arange(int(sr * seconds)) / sr
+    sf.write(str(path), (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32), sr)
+    return path
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    reg = AnalysisRegistry(max_entries=2, executor=ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(analysis, "registry", reg)
+    yield reg
+    reg.close()
+
+
+@pytest.fixture
+def client(tmp_path, registry):
+    client = TestClient(app)
+    path = _tone(tmp_path / "tone.wav")
+    with open(path, "rb") as f:
+        resp = client.post("/api/audio/upload", files={"file": ("tone.wav", f, "audio/wav")})
+    assert resp.status_code == 200
+    return client
+
+
+def _processor(registry):
+    return registry.get().processor
+
+
+def test_frames_f32_matches_textures(client, registry):
+    proc = _processor(registry)
+    resp = client.get("/api/audio/frames", params={"start": 3, "count": 5, "format": "f32"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/octet-stream"
+    assert resp.headers["x-audio-shape"] == "5,2,512"
+    block = np.frombuffer(resp.content, dtype="<f4").reshape(5, 2, 512)
+    for i in range(5):
+        np.testing.assert_array_equal(block[i], proc.get_shadertoy_texture(3 + i))
+
+
+def test_frames_u8_is_quantized_and_zero_outside_song(client, registry):
+    proc = _processor(registry)
+    resp = client.get("/api/audio/frames", params={"start": 58, "count": 4})
+    block = np.frombuffer(resp.content, dtype=np.uint8).reshape(4, 2, 512)
+    assert len(resp.content) == 4 * 1024
+    expected = np.round(proc.get_shadertoy_texture(58) * 255)
+    np.testing.assert_array_equal(block[0], expected)
+    assert not block[2:].any()  # frames 60, 61 are past the 1 s song
+
+
+def test_frames_rejects_bad_requests(client):
+    assert client.get("/api/audio/frames", params={"count": 0}).status_code == 400
+    too_many = audio_api.MAX_FRAMES_PER_REQUEST + 1
+    assert client.get("/api/audio/frames", params={"count": too_many}).status_code == 400
+    assert client.get("/api/audio/frames", params={"format": "f16"}).status_code == 400
+
+
+def test_duplicate_uploads_share_one_analysis(client, registry, tmp_path):
+    first = registry.latest
+    with open(tmp_path / "tone.wav", "rb") as f:
+        body = client.post("/api/audio/upload",
+                           files={"file": ("again.wav", f, "audio/wav")}).json()
+    assert body["analysis_id"] == first
+    assert registry.get(first).refs == 2
+    # Only the first upload's temp file is kept.
+    assert len(list(registry._tmp_dir.iterdir())) == 1
+
+
+def test_released_analyses_are_evicted_and_files_removed(client, registry, tmp_path):
+    first = registry.get()
+    assert client.delete(f"/api/audio/{first.key}").status_code == 200
+    for i, freq in enumerate((220.0, 330.0)):
+        path = _tone(tmp_path / f"t{i}.wav", freq=freq)
+        resp = client.post("/api/audio/open", json={"path": str(path)})
+        assert resp.status_code == 200
+    assert registry.get(first.key) is None
+    assert not first.path.exists()
+    info = client.get("/api/audio/info").json()
+    assert info["metadata"]["duration"] == pytest.approx(1.0)
+
+
+def test_held_analyses_are_not_evicted(client, registry, tmp_path):
+    first = registry.latest
+    for i, freq in enumerate((220.0, 330.0)):
+        client.post("/api/audio/open", json={"path": str(_tone(tmp_path / f"t{i}.wav", freq=freq))})
+    assert registry.get(first) is not None
+    assert client.get("/api/audio/info", params={"analysis_id": first}).status_code == 200
+    assert client.delete("/api/audio/nope").status_code == 404
+
+
+def test_waveform_and_fft_have_binary_formats(client, registry):
+    as_json = client.get("/api/audio/waveform", params={"num_samples": 100}).json()
+    resp = client.get("/api/audio/waveform", params={"num_samples": 100, "format": "f32"})
+    assert resp.headers["X-Total-Samples"] == str(as_json["total_samples"])
+    np.testing.assert_allclose(np.frombuffer(resp.content, dtype="<f4"), as_json["waveform"], atol=1e-6)
+    u8 = np.frombuffer(client.get("/api/audio/waveform",
+                                  params={"num_samples": 100, "format": "u8"}).content, dtype=np.uint8)
+    expected = np.round((np.asarray(as_json["waveform"]) * 0.5 + 0.5) * 255)
+    np.testing.assert_allclose(u8, expected, atol=1)
+
+    fft = client.get("/api/audio/fft/10").json()
+    resp = client.get("/api/audio/fft/10", params={"format": "f32"})
+    tex = np.frombuffer(resp.content, dtype="<f4").reshape(2, 512)
+    np.testing.assert_allclose(tex[0], fft["fft"], atol=1e-6)
+    np.testing.assert_allclose(tex[1], fft["waveform"], atol=1e-6)
+    assert client.get("/api/audio/fft/10", params={"format": "f16"}).status_code == 400
+
+
+def test_fresh_analysis_survives_eviction_before_its_acquirer_resumes(tmp_path, monkeypatch):
+    import asyncio
+
+    reg = AnalysisRegistry(max_entries=0, executor=ThreadPoolExecutor(max_workers=1))
+    build, seen = reg._build, []
+
+    async def build_then_evict(*args):
+        # Another request releases its song in the window between the
+        # entry being inserted and its acquirer resuming.
+        entry = await build(*args)
+        seen.append(entry.refs)
+        reg.release(held.key)
+        return entry
+
+    async def scenario():
+        nonlocal held
+        held = await reg.acquire_path(_tone(tmp_path / "held.wav", freq=220.0), fps=60.0)
+        monkeypatch.setattr(reg, "_build", build_then_evict)
+        with open(_tone(tmp_path / "up.wav"), "rb") as f:
+            data = f.read()
+
+        async def chunks():
+            yield data
+
+        return await reg.acquire_upload(chunks(), ".wav", 60.0)
+
+    held = None
+    try:
+        entry = asyncio.run(scenario())
+        assert seen == [1]
+        assert reg.get(entry.key) is entry and entry.path.exists()
+        assert reg.get(held.key) is None
+    finally:
+        reg.close()
+
+
+def test_registry_analyses_in_a_real_process_pool(tmp_path):
+    import asyncio
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    reg = AnalysisRegistry(executor=pool)
+    try:
+        path = _tone(tmp_path / "tone.wav")
+        entry = asyncio.run(reg.acquire_path(path, fps=60.0))
+        assert entry.refs == 1
+        assert entry.metadata["duration"] == pytest.approx(1.0)
+        assert entry.processor.get_shadertoy_texture(10).shape == (2, 512)
+    finally:
+        reg.close()
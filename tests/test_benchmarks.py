@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks import micro
+from benchmarks.compare import compare
+from benchmarks.micro import Case, fit_exponent, run_case
+from benchmarks.run import StageTimer, median_run, run_audio
+from benchmarks.scenarios import SCENARIOS, Scenario
+from benchmarks.synthetic import synthetic_bundle
+
+
+def results(**scenarios):
+    return {"scenarios": scenarios}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = results(a={"wall_sec": 10.0, "fps": 2.0, "peak_rss_mb": 100.0},
+                       b={"wall_sec": 1.0, "fps": 10.0, "peak_rss_mb": 50.0},
+                       exr={"skipped": "no EXR"})
+    current = results(a={"wall_sec": 11.0, "fps": 1.5, "peak_rss_mb": 100.0},
+                      b={"error": "exit code 1"},
+                      exr={"skipped": "no EXR"},
+                      new={"wall_sec": 3.0})
+    rows = {(r["scenario"], r["metric"]): r for r in compare(baseline, current, threshold=0.2)}
+    assert not rows[("a", "wall_sec")]["regression"]   # +10%
+    assert rows[("a", "fps")]["regression"]             # -25%
+    assert rows[("b", "status")]["regression"]
+    assert not any(name in ("exr", "new") for name, _ in rows)
+
+
+def test_median_run_and_stage_timer():
+    runs = [{"wall_sec": 3.0}, {"wall_sec": 1.0}, {"wall_sec": 2.0}]
+    assert median_run(runs)["wall_sec"] == 2.0 and median_run(runs)["runs"] == 3
+    assert median_run([{"skipped": "x"}]) == {"skipped": "x"}
+
+    class Thing:
+        def work(self, n):
+            return n * 2
+
+    thing, timer, synced = Thing(), StageTimer(), []
+    timer.wrap(thing, "work", "work", sync=lambda: synced.append(1))
+    assert thing.work(2) == 4 and thing.work(3) == 6
+    assert synced == [1, 1] and timer.seconds["work"] >= 0.0
+
+
+def test_audio_scenario_times_load_and_precompute(tmp_path):
+    assert "audio_precompute_5min" in SCENARIOS
+    scenario = Scenario("audio_short", "", kind="audio",
+                        config={"duration_sec": 2.0, "sample_rate": 22050, "fps": 30})
+    result = run_audio(scenario, tmp_path)
+    assert result["frames"] == 60
+    assert set(result["stages"]) == {"load", "precompute"}
+
+
+def test_synthetic_bundle_density_scales_with_length():
+    short, long = synthetic_bundle(10.0), synthetic_bundle(40.0)
+    assert len(long.drums["hat"]) == 4 * len(short.drums["hat"]) == 320
+    assert len(long.global_energy.values) == 4001
+    assert [b.t for b in long.beats] == sorted(b.t for b in long.beats)
+    assert synthetic_bundle(10.0) == short  # seeded
+
+
+def test_scaling_report_flags_superlinear_cases(tmp_path, monkeypatch):
+    assert fit_exponent([1, 2, 4], [3.0, 12.0, 48.0]) == pytest.approx(2.0)
+
+    # Synthetic timings: each case's callable returns its own "seconds".
+    monkeypatch.setattr(micro, "best_time", lambda fn, repeat: fn())
+
+    def timed(exponent):
+        return lambda length, work_dir: lambda: 1e-4 * length ** exponent
+
+    lengths = [10, 20, 40]
+    quadratic = run_case(Case("q", "", timed(2.0)), lengths, tmp_path)
+    assert quadratic["superlinear"] and quadratic["exponent"] == pytest.approx(2.0)
+    assert not run_case(Case("l", "", timed(1.0)), lengths, tmp_path)["superlinear"]
+    assert not run_case(Case("n", "", timed(1.4)), lengths, tmp_path)["superlinear"]  # within tolerance
+    assert run_case(Case("p", "", timed(1.0), expected_exponent=0.0), lengths, tmp_path)["superlinear"]
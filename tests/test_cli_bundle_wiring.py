@@ -86,3 +86,24 @@ def test_all_three_bundle_fields_round_trip_together(tmp_path):
     assert job.bundle_path == bundle
     assert job.bundle_mode == "blend"
     assert job.bundle_blend == 0.3
+
+
+def test_bundle_adsr_reaches_render_job():
+    cfg = build_config(cli_args=_base_cli_args(bundle_adsr={"kick": [0.0, 0.12, 0.0, 0.0]}))
+    job = config_to_job(cfg)
+
+    assert job.bundle_adsr == {"kick": (0.0, 0.12, 0.0, 0.0)}
+
+
+def test_bundle_adsr_rejects_out_of_range_sustain():
+    with pytest.raises(ValueError, match="sustain"):
+        build_config(cli_args=_base_cli_args(bundle_adsr={"hat": [0.0, 0.05, 1.5, 0.0]}))
+
+
+def test_top_level_audio_channel_names_are_not_file_paths():
+    cfg = build_config(cli_args=_base_cli_args(channels={1: "stems", 2: "tex.png"}))
+    job = config_to_job(cfg)
+
+    channels = job.multipass_graph.buffers["Image"].channels
+    assert channels[1] == "stems"
+    assert channels[2] == "file:tex.png"
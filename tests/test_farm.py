@@ -0,0 +1,158 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from cedartoy.farm_agent import FarmAgent, LeaseRefused
+from cedartoy.server import farm
+from cedartoy.server.api import farm as farm_api
+from cedartoy.server.farm import FarmCoordinator, LeaseLost, frame_range, split_frames
+from cedartoy.server.jobs import JobStatus, RenderJobManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make(tmp_path, frames=100, chunk_frames=30, lease_sec=30.0):
+    manager = RenderJobManager(tmp_path / "jobs")
+    clock = Clock()
+    coordinator = FarmCoordinator(manager, lease_sec=lease_sec, clock=clock)
+    job = manager.create_job({"shader": "s.glsl", "frame_start": 10, "frame_end": 10 + frames,
+                              "output_dir": str(tmp_path / "out")})
+    coordinator.submit(job.id, chunk_frames)
+    return manager, coordinator, clock, job
+
+
+def test_frame_range_and_chunks():
+    assert frame_range({"frame_start": 5, "frame_end": 0, "duration_sec": 2, "fps": 30}) == (5, 65)
+    with pytest.raises(ValueError):
+        frame_range({"frame_end": 0, "duration_sec": 0})
+    assert [(c.frame_start, c.frame_end) for c in split_frames(0, 70, 30)] == [(0, 30), (30, 60), (60, 70)]
+
+
+def test_chunks_are_leased_and_aggregated_into_one_job(tmp_path):
+    manager, coordinator, clock, job = make(tmp_path)
+    leases = [coordinator.lease(agent) for agent in ("a", "b", "a", "b")]
+    assert [(l["frame_start"], l["frame_end"]) for l in leases] == [(10, 40), (40, 70), (70, 100), (100, 110)]
+    assert leases[2]["config"]["frame_start"] == 70 and leases[2]["config"]["output_dir"] == str(tmp_path / "out")
+    assert coordinator.lease("c") is None
+
+    coordinator.heartbeat("b", job.id, 1, frames_done=12)
+    clock.now += 5
+    coordinator.complete("b", job.id, 1)
+    progress = manager.get_job(job.id).progress
+    assert (progress["frame"], progress["total"], progress["frames_contiguous"]) == (30, 100, 0)
+    for lease in (leases[0], leases[2], leases[3]):
+        coordinator.complete("a" if lease["chunk"] % 2 == 0 else "b", job.id, lease["chunk"])
+
+    record = manager.get_job(job.id)
+    assert record.status == JobStatus.COMPLETE
+    assert record.result["frames"] == 100 and record.result["chunks"] == 4
+    assert record.result["agents"] == ["a", "b"]
+    assert coordinator.jobs() == []
+
+
+def test_expired_lease_is_re_leased_and_old_holder_is_refused(tmp_path):
+    manager, coordinator, clock, job = make(tmp_path, frames=30)
+    assert coordinator.lease("dead")["chunk"] == 0
+    clock.now += 29
+    assert coordinator.lease("b") is None
+    clock.now += 2
+    lease = coordinator.lease("b")
+    assert lease["chunk"] == 0 and coordinator.get(job.id).chunks[0].attempts == 2
+    with pytest.raises(LeaseLost):
+        coordinator.heartbeat("dead", job.id, 0)
+    with pytest.raises(LeaseLost):
+        coordinator.complete("dead", job.id, 0)
+    coordinator.complete("b", job.id, 0)
+    assert manager.get_job(job.id).status == JobStatus.COMPLETE
+
+
+def test_repeated_failures_fail_the_job_resumably(tmp_path, monkeypatch):
+    monkeypatch.setattr(farm, "MAX_CHUNK_ATTEMPTS", 2)
+    manager, coordinator, clock, job = make(tmp_path)
+    assert coordinator.lease("a")["chunk"] == 0
+    coordinator.complete("a", job.id, 0)
+    for _ in range(2):
+        assert coordinator.lease("a")["chunk"] == 1
+        coordinator.fail("a", job.id, 1, "GPU hung")
+
+    record = manager.get_job(job.id)
+    assert record.status == JobStatus.ERROR and record.resumable
+    assert record.error["frames_done"] == 30 and "GPU hung" in record.error["message"]
+    resumed = manager.resume_job(job.id)
+    assert (resumed.config["frame_start"], resumed.config["frame_end"]) == (40, 110)
+
+
+def test_cancelled_job_refuses_heartbeats(tmp_path):
+    manager, coordinator, clock, job = make(tmp_path)
+    subscription = coordinator.hub.subscribe(job.id)
+    coordinator.lease("a")
+    manager.cancel_job(job.id)
+    with pytest.raises(LeaseLost):
+        coordinator.heartbeat("a", job.id, 0)
+    assert subscription.drain()[-1]["type"] == "render_cancelled"
+    assert coordinator.lease("a") is None
+
+
+PROGRESS = "[PROGRESS] " + json.dumps({"frame": 1, "total": 2, "elapsed_sec": 0.1})
+
+
+@pytest.fixture
+def farm_server(tmp_path, monkeypatch):
+    manager = RenderJobManager(tmp_path / "jobs")
+    coordinator = FarmCoordinator(manager, lease_sec=0.3)
+    monkeypatch.setattr(farm_api, "job_manager", manager)
+    monkeypatch.setattr(farm_api, "coordinator", coordinator)
+    app = FastAPI()
+    app.include_router(farm_api.router, prefix="/api/farm")
+    client = TestClient(app)
+
+    def post(path, payload):
+        response = client.post(path, json=payload)
+        if response.status_code == 409:
+            raise LeaseRefused(response.text)
+        response.raise_for_status()
+        return response.json()
+
+    return manager, client, post
+
+
+def test_agents_render_a_job_over_http(tmp_path, farm_server, fake_render_pool):
+    manager, client, post = farm_server
+    created = client.post("/api/farm/jobs", json={
+        "config": {"shader": "shaders/test.glsl", "frame_start": 0, "frame_end": 50, "fps": 30},
+        "chunk_frames": 20})
+    assert created.status_code == 200
+    job_id = created.json()["job_id"]
+    assert len(created.json()["chunks"]) == 3
+
+    failing = fake_render_pool(lines=[PROGRESS], gated=False, code=1,
+                               final=["[ERROR] " + json.dumps({"message": "shader failed"})])
+    passing = fake_render_pool(lines=[PROGRESS], gated=False, final=[])
+    flaky = FarmAgent(agent_id="flaky", pool=failing, work_dir=tmp_path / "a", post=post)
+    steady = FarmAgent(agent_id="steady", pool=passing, work_dir=tmp_path / "b", post=post)
+    assert flaky.render_chunk(post("/api/farm/lease", {"agent_id": "flaky"})["lease"]) == "failed"
+    assert steady.run(max_chunks=3) == 3
+
+    record = manager.get_job(job_id)
+    assert record.status == JobStatus.COMPLETE and record.result["agents"] == ["flaky", "steady"]
+    assert any("shader failed" in entry.message for entry in record.logs)
+    assert set(client.get("/api/farm/agents").json()["agents"]) == {"flaky", "steady"}
+
+
+def test_agent_stops_rendering_when_its_lease_is_refused(tmp_path, farm_server, fake_render_pool):
+    manager, client, post = farm_server
+    job_id = client.post("/api/farm/jobs", json={
+        "config": {"shader": "shaders/test.glsl", "frame_start": 0, "frame_end": 10, "fps": 30},
+        "chunk_frames": 10}).json()["job_id"]
+    agent = FarmAgent(agent_id="a", pool=fake_render_pool(lines=[PROGRESS]), work_dir=tmp_path / "a", post=post)
+    lease = post("/api/farm/lease", {"agent_id": "a"})["lease"]
+    manager.cancel_job(job_id)
+    assert agent.render_chunk(lease) == "lost"
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import threading
+
+import cedartoy.filehash as filehash
+
+
+def _counting(monkeypatch):
+    calls = {"n": 0}
+    real = filehash.sha256_file
+
+    def counting(path, *args, **kwargs):
+        calls["n"] += 1
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(filehash, "sha256_file", counting)
+    return calls
+
+
+def test_cached_sha256_hashes_unchanged_file_once(tmp_path, monkeypatch):
+    calls = _counting(monkeypatch)
+    audio = tmp_path / "song.wav"
+    audio.write_bytes(b"abc" * 1000)
+    expected = hashlib.sha256(audio.read_bytes()).hexdigest()
+    assert filehash.cached_sha256(audio) == expected
+    assert filehash.cached_sha256(audio) == expected
+    assert calls["n"] == 1
+
+
+def test_cached_sha256_rehashes_after_change(tmp_path, monkeypatch):
+    calls = _counting(monkeypatch)
+    audio = tmp_path / "song.wav"
+    audio.write_bytes(b"one")
+    filehash.cached_sha256(audio)
+    audio.write_bytes(b"two!")
+    st = audio.stat()
+    os.utime(audio, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert filehash.cached_sha256(audio) == hashlib.sha256(b"two!").hexdigest()
+    assert calls["n"] == 2
+
+
+def test_cache_persists_across_processes(tmp_path, monkeypatch):
+    audio = tmp_path / "song.wav"
+    audio.write_bytes(b"persist me")
+    digest = filehash.cached_sha256(audio)
+    assert filehash.HASH_CACHE_PATH.exists()
+    # Simulate a fresh process: drop the in-memory view.
+    monkeypatch.setattr(filehash, "_entries", None)
+    calls = _counting(monkeypatch)
+    assert filehash.peek_sha256(audio) == digest
+    assert filehash.cached_sha256(audio) == digest
+    assert calls["n"] == 0
+
+
+def test_sha256_async_shares_in_flight_work(tmp_path, monkeypatch):
+    audio = tmp_path / "song.wav"
+    audio.write_bytes(b"x" * 4096)
+    release = threading.Event()
+    real = filehash.sha256_file
+
+    def slow(path, *args, **kwargs):
+        release.wait(5)
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(filehash, "sha256_file", slow)
+    first = filehash.sha256_async(audio)
+    second = filehash.sha256_async(audio)
+    assert first is second
+    assert not first.done()
+    release.set()
+    assert first.result(timeout=5) == hashlib.sha256(b"x" * 4096).hexdigest()
+    assert filehash.sha256_async(audio).done()
@@ -0,0 +1,52 @@
+import numpy as np
+import soundfile as sf
+
+from cedartoy.audio import AudioProcessor
+from cedartoy.render import history_ring_writes
+
+
+def test_first_frame_fills_whole_window():
+    writes = history_ring_writes(None, 9, 4)
+    assert writes == [(2, 6, 2), (0, 8, 2)]
+    assert sum(count for _, _, count in writes) == 4
+
+
+def test_sequential_frame_writes_single_column():
+    assert history_ring_writes(9, 10, 4) == [(2, 10, 1)]
+
+
+def test_same_frame_writes_nothing():
+    assert history_ring_writes(10, 10, 4) == []
+
+
+def test_seek_backwards_refills_window():
+    writes = history_ring_writes(100, 3, 4)
+    assert writes == [(0, 0, 4)]
+
+
+def test_small_gap_writes_only_missing_columns():
+    assert history_ring_writes(5, 8, 4) == [(2, 6, 2), (0, 8, 1)]
+
+
+def test_large_gap_refills_once():
+    writes = history_ring_writes(0, 50, 4)
+    assert sum(count for _, _, count in writes) == 4
+    assert writes[-1][1] + writes[-1][2] - 1 == 50
+
+
+def test_history_columns_zero_pad_outside_song(tmp_path):
+    path = tmp_path / "tone.wav"
+    sr = 8000
+    t = np.arange(sr) / sr
+    sf.write(str(path), np.sin(2 * np.pi * 440 * t).astype(np.float32), sr)
+    proc = AudioProcessor(path, fps=10.0)
+    full = proc.get_history_texture()
+
+    cols = proc.get_history_columns(-2, 4)
+    assert cols.shape == (full.shape[0], 4)
+    assert np.all(cols[:, :2] == 0.0)
+    np.testing.assert_array_equal(cols[:, 2:], full[:, :2])
+
+    tail = proc.get_history_columns(full.shape[1] - 1, 3)
+    np.testing.assert_array_equal(tail[:, 0], full[:, -1])
+    assert np.all(tail[:, 1:] == 0.0)
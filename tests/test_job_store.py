@@ -0,0 +1,134 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from cedartoy.server import jobs
+from cedartoy.server.job_store import JOB_DB_NAME
+from cedartoy.server.jobs import JobStatus, RenderJobManager
+from cedartoy.server.scheduler import RenderScheduler
+
+
+@pytest.fixture
+def every_progress_saved(monkeypatch):
+    monkeypatch.setattr(jobs, "PROGRESS_CHECKPOINT_SEC", 0.0)
+
+
+def test_records_survive_a_new_manager(tmp_path, every_progress_saved):
+    first = RenderJobManager(tmp_path)
+    job = first.create_job({"shader": "shaders/test.glsl", "width": 64})
+    first.mark_running(job.id, process_pid=123)
+    first.append_log(job.id, "render started")
+    first.update_progress(job.id, {"frame": 3, "total": 10, "elapsed_sec": 1.0})
+
+    second = RenderJobManager(tmp_path)
+    again = second.get_job(job.id)
+    assert again.status == JobStatus.RUNNING
+    assert again.config == {"shader": "shaders/test.glsl", "width": 64}
+    assert again.process_pid == 123
+    assert [entry.message for entry in again.logs] == ["render started"]
+    assert again.progress["frame"] == 3
+    assert [j.id for j in second.list_jobs()] == [job.id]
+    with pytest.raises(KeyError):
+        second.get_job("missing")
+
+
+def test_database_uses_wal(tmp_path):
+    RenderJobManager(tmp_path)
+    conn = sqlite3.connect(tmp_path / JOB_DB_NAME)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"jobs_status", "job_logs_job"} <= indexes
+
+
+def test_progress_checkpoints_are_throttled(tmp_path):
+    manager = RenderJobManager(tmp_path)
+    job = manager.create_job({"shader": "s.glsl"})
+    manager.mark_running(job.id, process_pid=1)
+    manager.update_progress(job.id, {"frame": 1, "total": 4})
+    assert manager.store.load_job(job.id)["progress"]["frame"] == 0  # just saved by mark_running
+    manager.mark_error(job.id, {"message": "boom"})
+    assert manager.store.load_job(job.id)["progress"]["frame"] == 1
+
+
+def test_recover_requeues_interrupts_and_reattaches(tmp_path, every_progress_saved):
+    old = RenderJobManager(tmp_path)
+    queued = old.create_job({"shader": "q.glsl"})
+    lost = old.create_job({"shader": "l.glsl"})
+    alive = old.create_job({"shader": "a.glsl"})
+    old.mark_running(lost.id, process_pid=111)
+    old.update_progress(lost.id, {"frame": 4, "total": 10})
+    old.mark_running(alive.id, process_pid=222)
+    queued.config_file.unlink()
+
+    manager = RenderJobManager(tmp_path)
+    report = manager.recover(pid_alive=lambda pid: pid == 222)
+
+    assert report == {"queued": [queued.id], "reattached": [alive.id], "interrupted": [lost.id]}
+    assert manager.get_job(queued.id).config_file.exists()
+    interrupted = manager.get_job(lost.id)
+    assert interrupted.status == JobStatus.ERROR and interrupted.resumable
+    assert interrupted.error["frames_done"] == 4
+    assert manager.get_job(alive.id).status == JobStatus.RUNNING
+
+
+def test_resume_skips_rendered_frames(tmp_path, every_progress_saved):
+    manager = RenderJobManager(tmp_path)
+    job = manager.create_job({"shader": "s.glsl", "frame_start": 2})
+    manager.mark_running(job.id, process_pid=1)
+    manager.mark_error(job.id, {"message": "not resumable"})
+    with pytest.raises(ValueError):
+        manager.resume_job(job.id)
+
+    job = manager.create_job({"shader": "s.glsl", "frame_start": 2})
+    manager.mark_running(job.id, process_pid=1)
+    manager.update_progress(job.id, {"frame": 4, "total": 10})
+    manager.mark_interrupted(job.id, "server stopped")
+    resumed = manager.resume_job(job.id)
+
+    assert resumed.status == JobStatus.QUEUED and not resumed.resumable
+    assert (resumed.config["frame_start"], resumed.config["frame_end"]) == (6, 12)
+    assert "frame_end: 12" in resumed.config_file.read_text(encoding="utf-8")
+    assert RenderJobManager(tmp_path).get_job(job.id).config["frame_start"] == 6
+
+
+def test_artifacts_are_recorded_on_completion(tmp_path):
+    output_dir = tmp_path / "renders"
+    output_dir.mkdir()
+    (output_dir / "frame_00001.png").write_bytes(b"png")
+    manager = RenderJobManager(tmp_path / "work")
+    job = manager.create_job({"shader": "s.glsl", "output_dir": str(output_dir)})
+    manager.mark_complete(job.id, {"output_dir": str(output_dir)})
+    (output_dir / "frame_00002.png").write_bytes(b"later, another job")
+
+    listed = RenderJobManager(tmp_path / "work").list_artifacts(job.id)
+    assert [a["name"] for a in listed] == ["frame_00001.png"]
+
+
+def test_scheduler_watches_reattached_job_until_its_process_exits(tmp_path, fake_render_pool):
+    old = RenderJobManager(tmp_path)
+    job = old.create_job({"shader": "a.glsl"})
+    old.mark_running(job.id, process_pid=222)
+    waiting = old.create_job({"shader": "b.glsl"})
+
+    manager = RenderJobManager(tmp_path)
+    pool = fake_render_pool(acquire_error=RuntimeError("no workers in this test"))
+    scheduler = RenderScheduler(manager, pool=pool)
+    alive = {222: True}
+
+    async def main():
+        report = scheduler.recover(pid_alive=lambda pid: alive.get(pid, False), interval=0.01)
+        assert report["reattached"] == [job.id]
+        assert scheduler.running() == [job.id] and scheduler.queued() == [waiting.id]
+        await asyncio.sleep(0.05)
+        assert pool.acquired == 0  # the re-attached render holds the only slot
+        updates = scheduler.subscribe(job.id)
+        alive[222] = False
+        [message] = await asyncio.wait_for(updates.get(), 1.0)
+        await asyncio.sleep(0.05)
+        return message
+
+    message = asyncio.run(main())
+    assert message["type"] == "render_error" and message["resumable"]
+    assert manager.get_job(job.id).resumable
+    assert pool.acquired == 1
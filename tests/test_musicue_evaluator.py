@@ -104,3 +104,132 @@ def test_midi_energy_lookup():
     ev = BundleEvaluator(b, fps=24.0)
     val = ev.evaluate(int(round(0.5 * 24.0))).midi_energy["vocals"]
     assert val == pytest.approx(0.5, abs=0.02)
+
+
+def test_evaluate_range_matches_per_frame_evaluate(dense_bundle):
+    ev = BundleEvaluator(dense_bundle, fps=24.0)
+    timeline = ev.evaluate_range(0, 24 * 33)
+    assert len(timeline) == 24 * 33
+    for f in range(0, 24 * 33, 5):
+        expected = ev.evaluate(f)
+        got = timeline.frame(f)
+        assert got.bar == expected.bar
+        assert got.beat_phase == pytest.approx(expected.beat_phase, abs=1e-9)
+        assert got.section_energy == pytest.approx(expected.section_energy)
+        assert got.global_energy == pytest.approx(expected.global_energy, abs=1e-9)
+        for cls in ("kick", "hat"):
+            assert got.drum_pulses[cls] == pytest.approx(expected.drum_pulses[cls], abs=1e-9)
+        assert got.midi_energy["vocals"] == pytest.approx(expected.midi_energy["vocals"], abs=1e-9)
+
+
+def test_evaluate_range_offsets_and_membership(dense_bundle):
+    ev = BundleEvaluator(dense_bundle, fps=24.0)
+    timeline = ev.evaluate_range(100, 110)
+    assert 100 in timeline and 109 in timeline
+    assert 99 not in timeline and 110 not in timeline
+    assert timeline.frame(105).bar == ev.evaluate(105).bar
+
+
+def test_evaluate_range_bar_fallback_without_downbeats():
+    ev = BundleEvaluator(_bundle(tempo_bpm=120.0), fps=24.0)
+    timeline = ev.evaluate_range(0, 80)
+    assert timeline.frame(int(round(2.5 * 24.0))).bar == 1
+
+
+def test_per_class_adsr_overrides_default():
+    b = _bundle()
+    b.drums = {
+        "kick": [DrumOnset(t=1.0, strength=1.0)],
+        "hat": [DrumOnset(t=1.0, strength=1.0)],
+    }
+    ev = BundleEvaluator(b, fps=24.0, adsr={"kick": (0.0, 1.0, 0.0, 0.0)})
+    frame = ev.evaluate(int(round(1.5 * 24.0)))
+    assert frame.drum_pulses["kick"] == pytest.approx(0.5, abs=0.01)
+    assert frame.drum_pulses["hat"] < 0.05
+
+
+def test_default_key_applies_to_unlisted_classes():
+    b = _bundle()
+    b.drums = {"tom": [DrumOnset(t=1.0, strength=0.5)]}
+    ev = BundleEvaluator(b, fps=24.0, adsr={"default": (0.0, 0.1, 0.5, 0.0)})
+    assert ev.adsr_for("tom") == (0.0, 0.1, 0.5, 0.0)
+    # Sustained onsets keep contributing long after their decay.
+    assert ev.evaluate(int(round(3.0 * 24.0))).drum_pulses["tom"] == pytest.approx(0.25)
+
+
+def test_drum_pulse_cost_independent_of_song_position(monkeypatch):
+    import cedartoy.musicue as musicue
+
+    b = _bundle(duration=400.0)
+    b.drums = {"hat": [DrumOnset(t=i * 0.05, strength=0.3) for i in range(8000)]}
+    ev = BundleEvaluator(b, fps=24.0)
+
+    calls = {"n": 0}
+    real = musicue._adsr_value
+
+    def counting(*args):
+        calls["n"] += 1
+        return real(*args)
+
+    monkeypatch.setattr(musicue, "_adsr_value", counting)
+    ev.evaluate(24)
+    early = calls["n"]
+    calls["n"] = 0
+    ev.evaluate(24 * 390)
+    assert calls["n"] == early
+    assert calls["n"] <= 2
+
+
+def test_evaluate_range_honours_custom_adsr(dense_bundle):
+    adsr = {"kick": (0.02, 0.3, 0.2, 0.0), "hat": (0.0, 0.05, 0.0, 0.0)}
+    ev = BundleEvaluator(dense_bundle, fps=24.0, adsr=adsr)
+    timeline = ev.evaluate_range(0, 24 * 33)
+    for f in range(0, 24 * 33, 7):
+        expected = ev.evaluate(f)
+        for cls in ("kick", "hat"):
+            assert timeline.frame(f).drum_pulses[cls] == pytest.approx(expected.drum_pulses[cls], abs=1e-9)
+
+
+def test_oversampled_timeline_frames_match_evaluate(dense_bundle):
+    ev = BundleEvaluator(dense_bundle, fps=24.0)
+    timeline = ev.evaluate_range(10, 40, oversample=4)
+    assert len(timeline) == 30
+    for f in range(10, 40):
+        assert timeline.frame(f).drum_pulses["kick"] == pytest.approx(
+            ev.evaluate(f).drum_pulses["kick"], abs=1e-9)
+
+
+def test_at_time_interpolates_subframe_values(dense_bundle):
+    ev = BundleEvaluator(dense_bundle, fps=24.0)
+    timeline = ev.evaluate_range(0, 100, oversample=4)
+    t = 50.125 / 24.0  # halfway between two oversampled rows
+    got = timeline.at_time(t)
+    a = ev.evaluate_at(50.0 / 24.0 + 0.0 / 96.0)
+    b = ev.evaluate_at(50.0 / 24.0 + 1.0 / 96.0)
+    assert timeline.covers(t)
+    assert got.global_energy == pytest.approx(0.5 * (a.global_energy + b.global_energy), abs=1e-9)
+    assert not timeline.covers(200 / 24.0)
+
+
+def test_evaluate_at_sees_kick_between_frames():
+    b = _bundle()
+    b.drums = {"kick": [DrumOnset(t=1.01, strength=1.0)]}
+    ev = BundleEvaluator(b, fps=24.0)
+    assert ev.evaluate_at(1.01).drum_pulses["kick"] == pytest.approx(1.0)
+    assert ev.evaluate_at(1.0).drum_pulses["kick"] == 0.0
+
+
+def test_compiled_bundle_evaluates_like_model(tmp_path, dense_bundle):
+    from cedartoy.musicue import CompiledBundle
+
+    bundle = dense_bundle
+    compiled = CompiledBundle.from_bundle(bundle)
+    compiled.save(tmp_path / "b.npz", (1, 2))
+    loaded = CompiledBundle.load(tmp_path / "b.npz", source_key=(1, 2))
+    assert loaded is not None
+
+    ref = BundleEvaluator(bundle, fps=24.0)
+    ev = BundleEvaluator(loaded, fps=24.0)
+    assert ev.bundle is loaded
+    for f in range(0, 24 * 33, 7):
+        assert ev.evaluate(f) == ref.evaluate(f)
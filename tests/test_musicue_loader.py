@@ -84,3 +84,54 @@ def test_load_for_audio_override_path(tmp_path):
     result = load_for_audio(audio, override_path=override)
     assert result.path == override
     assert result.bundle.source_sha256 == "override"
+
+
+def test_load_compiled_bundle_writes_and_reuses_cache(tmp_path, monkeypatch):
+    import cedartoy.musicue as musicue
+    from cedartoy.musicue import CompiledBundle, load_compiled_bundle
+
+    path = _bundle(tmp_path / "song.musicue.json", source_sha256="abc")
+    first = load_compiled_bundle(path)
+    assert isinstance(first, CompiledBundle)
+    assert list(musicue.COMPILED_CACHE_DIR.glob("*.npz"))
+
+    def fail(_path):
+        raise AssertionError("cache hit should not re-parse the JSON")
+
+    monkeypatch.setattr(musicue, "load_bundle", fail)
+    second = load_compiled_bundle(path)
+    assert second.source_sha256 == "abc"
+    assert second.tempo.bpm_global == 120.0
+
+
+def test_load_compiled_bundle_rebuilds_when_source_changes(tmp_path):
+    import os
+    from cedartoy.musicue import load_compiled_bundle
+
+    path = _bundle(tmp_path / "song.musicue.json", source_sha256="old")
+    assert load_compiled_bundle(path).source_sha256 == "old"
+    _bundle(path, source_sha256="new-and-longer")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_compiled_bundle(path).source_sha256 == "new-and-longer"
+
+
+def test_load_compiled_bundle_ignores_corrupt_cache(tmp_path):
+    from cedartoy.musicue import compiled_cache_path, load_compiled_bundle
+
+    path = _bundle(tmp_path / "song.musicue.json", source_sha256="abc")
+    cache_file = compiled_cache_path(path)
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_bytes(b"not a zip")
+    assert load_compiled_bundle(path).source_sha256 == "abc"
+
+
+def test_load_for_audio_compiled(tmp_path):
+    from cedartoy.musicue import CompiledBundle
+
+    audio = _audio(tmp_path)
+    sha = hashlib.sha256(audio.read_bytes()).hexdigest()
+    _bundle(tmp_path / "song.musicue.json", source_sha256=sha)
+    result = load_for_audio(audio, compiled=True)
+    assert isinstance(result.bundle, CompiledBundle)
+    assert result.sha_match is True
@@ -66,3 +66,17 @@ def test_clamped_to_unit_range():
     tex = MusicalSpectrumSynth().synthesize(saturated)
     assert tex.min() >= 0.0
     assert tex.max() <= 1.0
+
+
+def test_batch_matches_per_frame_synthesis(dense_bundle):
+    from cedartoy.musicue import BundleEvaluator
+
+    ev = BundleEvaluator(dense_bundle, fps=24.0)
+    timeline = ev.evaluate_range(0, 24 * 33, oversample=2)
+    synth = MusicalSpectrumSynth()
+    stack = synth.synthesize_batch(timeline)
+    assert stack.shape == (24 * 33 * 2, 2, 512)
+    assert stack.dtype == np.float32
+    for f in range(0, 24 * 33, 11):
+        row = timeline.row_of(f)
+        np.testing.assert_allclose(stack[row], synth.synthesize(timeline.frame(f)), atol=1e-6)
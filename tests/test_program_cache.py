@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from cedartoy import render
+from cedartoy.render import QUAD_VERTEX_SHADER, ProgramCache, configure_driver_shader_cache
+from cedartoy.shader import assemble_shader
+
+SRC = "void mainImage(out vec4 c, in vec2 p) { c = vec4(1.0); }\n"
+
+
+def test_driver_cache_env_defaults_to_cedartoy_dir(tmp_path, monkeypatch):
+    for var in ("MESA_SHADER_CACHE_DIR", "MESA_GLSL_CACHE_DIR", "__GL_SHADER_DISK_CACHE",
+                "__GL_SHADER_DISK_CACHE_PATH", "__GL_SHADER_DISK_CACHE_SKIP_CLEANUP"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("__GL_SHADER_DISK_CACHE_PATH", "/user/choice")
+    configure_driver_shader_cache(tmp_path / "gl")
+    assert os.environ["MESA_SHADER_CACHE_DIR"] == str(tmp_path / "gl")
+    assert os.environ["__GL_SHADER_DISK_CACHE"] == "1"
+    assert os.environ["__GL_SHADER_DISK_CACHE_PATH"] == "/user/choice"
+    assert (tmp_path / "gl").is_dir()
+
+
+def test_identical_sources_share_one_program(tmp_path, monkeypatch):
+    monkeypatch.setattr(render, "GL_SHADER_CACHE_DIR", tmp_path / "gl")
+    try:
+        ctx = render.create_standalone_context()
+    except Exception as e:
+        pytest.skip(f"no GL context: {e}")
+    try:
+        cache = ProgramCache(ctx)
+        a = cache.get(QUAD_VERTEX_SHADER, assemble_shader(SRC))
+        b = cache.get(QUAD_VERTEX_SHADER, assemble_shader(SRC))
+        c = cache.get(QUAD_VERTEX_SHADER, assemble_shader(SRC, {"FAST": None}))
+        assert a is b and a is not c
+        assert (cache.compiled, cache.reused) == (2, 1)
+        cache.release()
+    finally:
+        ctx.release()
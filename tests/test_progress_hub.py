@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+
+from cedartoy.cli import format_watch_message
+from cedartoy.server import progress_hub
+from cedartoy.server.jobs import RenderJobManager
+from cedartoy.server.progress_hub import ProgressHub
+from cedartoy.server.scheduler import RenderScheduler
+
+
+def log(message):
+    return {"type": "render_log", "job_id": "j", "message": message}
+
+
+def progress(frame):
+    return {"type": "render_progress", "job_id": "j", "frame": frame, "total": 10}
+
+
+def test_progress_is_coalesced_and_logs_batched_in_order():
+    hub = ProgressHub()
+    subscription = hub.subscribe("j")
+    for message in [progress(1), log("a"), progress(2), log("b"),
+                    {"type": "render_complete", "job_id": "j"}, log("after")]:
+        hub.publish("j", message)
+
+    assert subscription.drain() == [
+        progress(2),
+        {"type": "render_logs", "job_id": "j", "messages": ["a", "b"], "dropped": 0},
+        {"type": "render_complete", "job_id": "j"},
+        {"type": "render_logs", "job_id": "j", "messages": ["after"], "dropped": 0},
+    ]
+    assert subscription.drain() == []
+
+
+def test_log_batches_keep_the_newest_lines(monkeypatch):
+    monkeypatch.setattr(progress_hub, "LOG_BATCH_LIMIT", 3)
+    hub = ProgressHub()
+    subscription = hub.subscribe("j")
+    for i in range(10):
+        hub.publish("j", log(str(i)))
+    [batch] = subscription.drain()
+    assert batch["messages"] == ["7", "8", "9"] and batch["dropped"] == 7
+
+
+def test_get_is_rate_limited():
+    hub = ProgressHub(max_updates_per_sec=10)
+    subscription = hub.subscribe("j")
+
+    async def main():
+        hub.publish("j", progress(1))
+        first = await subscription.get()
+        started = time.monotonic()
+        hub.publish("j", progress(2))
+        hub.publish("j", progress(3))
+        second = await subscription.get()
+        return first, second, time.monotonic() - started
+
+    first, second, waited = asyncio.run(main())
+    assert first == [progress(1)] and second == [progress(3)]
+    assert waited >= 0.08
+
+
+def _flood_lines():
+    for frame in range(1, 1001):
+        yield "[PROGRESS] " + json.dumps({"frame": frame, "total": 1000, "elapsed_sec": 1.0})
+        for i in range(5):
+            yield f"[LOG] frame {frame} line {i}"
+
+
+def test_every_subscriber_gets_a_bounded_stream(tmp_path, fake_render_pool):
+    manager = RenderJobManager(tmp_path)
+    pool = fake_render_pool(lines=_flood_lines(), gated=False,
+                            final=["[COMPLETE] " + json.dumps({"output_dir": "out", "frames": 1000})])
+    scheduler = RenderScheduler(manager, pool=pool, hub=ProgressHub(max_updates_per_sec=20))
+    job = manager.create_job({"shader": "s.glsl"})
+
+    async def follow(subscription):
+        batches = []
+        while not any(m["type"] == "render_complete" for m in (batches[-1] if batches else [])):
+            batches.append(await asyncio.wait_for(subscription.get(), 10))
+        return batches
+
+    async def main():
+        subscriptions = [scheduler.subscribe(job.id) for _ in range(3)]
+        scheduler.submit(job.id)
+        return await asyncio.gather(*(follow(s) for s in subscriptions))
+
+    for batches in asyncio.run(main()):
+        messages = [m for batch in batches for m in batch]
+        logs = [m for m in messages if m["type"] == "render_logs"]
+        assert sum(len(m["messages"]) + m["dropped"] for m in logs) == 5000
+        assert logs[-1]["messages"][-1] == "frame 1000 line 4"
+        assert [m for m in messages if m["type"] == "render_progress"][-1]["frame"] == 1000
+        assert len(messages) < 200  # not one message per line
+    assert scheduler.hub.subscriber_count(job.id) == 3
+
+
+def test_watch_lines():
+    assert format_watch_message({"type": "render_progress", "frame": 3, "total": 9, "eta_sec": 1.5}) == \
+        ["Frame 3/9  ETA 1.5s"]
+    assert format_watch_message({"type": "render_logs", "messages": ["a"], "dropped": 2}) == \
+        ["(2 log lines skipped)", "a"]
+    assert format_watch_message({"type": "render_error", "message": "boom", "resumable": True}) == \
+        ["Render failed: boom (resumable)"]
+    assert format_watch_message({"type": "subscribed"}) == []
@@ -175,3 +175,49 @@ def test_load_project_includes_stems(tmp_path):
         _write_silent_wav(folder / "stems" / f"{name}.wav")
     proj = load_project(folder)
     assert set(proj.stems_paths) == {"drums", "bass", "vocals", "other"}
+
+
+def test_load_project_background_sha_resolves_later(tmp_path, monkeypatch):
+    import threading
+    import cedartoy.filehash as filehash
+    from cedartoy.project import check_bundle_sha, load_project
+
+    folder = tmp_path / "background"
+    _seed_minimal_project(folder)
+    monkeypatch.setattr(filehash, "_entries", {})  # forget the seed's hash
+    release = threading.Event()
+    real = filehash.sha256_file
+
+    def slow(path, *args, **kwargs):
+        release.wait(5)
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(filehash, "sha256_file", slow)
+    proj = load_project(folder, background_sha=True)
+    assert proj.sha_pending is True
+    assert proj.bundle_sha_matches_audio is None
+
+    release.set()
+    filehash.sha256_async(proj.audio_path).result(timeout=5)
+    sha = check_bundle_sha(proj.audio_path, proj.bundle_path, background=True)
+    assert sha.pending is False
+    assert sha.matches is True
+
+
+def test_check_bundle_sha_reparses_bundle_only_when_it_changes(tmp_path):
+    import os
+    from cedartoy.project import check_bundle_sha
+
+    folder = tmp_path / "polled"
+    _seed_minimal_project(folder)
+    audio, bundle = folder / "song.wav", folder / "song.musicue.json"
+    assert check_bundle_sha(audio, bundle).matches is True
+
+    # Same size and mtime: the poll must not parse the file again.
+    st = bundle.stat()
+    bundle.write_bytes(b"x" * st.st_size)
+    os.utime(bundle, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert check_bundle_sha(audio, bundle).matches is True
+
+    os.utime(bundle, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert "sha check failed" in check_bundle_sha(audio, bundle).warnings[0]
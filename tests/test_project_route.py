@@ -77,6 +77,36 @@ def test_project_bundle_returns_parsed_json(client, tmp_path):
     assert resp.json()["schema_version"] == "1.1"
 
 
+def test_project_bundle_serves_updated_file(client, tmp_path):
+    import os
+    folder = tmp_path / "song"
+    _seed(folder)
+    bundle_path = folder / "song.musicue.json"
+    params = {"path": str(bundle_path)}
+    assert client.get("/api/project/bundle", params=params).json()["schema_version"] == "1.1"
+    doc = json.loads(bundle_path.read_text(encoding="utf-8"))
+    doc["schema_version"] = "1.2"
+    bundle_path.write_text(json.dumps(doc))
+    st = bundle_path.stat()
+    os.utime(bundle_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert client.get("/api/project/bundle", params=params).json()["schema_version"] == "1.2"
+
+
+def test_project_sha_endpoint_reports_verdict(client, tmp_path):
+    folder = tmp_path / "song"
+    audio = _seed(folder)
+    resp = client.post("/api/project/load",
+                       json={"path": str(folder), "background_sha": True})
+    assert resp.status_code == 200
+    body = resp.json()
+    # The seed already hashed the audio, so the verdict is immediate.
+    assert body["sha_pending"] is False
+    sha = client.get("/api/project/sha", params={
+        "audio_path": str(audio), "bundle_path": str(folder / "song.musicue.json"),
+    }).json()
+    assert sha == {"sha_pending": False, "bundle_sha_matches_audio": True, "warnings": []}
+
+
 def test_project_bundle_404_when_missing(client, tmp_path):
     resp = client.get("/api/project/bundle",
                       params={"path": str(tmp_path / "nope.json")})
@@ -130,6 +160,32 @@ def test_project_waveform_returns_peaks(client, tmp_path):
         assert -1.0 <= v <= 1.0
 
 
+def test_project_waveform_time_range(client, tmp_path):
+    folder = tmp_path / "song"
+    audio = _seed(folder)
+    resp = client.get(
+        "/api/project/waveform",
+        params={"path": str(audio), "n": 16, "start": 0.05, "end": 0.1},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert len(body["min"]) == len(body["max"]) == 16
+    assert body["start"] == 0.05 and body["end"] == 0.1
+    assert body["duration"] == pytest.approx(0.25)
+
+
+def test_project_waveform_binary_matches_json(client, tmp_path):
+    folder = tmp_path / "song"
+    audio = _seed(folder)
+    params = {"path": str(audio), "n": 32}
+    body = client.get("/api/project/waveform", params=params).json()
+    resp = client.get("/api/project/waveform", params={**params, "format": "f32"})
+    assert resp.headers["content-type"] == "application/octet-stream"
+    pairs = np.frombuffer(resp.content, dtype="<f4").reshape(32, 2)
+    assert pairs[:, 0].tolist() == pytest.approx(body["min"])
+    assert pairs[:, 1].tolist() == pytest.approx(body["max"])
+
+
 def test_project_waveform_404_when_missing(client, tmp_path):
     resp = client.get(
         "/api/project/waveform",
@@ -0,0 +1,141 @@
+"""Per-frame memoization of audio evaluation and upload in Renderer.
+
+Exercised without a GL context: the renderer is built with __new__ and
+given counting fakes for the audio processor, bundle evaluator, synth
+and texture.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+
+from cedartoy.musicue import EvalFrame
+from cedartoy.render import Renderer
+
+
+class _Counter:
+    def __init__(self):
+        self.calls = 0
+
+
+class _FakeAudio(_Counter):
+    def get_shadertoy_texture(self, frame_index):
+        self.calls += 1
+        return np.full((2, 512), frame_index, dtype=np.float32)
+
+
+class _FakeEval(_Counter):
+    def evaluate(self, frame_index):
+        self.calls += 1
+        return EvalFrame(bar=frame_index)
+
+
+class _FakeSynth(_Counter):
+    def synthesize(self, frame):
+        self.calls += 1
+        return np.zeros((2, 512), dtype=np.float32)
+
+
+class _FakeAudioAt(_FakeAudio):
+    def get_shadertoy_texture_at(self, time_sec):
+        self.calls += 1
+        return np.full((2, 512), time_sec, dtype=np.float32)
+
+
+class _FakeEvalAt(_FakeEval):
+    def evaluate_at(self, t):
+        self.calls += 1
+        return EvalFrame(global_energy=t)
+
+
+class _FakeTexture(_Counter):
+    def write(self, data):
+        self.calls += 1
+        self.last = data
+
+
+class _FakeCtx:
+    def texture(self, size, components, dtype):
+        return _FakeTexture()
+
+
+def _renderer(bundle=True, subframe=False):
+    r = Renderer.__new__(Renderer)
+    r.job = SimpleNamespace(audio_mode="both")
+    r.audio = _FakeAudioAt() if subframe else _FakeAudio()
+    r.bundle_eval = (_FakeEvalAt() if subframe else _FakeEval()) if bundle else None
+    r.spectrum_synth = _FakeSynth() if bundle else None
+    r.bundle_mode = "blend"
+    r.bundle_blend = 0.5
+    r.bundle_timeline = None
+    r.cued_stack = None
+    r._audio_frame_cache = None
+    r._audio_textures = {}
+    r._stem_textures = None
+    r.subframe_audio = subframe
+    r.ctx = _FakeCtx()
+    return r
+
+
+def test_repeated_passes_in_one_frame_evaluate_once():
+    r = _renderer()
+    for _ in range(64 * 8):
+        frame = r._prepare_audio(12, 0, 0.2)
+    assert frame.bar == 12
+    assert r.audio.calls == 1
+    assert r.bundle_eval.calls == 1
+    assert r.spectrum_synth.calls == 1
+    assert r.audio_tex_512.calls == 1
+
+
+def test_new_frame_invalidates_cache():
+    r = _renderer()
+    r._prepare_audio(1)
+    r._prepare_audio(1)
+    r._prepare_audio(2)
+    assert r.audio.calls == 2
+    assert r.audio_tex_512.calls == 2
+    uploaded = np.frombuffer(r.audio_tex_512.last, dtype=np.float32)
+    assert np.allclose(uploaded, 1.0)  # blend of raw (2.0) and cued (0.0)
+
+
+def test_raw_only_frames_are_cached_too():
+    r = _renderer(bundle=False)
+    assert r._prepare_audio(3) is None
+    r._prepare_audio(3)
+    assert r.audio.calls == 1
+    assert r.audio_tex_512.calls == 1
+
+
+def test_subframe_samples_get_their_own_time_and_texture():
+    r = _renderer(subframe=True)
+    times = [1.0, 1.01, 1.02]
+    for _tile in range(4):
+        for sample_idx, t in enumerate(times):
+            frame = r._prepare_audio(60, sample_idx, t)
+            assert frame.global_energy == t
+            uploaded = np.frombuffer(r.audio_tex_512.last, dtype=np.float32)
+            assert np.allclose(uploaded, t * 0.5)
+    assert r.audio.calls == len(times)
+    assert r.bundle_eval.calls == len(times)
+    assert len(r._audio_textures) == len(times)
+    assert all(tex.calls == 1 for tex in r._audio_textures.values())
+
+
+def test_cued_stack_replaces_per_frame_synthesis():
+    from cedartoy.musicue import EvalTimeline
+
+    r = _renderer()
+    n = 10
+    r.bundle_timeline = EvalTimeline(
+        frame_start=5, fps=24.0, oversample=1,
+        bpm=np.zeros(n), beat_phase=np.zeros(n), bar=np.arange(n),
+        section_energy=np.zeros(n), global_energy=np.zeros(n),
+    )
+    r.bundle_mode = "cued"
+    r.cued_stack = np.arange(n, dtype=np.float32)[:, None, None] * np.ones((n, 2, 512), np.float32)
+    r._prepare_audio(8)
+    assert r.spectrum_synth.calls == 0
+    assert np.allclose(np.frombuffer(r.audio_tex_512.last, dtype=np.float32), 3.0)
+    # Frames outside the precomputed range still synthesize.
+    r._prepare_audio(40)
+    assert r.spectrum_synth.calls == 1
@@ -0,0 +1,193 @@
+import io
+import json
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+import pytest
+
+from cedartoy import render, render_worker
+from cedartoy.render import RenderResources
+from cedartoy.server.render_pool import RenderWorkerPool
+
+REPO = Path(__file__).resolve().parents[1]
+
+# Speaks the worker protocol without rendering: "fail" in the config name
+# exits 1, "hang" never finishes, and --max-jobs is honoured.
+FAKE_WORKER = textwrap.dedent("""
+    import json, os, sys, time
+    max_jobs = int(sys.argv[1])
+    jobs = 0
+    print("[WORKER] " + json.dumps({"event": "ready"}), flush=True)
+    for raw in sys.stdin:
+        cmd = json.loads(raw)
+        if cmd["cmd"] == "exit":
+            break
+        if "hang" in cmd["config_file"]:
+            time.sleep(60)
+        print("[LOG] rendering " + cmd["config_file"], flush=True)
+        print("[PROGRESS] " + json.dumps({"frame": 1, "total": 1, "elapsed_sec": 0.1}), flush=True)
+        jobs += 1
+        done = {"event": "job_done", "job_id": cmd["job_id"], "code": 1 if "fail" in cmd["config_file"] else 0,
+                "jobs": jobs, "rss_mb": 1.0, "retiring": jobs >= max_jobs}
+        print("[WORKER] " + json.dumps(done), flush=True)
+        if jobs >= max_jobs:
+            break
+""")
+
+
+@pytest.fixture
+def fake_pool(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    pools = []
+
+    def make(max_jobs=5, size=1):
+        pool = RenderWorkerPool(size=size, command=[sys.executable, str(script), str(max_jobs)])
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_worker_is_reused_between_jobs(fake_pool):
+    pool = fake_pool()
+    pids, lines = [], []
+    for i in range(3):
+        worker = pool.acquire()
+        assert worker.run(f"job{i}", f"job{i}.yaml", lines.append) == 0
+        pids.append(worker.pid)
+        pool.release(worker)
+    assert len(set(pids)) == 1 and pool.started == 1
+    assert lines[0] == "[LOG] rendering job0.yaml"
+    assert not any(line.startswith("[WORKER]") for line in lines)
+
+
+def test_failed_job_keeps_worker_and_retired_worker_is_replaced(fake_pool):
+    pool = fake_pool(max_jobs=2)
+    worker = pool.acquire()
+    assert worker.run("a", "fail.yaml", lambda line: None) == 1
+    pool.release(worker)
+    again = pool.acquire()
+    assert again is worker
+    assert again.run("b", "ok.yaml", lambda line: None) == 0
+    assert again.retiring
+    pool.release(again)
+    assert again.poll() is not None
+
+    fresh = pool.acquire()
+    assert fresh.pid != worker.pid and pool.started == 2
+    pool.release(fresh)
+
+
+def test_terminated_worker_reports_failure(fake_pool):
+    pool = fake_pool()
+    worker = pool.acquire()
+    threading.Timer(0.5, worker.terminate).start()
+    assert worker.run("c", "hang.yaml", lambda line: None) != 0
+    pool.release(worker)
+    assert pool.acquire().pid != worker.pid
+
+
+class _FakeResources:
+    released = False
+
+    @property
+    def ctx(self):
+        return None
+
+    def release(self):
+        self.released = True
+
+
+def test_serve_reports_each_job_and_retires(monkeypatch, capsys):
+    seen = []
+    monkeypatch.setattr(render_worker, "run_job",
+                        lambda path, resources: seen.append(path.name) or (1 if "bad" in path.name else 0))
+    commands = io.StringIO("\n".join([
+        json.dumps({"cmd": "render", "job_id": "a", "config_file": "bad.yaml"}),
+        "not json",
+        json.dumps({"cmd": "render", "job_id": "b", "config_file": "ok.yaml"}),
+        json.dumps({"cmd": "render", "job_id": "c", "config_file": "never.yaml"}),
+    ]))
+    resources = _FakeResources()
+
+    assert render_worker.serve(commands, max_jobs=2, resources=resources) == 2
+
+    events = [json.loads(line[len("[WORKER]"):]) for line in capsys.readouterr().out.splitlines()
+              if line.startswith("[WORKER]")]
+    assert [e["event"] for e in events] == ["ready", "job_done", "job_done"]
+    assert [(e["job_id"], e["code"], e["retiring"]) for e in events[1:]] == [("a", 1, False), ("b", 0, True)]
+    assert seen == ["bad.yaml", "ok.yaml"]
+    assert resources.released
+
+
+def test_serve_retires_over_memory_budget(monkeypatch, capsys):
+    monkeypatch.setattr(render_worker, "run_job", lambda path, resources: 0)
+    monkeypatch.setattr(render_worker, "rss_bytes", lambda: 300 * 1024 * 1024)
+    commands = io.StringIO(json.dumps({"cmd": "render", "job_id": "a", "config_file": "x.yaml"}) + "\n"
+                           + json.dumps({"cmd": "render", "job_id": "b", "config_file": "y.yaml"}) + "\n")
+    assert render_worker.serve(commands, memory_budget_mb=256, resources=_FakeResources()) == 1
+    assert '"retiring": true' in capsys.readouterr().out
+
+
+def test_resources_reuse_audio_until_file_changes(tmp_path, monkeypatch):
+    built = []
+
+    class FakeProcessor:
+        def __init__(self, path, fps, oversample=1, stems=None):
+            built.append((Path(path).name, fps, oversample))
+
+    monkeypatch.setattr(render, "AudioProcessor", FakeProcessor)
+    song, other = tmp_path / "song.wav", tmp_path / "other.wav"
+    song.write_bytes(b"a" * 10)
+    other.write_bytes(b"b" * 10)
+    resources = RenderResources(max_audio=1)
+
+    first = resources.audio(song, 30.0)
+    assert resources.audio(song, 30.0) is first
+    assert resources.audio(song, 60.0) is not first
+    song.write_bytes(b"a" * 20)
+    resources.audio(song, 60.0)
+    resources.audio(other, 60.0)
+    assert resources.audio(song, 60.0) is not first  # evicted by max_audio=1
+
+    assert built == [("song.wav", 30.0, 1), ("song.wav", 60.0, 1), ("song.wav", 60.0, 1),
+                     ("other.wav", 60.0, 1), ("song.wav", 60.0, 1)]
+    assert resources.audio_hits == 1
+
+
+def test_real_worker_keeps_context_between_renders(tmp_path, monkeypatch):
+    monkeypatch.setattr(render, "GL_SHADER_CACHE_DIR", tmp_path / "gl")
+    try:
+        render.create_standalone_context().release()
+    except Exception as e:
+        pytest.skip(f"no GL context: {e}")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("PYTHONPATH", str(REPO))
+
+    pool = RenderWorkerPool()
+    try:
+        results = []
+        for i in range(2):
+            config = tmp_path / f"job{i}.yaml"
+            config.write_text(
+                f"shader: {REPO / 'shaders' / 'test.glsl'}\nwidth: 32\nheight: 18\n"
+                f"frame_start: 0\nframe_end: 2\nfps: 30\noutput_dir: {tmp_path / 'out'}\n",
+                encoding="utf-8")
+            worker = pool.acquire()
+            lines = []
+            code = worker.run(f"job{i}", str(config), lines.append)
+            results.append((code, worker.pid, lines))
+            pool.release(worker)
+    finally:
+        pool.shutdown()
+
+    (code0, pid0, lines0), (code1, pid1, lines1) = results
+    assert code0 == code1 == 0, lines0 + lines1
+    assert pid0 == pid1
+    assert any(line.startswith("[COMPLETE]") for line in lines1)
+    assert "[LOG] Shader programs: 0 compiled, 1 reused" in lines1
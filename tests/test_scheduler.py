@@ -0,0 +1,161 @@
+import asyncio
+import threading
+
+import pytest
+
+from cedartoy.server.jobs import JobStatus, RenderJobManager
+from cedartoy.server.render_pool import RenderWorkerPool
+from cedartoy.server.scheduler import RenderScheduler
+
+
+@pytest.fixture
+def make(tmp_path, fake_render_pool):
+    def make(size=1, **kwargs):
+        manager = RenderJobManager(tmp_path / "jobs")
+        pool = fake_render_pool(size)
+        return manager, pool, RenderScheduler(manager, pool=pool, **kwargs)
+    return make
+
+
+async def wait_for(predicate, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_priority_then_fifo_one_at_a_time(make):
+    manager, pool, scheduler = make()
+
+    async def main():
+        jobs = [manager.create_job({"shader": f"s{i}.glsl", "width": 64, "height": 64}) for i in range(4)]
+        scheduler.submit(jobs[0].id)
+        scheduler.submit(jobs[1].id)
+        scheduler.submit(jobs[2].id, priority=5)
+        assert scheduler.submit(jobs[3].id) == 2
+        await wait_for(lambda: pool.started)
+        assert scheduler.queued() == [jobs[2].id, jobs[1].id, jobs[3].id]
+        for job in jobs:
+            pool.gates.setdefault(job.id, threading.Event()).set()
+        await wait_for(lambda: len(pool.started) == 4 and not scheduler.running())
+        return jobs
+
+    jobs = asyncio.run(main())
+    assert pool.started == [jobs[0].id, jobs[2].id, jobs[1].id, jobs[3].id]
+    assert all(manager.get_job(j.id).status == JobStatus.COMPLETE for j in jobs)
+
+
+def test_ram_budget_limits_concurrency(make):
+    # Each 1024x1024 job is estimated at ~544 MB; a 1.2 GB budget fits two.
+    manager, pool, scheduler = make(size=4, ram_budget_bytes=1200 * 1024**2)
+
+    async def main():
+        jobs = [manager.create_job({"shader": "s.glsl", "width": 1024, "height": 1024}) for _ in range(3)]
+        for job in jobs:
+            scheduler.submit(job.id)
+        await wait_for(lambda: len(pool.started) == 2)
+        await asyncio.sleep(0.05)
+        assert len(pool.started) == 2 and scheduler.queued() == [jobs[2].id]
+        pool.gates.setdefault(jobs[0].id, threading.Event()).set()
+        await wait_for(lambda: len(pool.started) == 3)
+        for job in jobs:
+            pool.gates.setdefault(job.id, threading.Event()).set()
+        await wait_for(lambda: not scheduler.running())
+
+    asyncio.run(main())
+
+
+def test_oversized_job_runs_alone(make):
+    manager, pool, scheduler = make(size=2, ram_budget_bytes=1)
+
+    async def main():
+        job = manager.create_job({"shader": "s.glsl"})
+        scheduler.submit(job.id)
+        pool.gates.setdefault(job.id, threading.Event()).set()
+        await wait_for(lambda: manager.get_job(job.id).status == JobStatus.COMPLETE)
+
+    asyncio.run(main())
+
+
+def test_jobs_run_without_subscribers_and_late_joiners_get_state(make):
+    manager, pool, scheduler = make()
+
+    async def main():
+        job = manager.create_job({"shader": "s.glsl"})
+        scheduler.submit(job.id)
+        await wait_for(lambda: manager.get_job(job.id).progress.get("frame") == 1)
+        subscription = scheduler.subscribe(job.id)
+        snapshot = scheduler.snapshot(job.id)
+        pool.gates[job.id].set()
+        await wait_for(lambda: not scheduler.running())
+        return job, snapshot, subscription.drain()
+
+    job, snapshot, messages = asyncio.run(main())
+    assert snapshot[0]["status"] == JobStatus.RUNNING
+    assert snapshot[0]["progress"]["frame"] == 1
+    assert snapshot[1] == {"type": "render_logs", "job_id": job.id,
+                           "messages": ["INFO: Starting render"], "dropped": 0}
+    assert [m["type"] for m in messages] == ["render_complete"]
+    assert manager.get_job(job.id).logs[0].message == "INFO: Starting render"
+
+
+def test_cancel_queued_and_running(make):
+    manager, pool, scheduler = make()
+
+    async def main():
+        running = manager.create_job({"shader": "a.glsl"})
+        queued = manager.create_job({"shader": "b.glsl"})
+        scheduler.submit(running.id)
+        scheduler.submit(queued.id)
+        await wait_for(lambda: manager.get_job(running.id).status == JobStatus.RUNNING)
+        watch = scheduler.subscribe(queued.id)
+        scheduler.cancel(queued.id)
+        assert watch.drain()[0]["type"] == "render_cancelled"
+        scheduler.cancel(running.id)
+        await wait_for(lambda: not scheduler.running())
+        await asyncio.sleep(0.05)
+        return running, queued
+
+    running, queued = asyncio.run(main())
+    assert pool.started == [running.id]
+    assert manager.get_job(running.id).status == JobStatus.CANCELLED
+    assert manager.get_job(queued.id).status == JobStatus.CANCELLED
+
+
+def test_unknown_job_raises(make):
+    _, _, scheduler = make()
+    with pytest.raises(KeyError):
+        scheduler.subscribe("missing")
+
+
+def test_configure_applies_start_up_options():
+    pool = RenderWorkerPool(size=1)
+    pool.configure(size=3, max_jobs=5, memory_budget_mb=512)
+    assert (pool.size, pool.max_jobs, pool.memory_budget_mb) == (3, 5, 512)
+    scheduler = RenderScheduler(manager=None, pool=pool, ram_budget_bytes=10)
+    scheduler.configure()
+    assert scheduler.max_concurrent == 3 and scheduler.ram_budget_bytes == 10
+    scheduler.configure(max_concurrent=2, ram_budget_bytes=1 << 30)
+    assert scheduler.max_concurrent == 2 and scheduler.ram_budget_bytes == 1 << 30
+
+    pool._idle.append(object())
+    with pytest.raises(RuntimeError):
+        pool.configure(size=1)
+
+
+def test_ui_options_reach_server_settings(monkeypatch):
+    import sys
+    import uvicorn
+    from cedartoy import cli
+    from cedartoy.server import settings as settings_mod
+
+    monkeypatch.setattr(settings_mod, "settings", settings_mod.ServerSettings())
+    monkeypatch.setattr(uvicorn, "run", lambda *a, **kw: None)
+    monkeypatch.setattr(sys, "argv", ["cedartoy", "ui", "--no-browser", "--render-workers", "2",
+                                      "--ram-budget-mb", "1024", "--worker-max-jobs", "3"])
+    cli.main()
+    s = settings_mod.settings
+    assert (s.render_workers, s.ram_budget_bytes, s.worker_max_jobs) == (2, 1 << 30, 3)
+    assert s.worker_memory_budget_mb == settings_mod.DEFAULT_MEMORY_BUDGET_MB
+    assert s.prewarm_thumbnails
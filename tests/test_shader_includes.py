@@ -0,0 +1,97 @@
+import pytest
+
+from cedartoy import shader
+from cedartoy.shader import (
+    ShaderIncludeError, assemble_shader, load_shader_from_file, map_compile_error,
+    read_source, resolve_includes,
+)
+
+
+@pytest.fixture
+def lib(tmp_path):
+    common = tmp_path / "common"
+    common.mkdir()
+    (common / "noise.glsl").write_text("#pragma once\nfloat noise(vec2 p) { return 0.0; }\n")
+    proj = tmp_path / "proj"
+    proj.mkdir()
+    (proj / "util.glsl").write_text('#include "noise.glsl"\nfloat util() { return noise(vec2(0)); }\n')
+    (proj / "main.glsl").write_text(
+        '#include "util.glsl"\n#include <noise.glsl>\nvoid mainImage(out vec4 c, in vec2 p) {}\n')
+    return tmp_path
+
+
+def test_includes_expand_once_with_line_directives(lib):
+    main = lib / "proj" / "main.glsl"
+    res = resolve_includes(read_source(main), main, [lib / "common"], first_string=1)
+    assert [p.name for p in res.files] == ["main.glsl", "util.glsl", "noise.glsl"]
+    assert res.text.count("float noise") == 1
+    assert "#pragma once" not in res.text and "#include" not in res.text
+    lines = res.text.splitlines()
+    assert lines[0] == "#line 1 2"                          # util.glsl
+    assert lines[1] == "#line 1 3"                          # noise.glsl, from util's include
+    assert lines[lines.index("float util() { return noise(vec2(0)); }") - 1] == "#line 2 2"
+    assert lines[-1] == "void mainImage(out vec4 c, in vec2 p) {}"
+    assert lines[-2] == "// noise.glsl already included"    # keeps main.glsl's line count
+    assert lines[-3] == "#line 2 1"                         # back in main.glsl after util.glsl
+
+
+def test_assembled_shader_numbers_header_and_user_source(lib, monkeypatch):
+    monkeypatch.setattr(shader, "default_include_dirs", lambda: [lib / "common"])
+    src = load_shader_from_file(lib / "proj" / "main.glsl", {"FAST": None})
+    lines = src.splitlines()
+    assert lines[0].startswith("#version")
+    assert lines[1] == "// source strings: 0=header.glsl 1=main.glsl 2=util.glsl 3=noise.glsl"
+    assert "#define FAST" in lines
+    assert "#line 1 1" in lines
+
+
+def test_resolved_cache_tracks_included_files(lib):
+    main = lib / "proj" / "main.glsl"
+    first = resolve_includes(read_source(main), main, [lib / "common"])
+    assert resolve_includes(read_source(main), main, [lib / "common"]) is first
+    (lib / "common" / "noise.glsl").write_text("float noise(vec2 p) { return 1.0; }\n")
+    assert "return 1.0" in resolve_includes(read_source(main), main, [lib / "common"]).text
+
+
+def test_missing_and_circular_includes_raise(tmp_path):
+    a, b = tmp_path / "a.glsl", tmp_path / "b.glsl"
+    a.write_text('#include "b.glsl"\n')
+    b.write_text('#include "a.glsl"\n')
+    with pytest.raises(ShaderIncludeError, match="circular"):
+        resolve_includes(read_source(a), a, [])
+    with pytest.raises(ShaderIncludeError, match="not found"):
+        assemble_shader('#include "nope.glsl"\n', source_path=a, include_dirs=[])
+
+
+def test_compile_errors_map_to_file_names():
+    src = "#version 430 core\n// source strings: 0=header.glsl 1=main.glsl 2=noise.glsl\n"
+    assert map_compile_error("2:7(12): error: `x' undeclared", src) == \
+        "noise.glsl:7(12): error: `x' undeclared"
+    assert map_compile_error("1(3) : error C1008: undefined variable", src) == \
+        "main.glsl(3) : error C1008: undefined variable"
+    assert map_compile_error("0:1(1): error", "void main() {}") == "0:1(1): error"
+
+
+def test_includes_in_comments_are_not_expanded(tmp_path):
+    (tmp_path / "real.glsl").write_text("float real() { return 1.0; }\n")
+    main = tmp_path / "main.glsl"
+    main.write_text(
+        '/* old:\n#include "missing.glsl"\n*/\n'
+        '#include "real.glsl" // */ does not open or close anything\n'
+        'float x = 1.0; // was: #include "missing.glsl"\n'
+        '/* one-liner */ float y = 2.0; /*\n#pragma once\n*/\n')
+    res = resolve_includes(read_source(main), main, [])
+    assert [p.name for p in res.files] == ["main.glsl", "real.glsl"]
+    assert "float real()" in res.text
+    assert "#include" not in res.text and res.text.count('# include "missing.glsl"') == 2
+    assert "#pragma once" in res.text  # inside a comment, so left as is
+
+
+def test_file_included_by_header_and_shader_is_pasted_once(lib, monkeypatch):
+    header = lib / "common" / "header.glsl"
+    header.write_text('#version 430 core\n#include "noise.glsl"\nuniform float iTime;\n')
+    monkeypatch.setattr(shader, "HEADER_PATH", header)
+    monkeypatch.setattr(shader, "default_include_dirs", lambda: [lib / "common"])
+    src = load_shader_from_file(lib / "proj" / "main.glsl")
+    assert src.count("float noise") == 1
+    assert src.splitlines()[1] == "// source strings: 0=header.glsl 1=noise.glsl 2=main.glsl 3=util.glsl"
@@ -0,0 +1,125 @@
+from fastapi.testclient import TestClient
+
+from cedartoy.server import shader_index as mod
+from cedartoy.server.api import shaders as shaders_api
+from cedartoy.server.app import app
+from cedartoy.server.shader_index import ShaderIndex, parse_shader_metadata
+
+
+def _shader(path, name, body="void mainImage(out vec4 c, in vec2 p) { c = vec4(0); }\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"// Name: {name}\n// Author: Ada\n{body}", encoding="utf-8")
+    return path
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _index(tmp_path, clock=None):
+    return ShaderIndex(tmp_path / "lib", cache_path=tmp_path / "index.json",
+                       min_interval=1.0, clock=clock or _Clock())
+
+
+def test_metadata_parser_keeps_fields_before_bad_param():
+    meta = parse_shader_metadata([
+        "// Name: Sea", "// @param speed float 1.0 0.0 5.0 \"Speed\"",
+        "// @param n int x 0 1 Bad", "// Author: never reached",
+    ])
+    assert meta["name"] == "Sea"
+    assert meta["parameters"][0]["label"] == "Speed"
+    assert "author" not in meta
+
+
+def test_refresh_only_reparses_changed_files(tmp_path, monkeypatch):
+    lib = tmp_path / "lib"
+    a = _shader(lib / "a.glsl", "A", "uniform float iBpm;\nvoid mainImage(out vec4 c, in vec2 p) {}\n")
+    _shader(lib / "sub" / "b.glsl", "B")
+    _shader(lib / "common" / "header.glsl", "Header")
+    clock = _Clock()
+    index = _index(tmp_path, clock)
+
+    assert [e.path for e in index.entries()] == ["a.glsl", "sub/b.glsl"]
+    assert index.entries()[0].uniforms == ["iBpm"]
+
+    parsed = []
+    real = mod.ShaderEntry.from_file.__func__
+    monkeypatch.setattr(mod.ShaderEntry, "from_file",
+                        classmethod(lambda cls, root, file, st: parsed.append(file.name) or real(cls, root, file, st)))
+
+    _shader(a, "A2")
+    assert index.entries()[0].metadata["name"] == "A"  # throttled: no rescan yet
+    clock.t = 2.0
+    assert index.entries()[0].metadata["name"] == "A2"
+    assert parsed == ["a.glsl"]
+
+    (lib / "sub" / "b.glsl").unlink()
+    clock.t = 4.0
+    assert [e.path for e in index.entries()] == ["a.glsl"]
+
+
+def test_index_is_persisted_and_reused(tmp_path, monkeypatch):
+    _shader(tmp_path / "lib" / "a.glsl", "A")
+    _index(tmp_path).refresh()
+    assert (tmp_path / "index.json").exists()
+
+    monkeypatch.setattr(mod.ShaderEntry, "from_file",
+                        classmethod(lambda *a: (_ for _ in ()).throw(AssertionError("re-parsed"))))
+    assert [e.path for e in _index(tmp_path).entries()] == ["a.glsl"]
+
+
+def test_list_route_filters_and_pages(tmp_path, monkeypatch):
+    lib = tmp_path / "lib"
+    for i in range(5):
+        _shader(lib / f"s{i}.glsl", f"Wave {i}" if i % 2 else f"Fire {i}")
+    monkeypatch.setattr(shaders_api, "SHADERS_DIR", lib)
+    monkeypatch.setattr(shaders_api, "shader_index", _index(tmp_path))
+    client = TestClient(app)
+
+    resp = client.get("/api/shaders/", params={"q": "fire", "offset": 1, "limit": 1})
+    assert resp.status_code == 200
+    assert resp.headers["X-Total-Count"] == "3"
+    assert [s["name"] for s in resp.json()] == ["Fire 2"]
+
+    everything = client.get("/api/shaders/").json()
+    assert [s["path"] for s in everything] == [f"s{i}.glsl" for i in range(5)]
+    assert everything[0]["author"] == "Ada"
+    assert client.get("/api/shaders/", params={"limit": 0}).status_code == 400
+
+
+def test_update_normalises_dotdot_paths(tmp_path):
+    lib = tmp_path / "lib"
+    _shader(lib / "a.glsl", "A")
+    (lib / "sub").mkdir()
+    _shader(lib / "common" / "header.glsl", "Header")
+    index = _index(tmp_path)
+    index.refresh()
+
+    _shader(lib / "a.glsl", "A2")
+    index.update(lib / "sub" / ".." / "a.glsl")
+    index.update(lib / "sub" / ".." / "common" / "header.glsl")
+    index.update(lib / ".." / "outside.glsl")
+    entries = index.entries()
+    assert [e.path for e in entries] == ["a.glsl"]
+    assert entries[0].metadata["name"] == "A2"
+
+
+def test_get_shader_returns_raw_and_resolved_source(tmp_path, monkeypatch):
+    lib = tmp_path / "lib"
+    (lib / "lib").mkdir(parents=True)
+    (lib / "lib" / "noise.glsl").write_text("float noise(vec2 p) { return 0.0; }\n")
+    _shader(lib / "a.glsl", "A", '#include "lib/noise.glsl"\nvoid mainImage(out vec4 c, in vec2 p) {}\n')
+    _shader(lib / "bad.glsl", "Bad", '#include "nope.glsl"\n')
+    monkeypatch.setattr(shaders_api, "SHADERS_DIR", lib)
+    client = TestClient(app)
+
+    body = client.get("/api/shaders/a.glsl").json()
+    assert '#include "lib/noise.glsl"' in body["source"]
+    assert "float noise" in body["resolved_source"] and "#include" not in body["resolved_source"]
+    assert body["include_error"] is None
+    bad = client.get("/api/shaders/bad.glsl").json()
+    assert bad["resolved_source"] is None and "nope.glsl" in bad["include_error"]
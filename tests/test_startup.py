@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from cedartoy import options_schema
+
+# Modules that cost hundreds of milliseconds to import. Commands that do
+# not render must not load them.
+HEAVY = ("moderngl", "numpy", "scipy", "imageio", "pydantic", "yaml", "cedartoy.render", "cedartoy.audio")
+# Generous ceiling; `import cedartoy.cli` took ~1.2 s with eager imports.
+CLI_IMPORT_BUDGET_US = 300_000
+
+
+def import_times(*args):
+    """Cumulative import time (µs) of each module imported by a Python invocation."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args],
+                            capture_output=True, text=True, timeout=60,
+                            cwd=Path(__file__).resolve().parent.parent)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_help_skips_heavy_imports():
+    for args in (["-c", "import cedartoy.cli"], ["-m", "cedartoy.cli", "--help"],
+                 ["-m", "cedartoy.cli", "watch", "--help"]):
+        times = import_times(*args)
+        assert "cedartoy.options_schema" in times
+        assert not [m for m in HEAVY if m in times], args
+    assert import_times("-c", "import cedartoy.cli")["cedartoy.cli"] < CLI_IMPORT_BUDGET_US
+
+
+def test_exr_probe_runs_once_and_is_cached_on_disk(monkeypatch):
+    probes = []
+    monkeypatch.setattr(options_schema, "_check_exr_available", lambda: probes.append(1) or True)
+    monkeypatch.setattr(options_schema, "_exr_probe_key", lambda: {"imageio": "1"})
+    monkeypatch.setattr(options_schema, "_exr_available", None)
+
+    assert options_schema.exr_available() and options_schema.EXR_AVAILABLE
+    assert options_schema.EXR_PROBE_PATH.exists() and len(probes) == 1
+
+    monkeypatch.setattr(options_schema, "_exr_available", None)  # a new process
+    assert options_schema.exr_available() and len(probes) == 1
+
+    monkeypatch.setattr(options_schema, "_exr_available", None)
+    monkeypatch.setattr(options_schema, "_exr_probe_key", lambda: {"imageio": "2"})
+    assert options_schema.exr_available() and len(probes) == 2
@@ -0,0 +1,159 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from cedartoy import shader as shader_mod
+from cedartoy import thumbnails
+from cedartoy.thumbnails import ThumbnailService, thumbnail_key
+
+SHADER = "void mainImage(out vec4 c, in vec2 p) { c = vec4(p / iResolution.xy, 0.0, 1.0); }\n"
+
+
+def _write(path, source=SHADER):
+    path.write_text(source, encoding="utf-8")
+    return path
+
+
+def test_key_tracks_source_and_header(tmp_path, monkeypatch):
+    header = tmp_path / "header.glsl"
+    header.write_text("#version 430 core\nuniform vec3 iResolution;\n")
+    monkeypatch.setattr(shader_mod, "HEADER_PATH", header)
+    shader = _write(tmp_path / "a.glsl")
+
+    key = thumbnail_key(shader)
+    assert thumbnail_key(shader) == key
+    _write(shader, SHADER + "// edited\n")
+    edited = thumbnail_key(shader)
+    assert edited != key
+    header.write_text("#version 430 core\nuniform vec3 iResolution;\nuniform float iTime;\n")
+    assert thumbnail_key(shader) != edited
+
+
+@pytest.fixture
+def fake_service(tmp_path, monkeypatch):
+    batches = []
+
+    def fake_render_batch(jobs):
+        batches.append(jobs)
+        out = {}
+        for shader_path, png_path in jobs:
+            if "broken" in shader_path:
+                out[png_path] = "compile error"
+            else:
+                Path(png_path).parent.mkdir(parents=True, exist_ok=True)
+                Path(png_path).write_bytes(b"png")
+                out[png_path] = None
+        return out
+
+    monkeypatch.setattr(thumbnails, "render_batch", fake_render_batch)
+    service = ThumbnailService(cache_dir=tmp_path / "thumbs",
+                               executor=ThreadPoolExecutor(max_workers=1), batch_size=2)
+    yield service, batches
+    service.close()
+
+
+def test_prewarm_batches_and_skips_cached(tmp_path, fake_service):
+    service, batches = fake_service
+    paths = [_write(tmp_path / f"s{i}.glsl", SHADER + f"// {i}\n") for i in range(5)]
+    assert service.prewarm(paths) == 5
+    for future in service.submit(paths).values():
+        future.result(timeout=5)
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+    assert service.prewarm(paths) == 0
+    assert len(batches) == 3
+
+
+def test_get_renders_once_and_reports_failures(tmp_path, fake_service):
+    service, batches = fake_service
+    good = _write(tmp_path / "good.glsl")
+    broken = _write(tmp_path / "broken.glsl", SHADER + "// broken\n")
+
+    async def main():
+        first, second = await asyncio.gather(service.get(good), service.get(good))
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == service.cache_path(thumbnail_key(good))
+    assert first.read_bytes() == b"png"
+    assert sum(len(b) for b in batches) == 1
+    with pytest.raises(RuntimeError, match="compile error"):
+        asyncio.run(service.get(broken))
+
+
+def test_renderer_draws_gradient(tmp_path):
+    try:
+        renderer = thumbnails.ThumbnailRenderer(width=32, height=16)
+    except Exception as e:
+        pytest.skip(f"no GL context: {e}")
+    import io
+    import numpy as np
+    from PIL import Image
+
+    pixels = np.asarray(Image.open(io.BytesIO(renderer.render_png(shader_mod.assemble_shader(SHADER)))))
+    assert pixels.shape == (16, 32, 3)
+    assert pixels[0, -1, 0] > 200 and pixels[0, 0, 0] < 20   # x ramps left to right
+    assert pixels[0, 0, 1] > pixels[-1, 0, 1]                 # top row is high y
+
+
+def test_close_cancels_waiters_without_waiting(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_render_batch(jobs):
+        started.set()
+        release.wait(5)
+        return {png: "stopped" for _, png in jobs}
+
+    monkeypatch.setattr(thumbnails, "render_batch", blocking_render_batch)
+    service = ThumbnailService(cache_dir=tmp_path / "thumbs", executor=ThreadPoolExecutor(max_workers=1),
+                               batch_size=1, close_timeout=0.2)
+    paths = [_write(tmp_path / f"s{i}.glsl", SHADER + f"// {i}\n") for i in range(2)]
+    futures = service.submit(paths)
+    assert started.wait(5)
+
+    begin = time.monotonic()
+    service.close()
+    assert time.monotonic() - begin < 1.0
+    queued = futures[paths[1]]
+    assert queued.cancelled()
+
+    async def waiter():
+        return await asyncio.wait_for(asyncio.wrap_future(queued), 5)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(waiter())
+    assert not service._pending
+    release.set()
+
+
+def test_interactive_requests_overtake_the_prewarm_backlog(tmp_path, monkeypatch):
+    import threading
+
+    order, release = [], threading.Event()
+
+    def slow_render_batch(jobs):
+        release.wait(5)
+        for shader_path, png_path in jobs:
+            order.append(Path(shader_path).name)
+            Path(png_path).parent.mkdir(parents=True, exist_ok=True)
+            Path(png_path).write_bytes(b"png")
+        return {png: None for _, png in jobs}
+
+    monkeypatch.setattr(thumbnails, "render_batch", slow_render_batch)
+    service = ThumbnailService(cache_dir=tmp_path / "thumbs",
+                               executor=ThreadPoolExecutor(max_workers=1), batch_size=1)
+    library = [_write(tmp_path / f"lib{i}.glsl", SHADER + f"// {i}\n") for i in range(4)]
+    wanted = _write(tmp_path / "wanted.glsl", SHADER + "// wanted\n")
+    assert service.prewarm(library) == 4
+    future = service.submit([wanted])[wanted]
+    release.set()
+    future.result(timeout=5)
+    for f in service.submit(library).values():
+        f.result(timeout=5)
+    assert order == ["lib0.glsl", "wanted.glsl", "lib1.glsl", "lib2.glsl", "lib3.glsl"]
+    service.close()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+import cedartoy.waveform as waveform
+from cedartoy.waveform import BASE_BUCKET, PeakPyramid, load_peak_pyramid
+
+
+def _brute_view(mono, sr, start, end, n):
+    edges = np.linspace(start, end, n + 1) * sr
+    out = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        chunk = mono[int(a):int(np.ceil(b))]
+        out.append((chunk.min(), chunk.max()) if len(chunk) else (0.0, 0.0))
+    return np.array(out)
+
+
+@pytest.fixture
+def song(tmp_path):
+    sr = 8000
+    rng = np.random.default_rng(3)
+    t = np.arange(sr * 30) / sr
+    mono = (np.sin(2 * np.pi * 3 * t) * rng.uniform(0.2, 1.0, len(t))).astype(np.float32)
+    path = tmp_path / "song.wav"
+    sf.write(str(path), np.stack([mono, mono], axis=1), sr, subtype="FLOAT")
+    return path, mono, sr
+
+
+def test_streamed_levels_match_whole_file_reduction(song):
+    path, mono, _ = song
+    pyramid = PeakPyramid.from_file(path)
+    whole = len(mono) // BASE_BUCKET * BASE_BUCKET
+    np.testing.assert_array_equal(pyramid.mins[0][: whole // BASE_BUCKET],
+                                  mono[:whole].reshape(-1, BASE_BUCKET).min(axis=1))
+    assert len(pyramid.mins[-1]) == 1
+    assert pyramid.maxs[-1][0] == mono.max()
+
+
+def test_view_envelope_contains_exact_peaks(song):
+    path, mono, sr = song
+    pyramid = PeakPyramid.from_file(path)
+    for start, end, n in [(0.0, 30.0, 1000), (12.0, 14.0, 200), (5.0, 5.05, 64)]:
+        lo, hi = pyramid.view(start, end, n)
+        exact = _brute_view(mono, sr, start, end, n)
+        # Buckets are coarser than columns at deep zoom, so the envelope may
+        # be wider than the exact one but never narrower.
+        assert np.all(lo <= exact[:, 0] + 1e-7)
+        assert np.all(hi >= exact[:, 1] - 1e-7)
+    # Columns that line up with bucket edges are exact.
+    end = 50 * 4096 / sr
+    lo, hi = pyramid.view(0.0, end, 50)
+    exact = _brute_view(mono, sr, 0.0, end, 50)
+    np.testing.assert_array_equal(lo, exact[:, 0])
+    np.testing.assert_array_equal(hi, exact[:, 1])
+
+
+def test_view_past_end_is_silent(song):
+    path, _, _ = song
+    lo, hi = PeakPyramid.from_file(path).view(40.0, 50.0, 10)
+    assert not lo.any() and not hi.any()
+
+
+def test_pyramid_is_built_once_per_audio_hash(song, monkeypatch):
+    path, _, _ = song
+    load_peak_pyramid(path)
+    assert list(waveform.PEAK_CACHE_DIR.glob("*.npz"))
+
+    def fail(_path):
+        raise AssertionError("cached pyramid should not re-read PCM")
+
+    monkeypatch.setattr(PeakPyramid, "from_file", classmethod(lambda cls, p: fail(p)))
+    monkeypatch.setattr(waveform, "_memory", type(waveform._memory)())
+    pyramid = load_peak_pyramid(path)  # from disk
+    assert pyramid.duration_sec == pytest.approx(30.0)
+    assert load_peak_pyramid(path) is pyramid  # from memory
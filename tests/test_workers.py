@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+
+from cedartoy.server.app import app
+from cedartoy.server.workers import WorkerPools
+
+
+def test_route_limit_caps_concurrency():
+    pools = WorkerPools(io_workers=4, limits={"slow": 2})
+    active = peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return threading.current_thread().name
+
+    async def main():
+        return await asyncio.gather(*(pools.run("slow", work) for _ in range(6)))
+
+    names = asyncio.run(main())
+    pools.shutdown()
+    assert peak == 2
+    assert all(name.startswith("cedartoy-io") for name in names)
+
+
+def test_kwargs_are_forwarded():
+    pools = WorkerPools(io_workers=1)
+    result = asyncio.run(pools.run("x", lambda a, b=0: a + b, 1, b=2))
+    pools.shutdown()
+    assert result == 3
+
+
+def test_event_loop_stays_responsive_during_blocking_route(monkeypatch, tmp_path):
+    release = threading.Event()
+
+    def slow_load(path, background_sha=False):
+        release.wait(5)
+        raise RuntimeError("done")
+
+    monkeypatch.setattr("cedartoy.server.api.project.load_project", slow_load)
+
+    async def main():
+        import httpx
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            load = asyncio.create_task(
+                client.post("/api/project/load", json={"path": str(tmp_path)}))
+            await asyncio.sleep(0.05)
+            health = await asyncio.wait_for(client.get("/api/health"), timeout=2)
+            release.set()
+            try:
+                await load
+            except RuntimeError:
+                pass
+            return health.status_code
+
+    assert asyncio.run(main()) == 200
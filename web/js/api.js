@@ -6,8 +6,12 @@ const API_BASE = '/api';
 
 export const api = {
     // Shaders
-    async listShaders() {
-        const res = await fetch(`${API_BASE}/shaders/`);
+    // params: { q, uniform, offset, limit }; X-Total-Count holds the match count.
+    async listShaders(params = {}) {
+        const query = new URLSearchParams(
+            Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== '')
+        ).toString();
+        const res = await fetch(`${API_BASE}/shaders/${query ? `?${query}` : ''}`);
         return await res.json();
     },
 
@@ -79,27 +83,62 @@ export const api = {
         return await res.json();
     },
 
+    // Analyse a server-local audio file; identical songs share one analysis.
+    async openAudio(path) {
+        const res = await fetch(`${API_BASE}/audio/open`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ path })
+        });
+        return await res.json();
+    },
+
+    // keepalive lets the request outlive the page (pagehide).
+    async releaseAudio(analysisId, { keepalive = false } = {}) {
+        await fetch(`${API_BASE}/audio/${encodeURIComponent(analysisId)}`, { method: 'DELETE', keepalive });
+    },
+
     async getAudioInfo() {
         const res = await fetch(`${API_BASE}/audio/info`);
         return await res.json();
     },
 
-    async getWaveform(numSamples = 1000) {
-        const res = await fetch(`${API_BASE}/audio/waveform?num_samples=${numSamples}`);
-        return await res.json();
+    // format 'f32' or 'u8' returns a typed array instead of JSON.
+    async getWaveform(numSamples = 1000, format = 'json', analysisId = null) {
+        const id = analysisId ? `&analysis_id=${encodeURIComponent(analysisId)}` : '';
+        const res = await fetch(`${API_BASE}/audio/waveform?num_samples=${numSamples}&format=${format}${id}`);
+        if (format === 'json') return await res.json();
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const buf = await res.arrayBuffer();
+        return format === 'f32' ? new Float32Array(buf) : new Uint8Array(buf);
     },
 
-    async getAudioFFT(frame) {
-        const res = await fetch(`${API_BASE}/audio/fft/${frame}`);
-        return await res.json();
+    async getAudioFFT(frame, format = 'json', analysisId = null) {
+        const id = analysisId ? `&analysis_id=${encodeURIComponent(analysisId)}` : '';
+        const res = await fetch(`${API_BASE}/audio/fft/${frame}?format=${format}${id}`);
+        if (format === 'json') return await res.json();
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const buf = await res.arrayBuffer();
+        return format === 'f32' ? new Float32Array(buf) : new Uint8Array(buf);
+    },
+
+    // Block of 2x512 audio textures as a typed array (frame-major,
+    // 1024 values per frame). 'u8' can go straight to texImage2D.
+    async getAudioFrames(start, count, format = 'u8', analysisId = null) {
+        const id = analysisId ? `&analysis_id=${encodeURIComponent(analysisId)}` : '';
+        const res = await fetch(`${API_BASE}/audio/frames?start=${start}&count=${count}&format=${format}${id}`);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const buf = await res.arrayBuffer();
+        const data = format === 'f32' ? new Float32Array(buf) : new Uint8Array(buf);
+        return { start, count, data };
     },
 
     // Render
-    async startRender(config) {
+    async startRender(config, priority = 0) {
         const res = await fetch(`${API_BASE}/render/start`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ config })
+            body: JSON.stringify({ config, priority })
         });
         const data = await res.json();
         if (!res.ok) {
@@ -108,6 +147,12 @@ export const api = {
         return data;
     },
 
+    async getRenderQueue() {
+        const res = await fetch(`${API_BASE}/render/queue`);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+    },
+
     async cancelRender(jobId) {
         const res = await fetch(`${API_BASE}/render/${encodeURIComponent(jobId)}/cancel`, { method: 'POST' });
         return await res.json();
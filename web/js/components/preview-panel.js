@@ -24,6 +24,12 @@ class PreviewPanel extends HTMLElement {
             }
         });
 
+        document.addEventListener('audio-frame', (e) => {
+            if (this.renderer) {
+                this.renderer.updateAudioBlock(e.detail.block, e.detail.frame);
+            }
+        });
+
         // Transport-strip drives time; preview-panel is a passive subscriber.
         document.addEventListener('transport-frame', (e) => {
             if (this.renderer) {
@@ -126,7 +132,9 @@ class PreviewPanel extends HTMLElement {
             const errorDiv = this.querySelector('#preview-error');
             errorDiv.style.display = 'none';
             const shaderData = await api.getShader(path);
-            this.renderer.compileShader(shaderData.source);
+            if (shaderData.include_error) throw new Error(shaderData.include_error);
+            // The browser has no #include; compile the server-expanded text.
+            this.renderer.compileShader(shaderData.resolved_source ?? shaderData.source);
             this.renderer.render();
         } catch (err) {
             console.error('Failed to load shader:', err);
@@ -78,6 +78,28 @@ class ProjectPanel extends HTMLElement {
         }[c]));
     }
 
+    async _pollSha(project) {
+        // Large masters are hashed server-side in the background; the
+        // integrity banner appears once the verdict is in.
+        const params = new URLSearchParams({
+            audio_path: project.audio_path, bundle_path: project.bundle_path,
+        });
+        while (this.project === project) {
+            await new Promise(r => setTimeout(r, 500));
+            const resp = await fetch(`/api/project/sha?${params}`).catch(() => null);
+            if (!resp || !resp.ok) return;
+            const sha = await resp.json();
+            if (sha.sha_pending) continue;
+            if (this.project !== project) return;
+            project.sha_pending = false;
+            project.bundle_sha_matches_audio = sha.bundle_sha_matches_audio;
+            project.warnings = [...(project.warnings || []), ...sha.warnings];
+            this.render();
+            this.attachEventListeners();
+            return;
+        }
+    }
+
     attachEventListeners() {
         this.querySelector('#project-load-btn')?.addEventListener('click', async () => {
             const input = this.querySelector('#project-path-input');
@@ -91,7 +113,7 @@ class ProjectPanel extends HTMLElement {
                 const resp = await fetch('/api/project/load', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ path }),
+                    body: JSON.stringify({ path, background_sha: true }),
                 });
                 if (!resp.ok) {
                     const detail = await resp.json().catch(() => ({}));
@@ -101,6 +123,7 @@ class ProjectPanel extends HTMLElement {
                 this.dispatchEvent(new CustomEvent('project-loaded', {
                     detail: this.project, bubbles: true,
                 }));
+                if (this.project.sha_pending) this._pollSha(this.project);
             } catch (e) {
                 this.error = `Failed to load project: ${e.message}`;
             } finally {
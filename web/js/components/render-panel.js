@@ -194,9 +194,9 @@ class RenderPanel extends HTMLElement {
             this.addLog(`Queued render job: ${this.jobId}`);
             this.addLog(`Config saved to: ${result.config_file}`);
 
-            // Send WebSocket message to start rendering
+            // The server runs the job; the socket only follows its progress.
             wsClient.send({
-                type: 'start_render',
+                type: 'subscribe',
                 job_id: this.jobId
             });
 
@@ -230,10 +230,26 @@ class RenderPanel extends HTMLElement {
             this.render();
         });
 
+        wsClient.on('render_status', (data) => {
+            if (data.job_id !== this.jobId) return;
+            if (data.queue_position) {
+                this.addLog(`Waiting in queue (${data.queue_position} job(s) ahead)`);
+            }
+        });
+
+        wsClient.on('render_started', (data) => {
+            if (data.job_id === this.jobId) this.addLog('Render started');
+        });
+
         wsClient.on('render_log', (data) => {
             this.addLog(data.message);
         });
 
+        wsClient.on('render_logs', (data) => {
+            const skipped = data.dropped ? [`(${data.dropped} log lines skipped)`] : [];
+            this.addLogs([...skipped, ...data.messages]);
+        });
+
         wsClient.on('render_complete', async (data) => {
             this.state = 'complete';
             if (data.output_dir) {
@@ -270,12 +286,18 @@ class RenderPanel extends HTMLElement {
     }
 
     addLog(message) {
+        this.addLogs([message]);
+    }
+
+    addLogs(messages) {
         const timestamp = new Date().toLocaleTimeString();
-        this.logs.push(`[${timestamp}] ${message}`);
+        for (const message of messages) {
+            this.logs.push(`[${timestamp}] ${message}`);
+        }
 
         // Keep last 100 logs
         if (this.logs.length > 100) {
-            this.logs.shift();
+            this.logs.splice(0, this.logs.length - 100);
         }
 
         this.render();
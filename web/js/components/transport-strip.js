@@ -1,3 +1,9 @@
+import { api } from '../api.js';
+
+// Must match PREVIEW_FPS in cedartoy/server/api/audio.py.
+const AUDIO_FPS = 60;
+const BLOCK_FRAMES = 120;
+
 class TransportStrip extends HTMLElement {
     constructor() {
         super();
@@ -9,6 +15,8 @@ class TransportStrip extends HTMLElement {
         this._wave = new Uint8Array(512);
         this._analyser = null;
         this._audioCtx = null;
+        this._analysisId = null;
+        this._blocks = new Map();  // block start frame -> block, or a pending Promise
     }
 
     connectedCallback() {
@@ -17,6 +25,7 @@ class TransportStrip extends HTMLElement {
         document.addEventListener('project-loaded', (e) => this._onProjectLoaded(e.detail));
         document.addEventListener('transport-seek', (e) => this._seek(e.detail.t));
         document.addEventListener('keydown', (e) => this._onKey(e));
+        window.addEventListener('pagehide', () => this._releaseAnalysis(true));
     }
 
     _onKey(e) {
@@ -75,6 +84,7 @@ class TransportStrip extends HTMLElement {
         if (this.audio) { this.audio.pause(); this.audio = null; }
         if (this._audioCtx) { try { await this._audioCtx.close(); } catch {} this._audioCtx = null; this._analyser = null; }
         this.bundle = null;
+        this._releaseAnalysis();
 
         if (!detail || !detail.audio_url) {
             this.querySelector('#ts-play').disabled = true;
@@ -94,6 +104,7 @@ class TransportStrip extends HTMLElement {
             btn.title = '';
         });
         this.audio.addEventListener('ended', () => this._pause());
+        if (detail.audio_path) this._openAnalysis(detail.audio_path);
 
         if (detail.bundle_path) {
             try {
@@ -104,6 +115,47 @@ class TransportStrip extends HTMLElement {
         this._renderReadout();
     }
 
+    async _openAnalysis(path) {
+        const audio = this.audio;
+        try {
+            const res = await api.openAudio(path);
+            if (!res.analysis_id) return;
+            // The song may have changed while the server was analysing.
+            if (this.audio === audio) this._analysisId = res.analysis_id;
+            else api.releaseAudio(res.analysis_id).catch(() => {});
+        } catch {}
+    }
+
+    _releaseAnalysis(keepalive = false) {
+        if (this._analysisId) api.releaseAudio(this._analysisId, { keepalive }).catch(() => {});
+        this._analysisId = null;
+        this._blocks.clear();
+        document.dispatchEvent(new CustomEvent('audio-frame', { detail: { block: null, frame: 0 } }));
+    }
+
+    // Block holding `frame` if it has arrived; starts fetching it (and the
+    // next one) otherwise, so playback normally finds it ready.
+    _audioBlock(frame) {
+        const start = Math.floor(frame / BLOCK_FRAMES) * BLOCK_FRAMES;
+        this._fetchBlock(start + BLOCK_FRAMES);
+        const block = this._fetchBlock(start);
+        return block instanceof Promise ? null : block;
+    }
+
+    _fetchBlock(start) {
+        if (this._blocks.has(start)) return this._blocks.get(start);
+        const id = this._analysisId;
+        const pending = api.getAudioFrames(start, BLOCK_FRAMES, 'u8', id).then(
+            (block) => { if (this._analysisId === id) this._blocks.set(start, block); },
+            () => { if (this._analysisId === id) this._blocks.delete(start); });
+        this._blocks.set(start, pending);
+        // Keep the blocks around the playhead; drop the rest after a seek.
+        for (const key of this._blocks.keys()) {
+            if (Math.abs(key - start) > 4 * BLOCK_FRAMES) this._blocks.delete(key);
+        }
+        return pending;
+    }
+
     async _togglePlay() {
         if (!this.audio) return;
         if (this.audio.paused) await this._play();
@@ -150,6 +202,10 @@ class TransportStrip extends HTMLElement {
         const t = this.audio ? this.audio.currentTime : 0;
         this._updateTime(t);
         this._emitAudioData();
+        if (this._analysisId) {
+            const frame = Math.floor(t * AUDIO_FPS);
+            document.dispatchEvent(new CustomEvent('audio-frame', { detail: { block: this._audioBlock(frame), frame } }));
+        }
         this._renderReadout(t);
         document.dispatchEvent(new CustomEvent('transport-frame', { detail: { timeSec: t } }));
     }
@@ -51,6 +51,17 @@ export class AudioTexture {
         gl.texImage2D(gl.TEXTURE_2D, 0, gl.RGBA, 512, 2, 0, gl.RGBA, gl.UNSIGNED_BYTE, data);
     }
 
+    // Upload one frame from a getAudioFrames('u8') block without repacking.
+    updateFromBlock(block, frameIndex) {
+        const gl = this.gl;
+        const offset = (frameIndex - block.start) * 1024;
+        if (offset < 0 || offset + 1024 > block.data.length) return false;
+        gl.bindTexture(gl.TEXTURE_2D, this.texture);
+        gl.texImage2D(gl.TEXTURE_2D, 0, gl.LUMINANCE, 512, 2, 0, gl.LUMINANCE, gl.UNSIGNED_BYTE,
+                      block.data.subarray(offset, offset + 1024));
+        return true;
+    }
+
     bind(unit = 0) {
         const gl = this.gl;
         gl.activeTexture(gl.TEXTURE0 + unit);
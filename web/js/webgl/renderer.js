@@ -18,6 +18,8 @@ export class ShaderRenderer {
         this.audioTexture = new AudioTexture(this.gl);
         this.audioFFT = new Float32Array(512);
         this.audioWaveform = new Float32Array(512);
+        this.audioBlock = null;
+        this.audioFrame = 0;
 
         // Camera controls (for CedarToy dome projection)
         this.cameraMode = 0; // 0=2D, 1=Equirect, 2=LL180
@@ -297,7 +299,11 @@ vec3 cameraDirLL180(vec2 uv, float tiltDeg, mat3 camBasis) {
         gl.useProgram(this.program);
 
         // Update and bind audio texture
-        this.audioTexture.update(this.audioFFT, this.audioWaveform);
+        // Prefer the server's frame-accurate textures; the live analyser
+        // covers frames whose block has not arrived yet.
+        if (!this.audioBlock || !this.audioTexture.updateFromBlock(this.audioBlock, this.audioFrame)) {
+            this.audioTexture.update(this.audioFFT, this.audioWaveform);
+        }
         this.audioTexture.bind(0);
 
         // Set standard Shadertoy uniforms
@@ -401,4 +407,10 @@ vec3 cameraDirLL180(vec2 uv, float tiltDeg, mat3 camBasis) {
             this.audioWaveform = waveformData;
         }
     }
+
+    updateAudioBlock(block, frame) {
+        // A getAudioFrames('u8') block (or null) and the frame to show from it
+        this.audioBlock = block;
+        this.audioFrame = frame;
+    }
 }